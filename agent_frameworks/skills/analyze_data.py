@@ -3,17 +3,21 @@ import os
 import sys
 
 sys.path.insert(1, os.path.join(sys.path[0], ".."))
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "..", "src")))
 from dotenv import load_dotenv
-from openai import OpenAI
 from prompt_templates.data_analysis_template import PROMPT_TEMPLATE, SYSTEM_PROMPT
 from skills.skill import Skill
+from utils.cache import cache_key, cached_completion
+from utils.clients import get_client
+from utils.rate_limit import estimate_tokens, get_rate_limiter
 
 load_dotenv()
 
 
 class AnalyzeData(Skill):
-    def __init__(self):
+    def __init__(self, client=None):
         super().__init__(self.NAME, self.ANALYZE_DATA_FUNCTION_DICT, self.data_analyzer)
+        self.client = client  # None: the shared client of the process-wide registry
 
     NAME = "data_analyzer"
     ANALYZE_DATA_FUNCTION_DICT = {
@@ -36,12 +40,14 @@ class AnalyzeData(Skill):
     }
 
     # Define the data analysis tool function
-    def data_analyzer(self, args):
+    def data_analyzer(self, args, use_cache=True):
         """Provides insights, trends, or analysis based on the data and prompt.
 
         Args:
             args (dict): A dictionary containing the data to analyze and
             the original user prompt that the data is based on.
+            use_cache (bool, optional): Whether an identical earlier analysis
+            may be reused when the response cache is enabled. Defaults to True.
 
         Returns:
             str: The analysis result.
@@ -60,16 +66,26 @@ class AnalyzeData(Skill):
         else:
             return "Invalid input: expected a dictionary or a string."
 
-        client = OpenAI()
+        client = self.client or get_client()
 
-        response = client.chat.completions.create(
-            model="gpt-4o",
-            messages=[
-                {"role": "system", "content": SYSTEM_PROMPT},
-                {
-                    "role": "user",
-                    "content": PROMPT_TEMPLATE.format(PROMPT=prompt, DATA=data),
-                },
-            ],
-        )
-        return response.choices[0].message.content
+        messages = [
+            {"role": "system", "content": SYSTEM_PROMPT},
+            {
+                "role": "user",
+                "content": PROMPT_TEMPLATE.format(PROMPT=prompt, DATA=data),
+            },
+        ]
+
+        def request():
+            rate_limiter = get_rate_limiter()
+            estimated_tokens = estimate_tokens(messages)
+            rate_limiter.acquire("gpt-4o", estimated_tokens)
+
+            response = client.chat.completions.create(
+                model="gpt-4o",
+                messages=messages,
+            )
+            rate_limiter.settle("gpt-4o", estimated_tokens, response.usage.total_tokens if response.usage else None)
+            return response.choices[0].message.content
+
+        return cached_completion(cache_key("gpt-4o", messages), request, use_cache)
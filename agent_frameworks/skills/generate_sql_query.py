@@ -2,18 +2,22 @@ import os
 import sys
 
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "..")))
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "..", "src")))
 
 from agent_frameworks.db.database import get_schema, get_table, run_query
-from openai import OpenAI
 from prompt_templates.sql_generator_template import SYSTEM_PROMPT
 from skills.skill import Skill
+from utils.cache import cache_key, get_response_cache
+from utils.clients import get_client
+from utils.rate_limit import estimate_tokens, get_rate_limiter
 
 
 class GenerateSQLQuery(Skill):
-    def __init__(self):
+    def __init__(self, client=None):
         super().__init__(
             self.NAME, self.SQL_GENERATOR_FUNCTION_DICT, self.generate_and_run_sql_query
         )
+        self.client = client  # None: the shared client of the process-wide registry
         self.table = get_table()
         self.schema = get_schema()
 
@@ -50,7 +54,7 @@ class GenerateSQLQuery(Skill):
     }
 
     # Define the SQL generator function
-    def generate_and_run_sql_query(self, args, with_retries=True):
+    def generate_and_run_sql_query(self, args, with_retries=True, use_cache=True):
         """Generates and runs an SQL query based on the prompt.
 
         Args:
@@ -58,6 +62,9 @@ class GenerateSQLQuery(Skill):
             generate an SQL query from.
             with_retries (bool, optional): Whether to retry the
             query generation if it fails. Defaults to True.
+            use_cache (bool, optional): Whether a query generated earlier for
+            the same prompt may be reused when the response cache is enabled.
+            Only queries that ran successfully are cached. Defaults to True.
 
         Returns:
             str: The result of the SQL query.
@@ -70,28 +77,44 @@ class GenerateSQLQuery(Skill):
         else:
             return "Invalid input: expected a dictionary with 'prompt' key or a string."
 
-        client = OpenAI()
+        client = self.client or get_client()
 
-        response = client.chat.completions.create(
-            model="gpt-4o",
-            messages=[
-                {
-                    "role": "system",
-                    "content": SYSTEM_PROMPT.format(SCHEMA=self.schema, TABLE=self.table),
-                },
-                {"role": "user", "content": prompt},
-            ],
-        )
+        messages = [
+            {
+                "role": "system",
+                "content": SYSTEM_PROMPT.format(SCHEMA=self.schema, TABLE=self.table),
+            },
+            {"role": "user", "content": prompt},
+        ]
+
+        def request():
+            rate_limiter = get_rate_limiter()
+            estimated_tokens = estimate_tokens(messages)
+            rate_limiter.acquire("gpt-4o", estimated_tokens)
+
+            response = client.chat.completions.create(
+                model="gpt-4o",
+                messages=messages,
+            )
+            rate_limiter.settle("gpt-4o", estimated_tokens, response.usage.total_tokens if response.usage else None)
+            return response.choices[0].message.content
 
-        sql_query = response.choices[0].message.content
+        # The query is only cached once it ran, so that a failing one is never replayed
+        cache = get_response_cache()
+        key = cache_key("gpt-4o", messages)
+        sql_query = cache.get(key) if cache is not None and use_cache else None
+        cached = sql_query is not None
+        if not cached:
+            if cache is not None and not use_cache:
+                cache.record_bypass()
+            sql_query = request()
         sanitized_query = self._sanitize_query(sql_query)
         results = str(run_query(sanitized_query))
+        failed = results.startswith("An error occurred")
+        if cache is not None and use_cache and not cached and sql_query and not failed:
+            cache.put(key, sql_query)
 
-        if (
-            with_retries
-            and isinstance(results, str)
-            and results.startswith("An error occurred")
-        ):
+        if with_retries and failed:
             if not hasattr(self, "retry_count"):
                 self.retry_count = 0
             self.retry_count += 1
@@ -102,7 +125,7 @@ class GenerateSQLQuery(Skill):
                     f"Please try again. Here is the original prompt: {prompt}"
                 )
 
-                return self.generate_and_run_sql_query(prompt)
+                return self.generate_and_run_sql_query(prompt, use_cache=use_cache)
             else:
                 self.retry_count = 0
                 return "Failed to generate a valid SQL query after 2 retries."
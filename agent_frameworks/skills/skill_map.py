@@ -16,10 +16,10 @@ class SkillMap:
     skills and use them in different agents and routers.
     """
 
-    def __init__(self):
+    def __init__(self, client=None):
         # To add more skills, create a new class that inherits from Skill
         # and add it to the list here
-        skills = [AnalyzeData(), GenerateSQLQuery()]
+        skills = [AnalyzeData(client), GenerateSQLQuery(client)]
 
         self.skill_map = {}
         for skill in skills:
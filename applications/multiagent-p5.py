@@ -1,30 +1,9 @@
-import sys
-import os
-
-
-# Get the project root by going up one level from 'applications'
-project_root = os.path.abspath(os.path.join(os.getcwd(), '..'))
-print(f"📂 Project Root: {project_root}")
-
-# Append 'src' directory to sys.path
-src_path = os.path.join(project_root, 'src')
-sys.path.append(src_path)
-
-# Print sys.path to verify
-print("🔍 Updated sys.path:")
-for path in sys.path:
-    print(path)
-
-# Try importing Saga again
-try:
-    from multi_agent.saga import Saga
-    from multi_agent.agent import Agent
-    print("✅ Saga imported successfully!")
-    print("✅ Agent imported successfully!")
-except ModuleNotFoundError as e:
-    print("❌ Import failed:", e)
+from dotenv import load_dotenv
 
+from multi_agent.agent import Agent
+from multi_agent.saga import Saga
 
+load_dotenv()
 
 # Initialize Saga
 saga = Saga()
@@ -0,0 +1,77 @@
+"""
+Benchmarks the compiled, array-backed DAG against the list-based graph walks for large graphs.
+
+For each graph size it measures, per run, the topological sort and a lookup of every agent by
+name, with and without `Saga.compile()` (whose one-off cost is reported separately).
+
+Run from the repository root:
+    python benchmarks/bench_compiled_graph.py
+"""
+import os
+import random
+import sys
+import time
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src"))
+
+from multi_agent.saga import Saga  # noqa: E402
+
+SIZES = [100, 1_000, 10_000]
+FAN_IN = 3
+REPEAT = 3
+
+
+class Node:
+    """A lightweight stand-in for Agent exposing only what the graph code uses."""
+
+    def __init__(self, name):
+        self.name = name
+        self.dependencies = []
+        self.dependents = []
+
+
+def random_dag(size, seed=0):
+    rng = random.Random(seed)
+    nodes = [Node(f"agent-{i}") for i in range(size)]
+    for i, node in enumerate(nodes[1:], start=1):
+        for j in rng.sample(range(i), min(i, FAN_IN)):
+            node.dependencies.append(nodes[j])
+            nodes[j].dependents.append(node)
+    rng.shuffle(nodes)
+    return nodes
+
+
+def best_time(fn):
+    best = float("inf")
+    for _ in range(REPEAT):
+        started = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - started)
+    return best
+
+
+def main():
+    print(
+        f"{'agents':>8} {'compile (ms)':>13} {'sort (ms)':>10} {'sort compiled':>14} "
+        f"{'lookup (ms)':>12} {'lookup compiled':>16}"
+    )
+    for size in SIZES:
+        saga = Saga()
+        saga.agents = random_dag(size)
+        names = [node.name for node in saga.agents]
+
+        sort = best_time(saga.topological_sort)
+        lookup = best_time(lambda: [saga._find_agent(name) for name in names]) if size <= 1_000 else float("nan")
+
+        compile_time = best_time(saga.compile)
+        sort_compiled = best_time(saga.topological_sort)
+        lookup_compiled = best_time(lambda: [saga._find_agent(name) for name in names])
+
+        print(
+            f"{size:>8} {compile_time * 1000:>13.2f} {sort * 1000:>10.2f} {sort_compiled * 1000:>14.3f} "
+            f"{lookup * 1000:>12.2f} {lookup_compiled * 1000:>16.3f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,78 @@
+"""
+Benchmarks how building an agent's prompt scales with fan-in and upstream output size.
+
+Compares the previous behaviour (`self.context += ...` for every upstream output, then a
+`dedent` over the whole prompt) with the structured `AgentContext` rendered once on demand.
+
+Run from the repository root:
+    python benchmarks/bench_context_fanin.py
+"""
+import os
+import sys
+import time
+from textwrap import dedent
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src"))
+
+from multi_agent.agent import AGENT_PROMPT_TEMPLATE  # noqa: E402
+from multi_agent.context import AgentContext  # noqa: E402
+
+FAN_INS = [10, 100, 1000]
+OUTPUT_SIZES = [1_000, 10_000, 100_000]
+REPEAT = 3
+
+
+def legacy_prompt(outputs):
+    context = ""
+    for output in outputs:
+        context += f"Supervisor received context: \n{output}"
+    return dedent(
+        f"""
+        <task_description>
+        Oversee the plan.
+        </task_description>
+
+        <context>
+        {context}
+        </context>
+        """
+    ).strip()
+
+
+def structured_prompt(outputs):
+    context = AgentContext("Supervisor")
+    for output in outputs:
+        context.append(output, source="upstream")
+    return AGENT_PROMPT_TEMPLATE.format(
+        task_description="Oversee the plan.",
+        task_expected_output="",
+        context=context.render(),
+    )
+
+
+def best_time(fn, outputs):
+    best = float("inf")
+    for _ in range(REPEAT):
+        started = time.perf_counter()
+        fn(outputs)
+        best = min(best, time.perf_counter() - started)
+    return best
+
+
+def main():
+    print(f"{'fan-in':>8} {'output':>8} {'legacy (ms)':>12} {'structured (ms)':>16} {'speedup':>8}")
+    for fan_in in FAN_INS:
+        for size in OUTPUT_SIZES:
+            if fan_in * size > 100_000_000:
+                continue
+            outputs = [("x" * (size - 1) + "\n") for _ in range(fan_in)]
+            legacy = best_time(legacy_prompt, outputs)
+            structured = best_time(structured_prompt, outputs)
+            print(
+                f"{fan_in:>8} {size:>8} {legacy * 1000:>12.2f} {structured * 1000:>16.2f} "
+                f"{legacy / structured:>7.1f}x"
+            )
+
+
+if __name__ == "__main__":
+    main()
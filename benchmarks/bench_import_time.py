@@ -0,0 +1,85 @@
+"""
+Benchmarks the cold import time of the package's entry points and guards against regressions.
+
+Each module is imported in fresh interpreters; the best and median wall times are reported,
+together with the heavy optional dependencies the import pulled in and the number of bytes it
+wrote to stdout/stderr. Importing must not load `openai`, `graphviz` or `dotenv` nor print
+anything: those are only needed once a client is created or a graph is plotted.
+
+The exit status is 1 if an import loads a heavy dependency, writes output, or (with `--max-ms`)
+is slower than the budget, so the script can run as a CI check.
+
+Run from the repository root:
+    python benchmarks/bench_import_time.py
+    python benchmarks/bench_import_time.py --max-ms 150
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+
+MODULES = [
+    "multi_agent.saga",
+    "multi_agent.crew",
+    "multi_agent.agent",
+    "planning_agent.react_agent",
+    "tool_agent.tool_agent",
+    "reflection_agent.reflection_agent",
+]
+HEAVY_MODULES = ["openai", "graphviz", "dotenv", "httpx", "pydantic"]
+REPEAT = 5
+
+PROBE = """
+import json, sys, time
+started = time.perf_counter()
+import {module}
+elapsed = time.perf_counter() - started
+sys.__stderr__.write("\\n" + json.dumps({{"elapsed": elapsed, "loaded": [m for m in {heavy!r} if m in sys.modules]}}))
+"""
+
+SRC = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src")
+
+
+def probe(module):
+    env = dict(os.environ, PYTHONPATH=os.pathsep.join(filter(None, [SRC, os.environ.get("PYTHONPATH")])))
+    process = subprocess.run(
+        [sys.executable, "-c", PROBE.format(module=module, heavy=HEAVY_MODULES)],
+        capture_output=True,
+        text=True,
+        env=env,
+    )
+    if process.returncode != 0:
+        raise RuntimeError(f"Importing {module} failed:\n{process.stderr}")
+    output, _, result = process.stderr.rpartition("\n")  # The probe's report is the last line
+    report = json.loads(result)
+    report["output"] = len(process.stdout) + len(output)
+    return report
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--repeat", type=int, default=REPEAT, help="Fresh interpreters per module.")
+    parser.add_argument("--max-ms", type=float, default=None, help="Budget of the best import time, in ms.")
+    args = parser.parse_args()
+
+    failed = False
+    print(f"{'module':<36} {'best (ms)':>10} {'median (ms)':>12} {'output (B)':>11}  heavy imports")
+    for module in MODULES:
+        reports = [probe(module) for _ in range(args.repeat)]
+        times = [report["elapsed"] * 1000 for report in reports]
+        loaded = sorted({name for report in reports for name in report["loaded"]})
+        output = max(report["output"] for report in reports)
+        too_slow = args.max_ms is not None and min(times) > args.max_ms
+        failed = failed or bool(loaded) or output > 0 or too_slow
+        print(
+            f"{module:<36} {min(times):>10.1f} {statistics.median(times):>12.1f} {output:>11}  "
+            f"{', '.join(loaded) or '-'}{'  (over budget)' if too_slow else ''}"
+        )
+
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
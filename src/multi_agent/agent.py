@@ -1,40 +1,48 @@
+import hashlib
+import json
 from textwrap import dedent
 
-import sys
-import os
-
-# # Get the project root by going up one level from 'applications'
-# project_root = os.path.abspath(os.path.join(os.getcwd(), '..'))
-# print(f"📂 Project Root: {project_root}")
-#
-# # Append 'src' directory to sys.path
-# src_path = os.path.join(project_root, 'src')
-# sys.path.append(src_path)
-#
-# # Print sys.path to verify
-# print("🔍 Updated sys.path:")
-# for path in sys.path:
-#     print(path)
-
+from multi_agent.context import AgentContext
+from multi_agent.context import default_compactor
 from multi_agent.crew import Crew
+from multi_agent.graph import AgentSet
+from multi_agent.graph import topological_order
 from planning_agent.react_agent import ReactAgent
 from tool_agent.tool import Tool
-
-print("✅ multi_agent.crew imported successfully!")
-print("✅ planning_agent.react_agent imported successfully!")
-print("✅ tool_agent.tool imported successfully!")
-
-# # Try importing Saga again
-# try:
-#     from multi_agent.crew import Crew
-#     from planning_agent.react_agent import ReactAgent
-#     from tool_agent.tool import Tool
-#
-#     print("✅ multi_agent.crew imported successfully!")
-#     print("✅ planning_agent.react_agent imported successfully!")
-#     print("✅ tool_agent.tool imported successfully!")
-# except ModuleNotFoundError as e:
-#     print("❌ Import failed:", e)
+from utils.deadline import check_deadline
+from utils.logging import log_event
+from utils.prompts import compile_prompt
+
+# The template is dedented once, before interpolation. Prompts used to be dedented after it, which
+# left every line indented by 8 spaces as soon as a task or the context spanned several lines
+# (i.e. for every agent with upstream context). Such prompts, and the cache and memo keys derived
+# from them, differ from the ones built before this layout.
+AGENT_PROMPT_TEMPLATE = dedent(
+    """
+    You are an AI agent. You are part of a team of agents working together to complete a task.
+    I'm going to give you the task description enclosed in <task_description></task_description> tags. I'll also give
+    you the available context from the other agents in <context></context> tags. If the context
+    is not available, the <context></context> tags will be empty. You'll also receive the task
+    expected output enclosed in <task_expected_output></task_expected_output> tags. With all this information
+    you need to create the best possible response, always respecting the format as describe in
+    <task_expected_output></task_expected_output> tags. If expected output is not available, just create
+    a meaningful response to complete the task.
+
+    <task_description>
+    {task_description}
+    </task_description>
+
+    <task_expected_output>
+    {task_expected_output}
+    </task_expected_output>
+
+    <context>
+    {context}
+    </context>
+
+    Your response:
+    """
+).strip()
 
 
 class Agent:
@@ -50,9 +58,11 @@ class Agent:
         task_description (str): A description of the task assigned to the agent.
         task_expected_output (str): The expected format or content of the task output.
         react_agent (ReactAgent): An instance of ReactAgent used for generating responses.
-        dependencies (list[Agent]): A list of Agent instances that this agent depends on.
-        dependents (list[Agent]): A list of Agent instances that depend on this agent.
-        context (str): Accumulated context information from other agents.
+        dependencies (AgentSet): The Agent instances that this agent depends on, in insertion order.
+        dependents (AgentSet): The Agent instances that depend on this agent, in insertion order.
+        context (AgentContext): Context entries received from other agents, one per upstream output.
+        context_budget (int | None): Maximum number of tokens of upstream context in the prompt.
+        timeout (float | None): Maximum number of seconds a Saga lets this agent run.
 
     Args:
         name (str): The name of the agent.
@@ -61,6 +71,20 @@ class Agent:
         task_expected_output (str, optional): The expected format or content of the task output. Defaults to "".
         tools (list[Tool] | None, optional): A list of Tool instances available to the agent. Defaults to None.
         llm (str, optional): The name of the language model to use.
+        client (OpenAI | None, optional): The client used for completions, e.g. a local stand-in.
+            Defaults to the shared client of the process-wide registry (see `utils.clients`).
+        async_client (AsyncOpenAI | None, optional): The client used by `arun`. Defaults to the
+            shared async client of the running event loop.
+        context_budget (int | None, optional): Maximum number of tokens of upstream context placed in
+            the prompt. Above it, upstream outputs are deduplicated and compacted. Defaults to None (no limit).
+        compactor (ContextCompactor | None, optional): Compactor used above the budget. Defaults to the
+            process-wide one, so outputs shared by several dependents are compacted once.
+        timeout (float | None, optional): Maximum number of seconds a Saga lets this agent run,
+            overriding the saga's `agent_timeout`. Defaults to None.
+        stream (bool, optional): Whether the agent streams its completions and stops each one at
+            the first closing `</tool_call>` or `</response>` tag. A turn then runs at most one
+            tool call: later `<tool_call>` blocks of the same turn are dropped, so leave it off
+            for agents expected to call several tools at once. Defaults to False.
     """
 
     def __init__(
@@ -71,19 +95,35 @@ class Agent:
         task_expected_output: str = "",
         tools: list[Tool] | None = None,
         llm: str = "gpt-4o",
+        client=None,
+        context_budget: int | None = None,
+        compactor=None,
+        timeout: float | None = None,
+        stream: bool = False,
+        async_client=None,
     ):
         self.name = name
         self.backstory = backstory
         self.task_description = task_description
         self.task_expected_output = task_expected_output
         self.react_agent = ReactAgent(
-            model=llm, system_prompt=self.backstory, tools=tools or []
+            model=llm,
+            system_prompt=self.backstory,
+            tools=tools or [],
+            client=client,
+            stream=stream,
+            async_client=async_client,
         )
 
-        self.dependencies: list[Agent] = []  # Agents that this agent depends on
-        self.dependents: list[Agent] = []  # Agents that depend on this agent
+        self.dependencies = AgentSet()  # Agents that this agent depends on
+        self.dependents = AgentSet()  # Agents that depend on this agent
+        topological_order.register(self)
 
-        self.context = ""
+        self.context = AgentContext(self.name)
+        self.context_budget = context_budget
+        self.compactor = compactor or default_compactor
+        self.timeout = timeout
+        self._prompt = None  # ((task description, expected output), CompiledPrompt)
 
         # Automatically register this agent to the active Crew context if one exists
         Crew.register_agent(self)
@@ -142,19 +182,21 @@ class Agent:
         """
         Adds a dependency to this agent.
 
+        Repeated dependencies are ignored, and a dependency that would close a cycle is rejected
+        immediately, leaving the graph unchanged.
+
         Args:
             other (Agent | list[Agent]): The agent(s) that this agent depends on.
 
         Raises:
             TypeError: If the dependency is not an Agent or a list of Agents.
+            ValueError: If the dependency would create a circular dependency.
         """
         if isinstance(other, Agent):
-            self.dependencies.append(other)
-            other.dependents.append(self)
+            topological_order.add_edge(other, self)
         elif isinstance(other, list) and all(isinstance(item, Agent) for item in other):
             for item in other:
-                self.dependencies.append(item)
-                item.dependents.append(self)
+                topological_order.add_edge(item, self)
         else:
             raise TypeError("The dependency must be an instance or list of Agent.")
 
@@ -162,71 +204,89 @@ class Agent:
         """
         Adds a dependent to this agent.
 
+        Repeated dependents are ignored, and a dependent that would close a cycle is rejected
+        immediately, leaving the graph unchanged.
+
         Args:
             other (Agent | list[Agent]): The agent(s) that depend on this agent.
 
         Raises:
             TypeError: If the dependent is not an Agent or a list of Agents.
+            ValueError: If the dependent would create a circular dependency.
         """
         if isinstance(other, Agent):
-            other.dependencies.append(self)
-            self.dependents.append(other)
+            topological_order.add_edge(self, other)
         elif isinstance(other, list) and all(isinstance(item, Agent) for item in other):
             for item in other:
-                item.dependencies.append(self)
-                self.dependents.append(item)
+                topological_order.add_edge(self, item)
         else:
             raise TypeError("The dependent must be an instance or list of Agent.")
 
-    def receive_context(self, input_data):
+    def receive_context(self, input_data, source=None):
         """
         Receives and stores context information from other agents.
 
         Args:
             input_data (str): The context information to be added.
+            source (str | None, optional): The name of the agent that produced it.
         """
-        self.context += f"{self.name} received context: \n{input_data}"
+        self.context.append(input_data, source)
+
+    def clear_context(self):
+        """
+        Discards all context information received from other agents.
+        """
+        self.context.clear()
 
     def create_prompt(self):
         """
         Creates a prompt for the agent based on its task description, expected output, and context.
 
+        The template is compiled once with the task description and expected output (see
+        `utils.prompts`), so only the context is interpolated per call and the text before it is
+        identical from one run to the next.
+
         Returns:
             str: The formatted prompt string.
         """
-        prompt = dedent(
-            f"""
-        You are an AI agent. You are part of a team of agents working together to complete a task.
-        I'm going to give you the task description enclosed in <task_description></task_description> tags. I'll also give
-        you the available context from the other agents in <context></context> tags. If the context
-        is not available, the <context></context> tags will be empty. You'll also receive the task
-        expected output enclosed in <task_expected_output></task_expected_output> tags. With all this information
-        you need to create the best possible response, always respecting the format as describe in
-        <task_expected_output></task_expected_output> tags. If expected output is not available, just create
-        a meaningful response to complete the task.
-
-        <task_description>
-        {self.task_description}
-        </task_description>
-
-        <task_expected_output>
-        {self.task_expected_output}
-        </task_expected_output>
-
-        <context>
-        {self.context}
-        </context>
-
-        Your response:
+        key = (self.task_description, self.task_expected_output)
+        compiled = self._prompt
+        if compiled is None or compiled[0] != key:
+            template = compile_prompt(
+                AGENT_PROMPT_TEMPLATE, task_description=key[0], task_expected_output=key[1]
+            )
+            compiled = self._prompt = (key, template)
+        return compiled[1].render(context=self.context.render(self.context_budget, self.compactor))
+
+    def memo_key(self):
         """
-        ).strip()
+        Computes the key under which a Saga memoizes this agent's output (see `Saga`): a hash of
+        everything the output depends on, i.e. the task description, expected output, backstory,
+        model, tool signatures, context budget and the upstream context received so far. The name
+        is included too, as it appears in the rendered context.
 
-        return prompt
+        Context entries are hashed in sorted order, so the key doesn't depend on the order in
+        which concurrent upstream agents delivered them.
 
+        Returns:
+            str: The SHA-256 hex digest of the agent's inputs.
+        """
+        inputs = {
+            "name": self.name,
+            "task_description": self.task_description,
+            "task_expected_output": self.task_expected_output,
+            "backstory": self.backstory,
+            "model": self.react_agent.model,
+            "tools": [tool.fn_signature for tool in self.react_agent.tools],
+            "context_budget": self.context_budget,
+            "context": sorted([entry.source or "", entry.content] for entry in self.context.entries),
+        }
+        canonical = json.dumps(inputs, sort_keys=True, separators=(",", ":"), ensure_ascii=False)
+        return hashlib.sha256(canonical.encode("utf-8")).hexdigest()
 
     def rollback(self):
         """Rollback function in case of failure."""
-        print(f"🔄 Rolling back {self.name}'s operation...")
+        log_event("agent.rollback", f"🔄 Rolling back {self.name}'s operation...", agent=self.name)
 
     def run(self):
         """
@@ -239,8 +299,25 @@ class Agent:
         """
         msg = self.create_prompt()
         output = self.react_agent.run(user_msg=msg)
+        check_deadline()  # Don't hand the output of a cancelled agent to its dependents
+
+        # Pass the output to all dependents
+        for dependent in self.dependents:
+            dependent.receive_context(output, source=self.name)
+        return output
+
+    async def arun(self):
+        """
+        Asynchronous counterpart of `run`, awaiting the ReactAgent instead of blocking on it.
+
+        Returns:
+            str: The output generated by the agent.
+        """
+        msg = self.create_prompt()
+        output = await self.react_agent.arun(user_msg=msg)
+        check_deadline()
 
         # Pass the output to all dependents
         for dependent in self.dependents:
-            dependent.receive_context(output)
-        return output
\ No newline at end of file
+            dependent.receive_context(output, source=self.name)
+        return output
@@ -0,0 +1,144 @@
+import argparse
+import json
+import time
+from concurrent.futures import as_completed
+from concurrent.futures import ThreadPoolExecutor
+
+from multi_agent.agent import Agent
+from multi_agent.saga import Saga
+
+
+def build_saga(scenario: dict, client=None, scheduler=None) -> Saga:
+    """
+    Builds a Saga from a scenario definition.
+
+    A scenario is a dict with the following keys:
+        - "name" (str): The scenario name.
+        - "agents" (list[dict]): The `Agent` keyword arguments (`name`, `backstory`,
+          `task_description`, and optionally `task_expected_output`, `llm` and `timeout`).
+        - "dependencies" (list[list[str]], optional): `[upstream, downstream]` agent name pairs.
+        - "with_rollback" (bool, optional): Whether to roll back on failure. Defaults to True.
+        - "timeout" (float, optional): Maximum number of seconds of the run.
+        - "agent_timeout" (float, optional): Maximum number of seconds of each agent.
+
+    Args:
+        scenario (dict): The scenario definition.
+        client (OpenAI | None, optional): The client shared by the agents.
+        scheduler (CriticalPathScheduler | None, optional): The scheduler shared by the sagas.
+
+    Returns:
+        Saga: The saga, with its agents registered and dependencies set.
+    """
+    agents = {spec["name"]: Agent(client=client, **spec) for spec in scenario["agents"]}
+    for upstream, downstream in scenario.get("dependencies", []):
+        agents[upstream] >> agents[downstream]
+
+    saga = Saga(scheduler=scheduler, timeout=scenario.get("timeout"), agent_timeout=scenario.get("agent_timeout"))
+    saga.transaction_manager(list(agents.values()))
+    return saga
+
+
+def run_scenario(scenario: dict, run_index: int = 0, client=None, scheduler=None, agent_workers: int = 1) -> dict:
+    """
+    Runs a single scenario and summarises its outcome.
+
+    Args:
+        scenario (dict): The scenario definition, see `build_saga`.
+        run_index (int, optional): The index of this run among the repetitions of the scenario.
+        client (OpenAI | None, optional): The client shared by the agents.
+        scheduler (CriticalPathScheduler | None, optional): The scheduler shared by the sagas.
+        agent_workers (int, optional): Maximum number of agents of the saga running at the same time.
+
+    Returns:
+        dict: The scenario name, run index, status, per-agent outputs, error and elapsed seconds.
+    """
+    started = time.perf_counter()
+    try:
+        saga = build_saga(scenario, client=client, scheduler=scheduler)
+        saga.saga_coordinator(with_rollback=scenario.get("with_rollback", True), max_workers=agent_workers)
+        error = saga.error
+        context = saga.context
+    except Exception as e:
+        error = e
+        context = {}
+
+    return {
+        "scenario": scenario["name"],
+        "run": run_index,
+        "status": "failed" if error is not None else "completed",
+        "error": str(error) if error is not None else None,
+        "context": context,
+        "elapsed": time.perf_counter() - started,
+    }
+
+
+def run_batch(
+    scenarios: list[dict],
+    output_path: str,
+    max_workers: int = 8,
+    repeat: int = 1,
+    agent_workers: int = 1,
+    client=None,
+    scheduler=None,
+) -> dict:
+    """
+    Runs many scenarios concurrently on one bounded worker pool and streams the results to disk.
+
+    All runs share the same client (and thus its connection pool), the process-wide rate limiter
+    and, if given, the same scheduler. Each result is appended to `output_path` as a JSON
+    line as soon as its run finishes.
+
+    Args:
+        scenarios (list[dict]): The scenario definitions, see `build_saga`.
+        output_path (str): The JSONL file the results are appended to.
+        max_workers (int, optional): Maximum number of sagas running at the same time. Defaults to 8.
+        repeat (int, optional): Number of runs of each scenario. Defaults to 1.
+        agent_workers (int, optional): Maximum number of agents of one saga running at the same time.
+        client (OpenAI | None, optional): The shared client. Defaults to the client of the
+            process-wide registry (see `utils.clients`).
+        scheduler (CriticalPathScheduler | None, optional): The shared scheduler.
+
+    Returns:
+        dict: The number of completed and failed runs.
+    """
+    summary = {"completed": 0, "failed": 0}
+
+    with open(output_path, "a") as output, ThreadPoolExecutor(max_workers=max_workers) as executor:
+        futures = [
+            executor.submit(run_scenario, scenario, run_index, client, scheduler, agent_workers)
+            for scenario in scenarios
+            for run_index in range(repeat)
+        ]
+        for future in as_completed(futures):
+            result = future.result()
+            output.write(json.dumps(result) + "\n")
+            output.flush()
+            summary[result["status"]] += 1
+
+    return summary
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run a batch of saga scenarios.")
+    parser.add_argument("scenarios", help="JSON file holding a list of scenario definitions.")
+    parser.add_argument("output", help="JSONL file the results are appended to.")
+    parser.add_argument("--workers", type=int, default=8, help="Maximum number of concurrent sagas.")
+    parser.add_argument("--repeat", type=int, default=1, help="Number of runs of each scenario.")
+    parser.add_argument("--agent-workers", type=int, default=1, help="Maximum concurrent agents per saga.")
+    args = parser.parse_args()
+
+    with open(args.scenarios) as f:
+        scenarios = json.load(f)
+
+    summary = run_batch(
+        scenarios,
+        args.output,
+        max_workers=args.workers,
+        repeat=args.repeat,
+        agent_workers=args.agent_workers,
+    )
+    print(f"✅ {summary['completed']} run(s) completed, ❌ {summary['failed']} failed.")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,344 @@
+import functools
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass
+
+
+@functools.lru_cache(maxsize=1)
+def _encoder():
+    """Returns a tiktoken encoder if tiktoken is installed and usable, None otherwise."""
+    try:
+        import tiktoken
+
+        return tiktoken.get_encoding("o200k_base")
+    except Exception:
+        return None
+
+
+def count_tokens(text: str) -> int:
+    """
+    Counts the tokens of a text with tiktoken, or estimates them (4 characters per token) if
+    tiktoken is not available.
+
+    Args:
+        text (str): The text.
+
+    Returns:
+        int: The number of tokens.
+    """
+    encoder = _encoder()
+    if encoder is None:
+        return (len(text) + 3) // 4
+    return len(encoder.encode(text, disallowed_special=()))
+
+
+def dedupe_paragraphs(text: str) -> str:
+    """
+    Removes repeated paragraphs (blocks separated by blank lines), keeping the first occurrence.
+
+    Args:
+        text (str): The text.
+
+    Returns:
+        str: The text without duplicated paragraphs.
+    """
+    seen = set()
+    paragraphs = []
+    for paragraph in text.split("\n\n"):
+        key = paragraph.strip()
+        if key and key in seen:
+            continue
+        seen.add(key)
+        paragraphs.append(paragraph)
+    return "\n\n".join(paragraphs)
+
+
+def truncate_to_tokens(text: str, max_tokens: int) -> str:
+    """
+    Extractively truncates a text to about `max_tokens` tokens, keeping its beginning and its end.
+
+    Args:
+        text (str): The text.
+        max_tokens (int): The token budget.
+
+    Returns:
+        str: The truncated text, with a marker where content was omitted.
+    """
+    tokens = count_tokens(text)
+    if tokens <= max_tokens:
+        return text
+
+    marker = f"\n[... about {tokens - max_tokens} tokens omitted ...]\n"
+    keep = int(len(text) * max(max_tokens - count_tokens(marker), 0) / tokens)
+    while True:
+        head, tail = keep * 2 // 3, keep // 3
+        truncated = text[:head] + marker + (text[-tail:] if tail else "")
+        if keep == 0 or count_tokens(truncated) <= max_tokens:
+            return truncated
+        keep = int(keep * 0.9)
+
+
+class ContextCompactor:
+    """
+    Compacts upstream outputs that don't fit in a downstream agent's context budget.
+
+    A text is first deduplicated, then, if still too long, passed to the optional summarizer and
+    finally truncated extractively. Results are cached by (content, budget) and budgets are
+    rounded down to a multiple of `granularity`, so an output delivered to many dependents is
+    compacted once rather than once per dependent.
+
+    Attributes:
+        summarizer (Callable[[str, int], str] | None): Optional function summarising a text to a
+            number of tokens, e.g. `llm_summarizer(...)`.
+        granularity (int): Budgets are rounded down to a multiple of this many tokens.
+
+    Args:
+        summarizer (Callable[[str, int], str] | None, optional): The summarizer. Defaults to None.
+        max_entries (int, optional): Maximum number of cached results. Defaults to 1024.
+        granularity (int, optional): Budget rounding, in tokens. Defaults to 64.
+    """
+
+    def __init__(self, summarizer=None, max_entries: int = 1024, granularity: int = 64):
+        self.summarizer = summarizer
+        self.granularity = granularity
+        self._max_entries = max_entries
+        self._cache = OrderedDict()
+        self._lock = threading.Lock()
+
+    def _cached(self, key, compute):
+        with self._lock:
+            if key in self._cache:
+                self._cache.move_to_end(key)
+                return self._cache[key]
+        value = compute()
+        with self._lock:
+            self._cache[key] = value
+            if len(self._cache) > self._max_entries:
+                self._cache.popitem(last=False)
+        return value
+
+    def count_tokens(self, text: str) -> int:
+        """
+        Cached version of `count_tokens`.
+
+        Args:
+            text (str): The text.
+
+        Returns:
+            int: The number of tokens.
+        """
+        return self._cached(("count", text), lambda: count_tokens(text))
+
+    def round_budget(self, max_tokens: int) -> int:
+        """
+        Rounds a budget down to a multiple of `granularity`. Budgets below `granularity` are kept
+        as they are, so the result never exceeds `max_tokens`.
+
+        Args:
+            max_tokens (int): The budget.
+
+        Returns:
+            int: The rounded budget.
+        """
+        if max_tokens < self.granularity:
+            return max_tokens
+        return max_tokens // self.granularity * self.granularity
+
+    def compact(self, text: str, max_tokens: int) -> str:
+        """
+        Compacts a text to fit in `max_tokens` tokens (rounded down to `granularity`).
+
+        Args:
+            text (str): The text.
+            max_tokens (int): The token budget.
+
+        Returns:
+            str: The compacted text.
+        """
+        max_tokens = self.round_budget(max_tokens)
+        return self._cached(("compact", text, max_tokens), lambda: self._compact(text, max_tokens))
+
+    def _compact(self, text: str, max_tokens: int) -> str:
+        text = dedupe_paragraphs(text)
+        if count_tokens(text) <= max_tokens:
+            return text
+        if self.summarizer is not None:
+            text = self.summarizer(text, max_tokens)
+        return truncate_to_tokens(text, max_tokens)
+
+
+default_compactor = ContextCompactor()
+
+
+def llm_summarizer(client=None, model: str = "gpt-4o-mini"):
+    """
+    Builds a summarizer for `ContextCompactor` backed by a language model.
+
+    Args:
+        client (OpenAI | None, optional): The client used for the summarisation requests.
+            Defaults to the shared client of the process-wide registry (see `utils.clients`).
+        model (str, optional): The model to use. Defaults to "gpt-4o-mini".
+
+    Returns:
+        Callable[[str, int], str]: The summarizer.
+    """
+    from utils.clients import get_client
+    from utils.completions import build_prompt_structure
+    from utils.completions import completions_create
+
+    def summarize(text: str, max_tokens: int) -> str:
+        messages = [
+            build_prompt_structure(
+                prompt=(
+                    "Summarize the following output of another agent in at most "
+                    f"{max_tokens} tokens. Keep every fact, number, name and time needed "
+                    "by downstream agents; drop repetition and filler."
+                ),
+                role="system",
+            ),
+            build_prompt_structure(prompt=text, role="user"),
+        ]
+        return completions_create(client or get_client(), messages, model)
+
+    return summarize
+
+
+@dataclass(frozen=True)
+class ContextEntry:
+    """
+    A piece of context received from another agent.
+
+    Attributes:
+        source (str | None): The name of the agent that produced the content, if known.
+        content (str): The content itself, shared with (not copied from) the producer's output.
+    """
+
+    source: str | None
+    content: str
+
+
+class AgentContext:
+    """
+    Append-only collection of the context entries an agent received from upstream agents.
+
+    Entries are stored as references to the upstream outputs and only rendered into a single
+    string when a prompt is built, so receiving context costs O(1) per entry instead of copying
+    the whole accumulated text on every delivery.
+
+    Attributes:
+        owner (str): The name of the agent receiving the context.
+    """
+
+    def __init__(self, owner: str):
+        self.owner = owner
+        self._entries: list[ContextEntry] = []
+        self._lock = threading.Lock()  # Upstream agents may deliver context concurrently
+
+    def append(self, content: str, source: str | None = None) -> None:
+        """
+        Adds an entry.
+
+        Args:
+            content (str): The context information.
+            source (str | None, optional): The name of the agent that produced it.
+        """
+        with self._lock:
+            self._entries.append(ContextEntry(source, content))
+
+    def clear(self) -> None:
+        """Discards all entries."""
+        with self._lock:
+            self._entries = []
+
+    @property
+    def entries(self) -> tuple[ContextEntry, ...]:
+        """The entries, in the order they were received."""
+        with self._lock:
+            return tuple(self._entries)
+
+    def render(self, budget: int | None = None, compactor: ContextCompactor | None = None) -> str:
+        """
+        Renders the entries into the text placed between the prompt's <context></context> tags.
+
+        With a token budget, identical entries are only rendered once and, if the entries still
+        don't fit, the budget is shared fairly: entries smaller than their share are kept verbatim
+        and the remaining ones are compacted to the leftover budget. Entries whose share would be
+        too small to be useful (below the compactor's `granularity`) are merged into a single
+        entry, or dropped if even that one can't get a useful share. The rendered context never
+        exceeds the budget.
+
+        Args:
+            budget (int | None, optional): Maximum number of tokens of the rendered context.
+            compactor (ContextCompactor | None, optional): Compactor used above the budget.
+                Defaults to the shared `default_compactor`.
+
+        Returns:
+            str: The rendered context.
+        """
+        header = f"{self.owner} received context: \n"
+        entries = self.entries
+        if budget is None:
+            return "".join(header + entry.content for entry in entries)
+
+        compactor = compactor or default_compactor
+        contents = list(dict.fromkeys(entry.content for entry in entries))
+        contents = _fit_contents(contents, budget, compactor.count_tokens(header), compactor)
+        rendered = "".join(header + content for content in contents)
+
+        # Token counts of concatenated texts are not exactly the sum of their parts
+        if compactor.count_tokens(rendered) > budget:
+            rendered = truncate_to_tokens(rendered, budget)
+            if count_tokens(rendered) > budget:
+                return ""
+        return rendered
+
+    def __str__(self) -> str:
+        return self.render()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+def _fit_contents(contents: list[str], budget: int, header_tokens: int, compactor: ContextCompactor) -> list[str]:
+    """
+    Fits contents, each preceded by a header, in a token budget (see `AgentContext.render`).
+    """
+    while contents:
+        sizes = [compactor.count_tokens(content) for content in contents]
+        available = budget - header_tokens * len(contents)
+        if sum(sizes) <= available:
+            return contents
+
+        shares = _fair_shares(sizes, max(available, 0))
+        unusable = [
+            index
+            for index, (size, share) in enumerate(zip(sizes, shares))
+            if size > share and share < compactor.granularity
+        ]
+        if not unusable:
+            return [
+                content if size <= share else compactor.compact(content, share)
+                for content, size, share in zip(contents, sizes, shares)
+            ]
+
+        # Merging saves the headers of the merged entries; a single entry can only be dropped
+        kept = [content for index, content in enumerate(contents) if index not in unusable]
+        if len(unusable) > 1:
+            kept.append("\n\n".join(contents[index] for index in unusable))
+        contents = kept
+    return []
+
+
+def _fair_shares(sizes: list[int], available: int) -> list[int]:
+    """
+    Splits a token budget among entries: entries smaller than an equal share of what is left keep
+    their size, and the larger ones split the rest equally.
+    """
+    shares = [0] * len(sizes)
+    remaining = available
+    order = sorted(range(len(sizes)), key=lambda i: sizes[i])
+    for position, index in enumerate(order):
+        share = remaining // (len(sizes) - position)
+        shares[index] = min(sizes[index], share)
+        remaining -= shares[index]
+    return shares
@@ -1,29 +1,12 @@
+import time
 from collections import deque
 
 from colorama import Fore
-from graphviz import Digraph  # type: ignore
-import sys
-import os
 
-# Get the project root by going up one level from 'applications'
-project_root = os.path.abspath(os.path.join(os.getcwd(), '..'))
-print(f"📂 Project Root: {project_root}")
-
-# Append 'src' directory to sys.path
-src_path = os.path.join(project_root, 'src')
-sys.path.append(src_path)
-
-# Print sys.path to verify
-print("🔍 Updated sys.path:")
-for path in sys.path:
-    print(path)
-
-# Try importing Saga again
-try:
-    from utils.logging import custom_print
-    print("✅ utils.logging imported successfully!")
-except ModuleNotFoundError as e:
-    print("❌ Import failed:", e)
+from multi_agent.graph import CompiledGraph
+from utils.logging import custom_print
+from utils.logging import log_event
+from utils.profiling import profile_section
 
 
 class Crew:
@@ -36,12 +19,25 @@ class Crew:
     Attributes:
         current_crew (Crew): Class-level variable to track the active Crew context.
         agents (list): A list of agents in the crew.
+        scheduler (CriticalPathScheduler | None): Orders ready agents by remaining critical path.
+        graph (CompiledGraph | None): Frozen, indexed form of the agent graph, set by `compile`.
+        profiler (Profiler | None): Profiles every agent and tool call of the runs, if set.
+
+    Args:
+        scheduler (CriticalPathScheduler | None, optional): Scheduler used to pick the run order
+            and to learn agent latencies. Defaults to None (FIFO order).
+        profiler (Profiler | None, optional): If given, every agent run and tool call is profiled
+            (cProfile and tracemalloc), per-agent profiles are written to the profiler's output
+            directory and a merged summary is written at the end of each run. Defaults to None.
     """
 
     current_crew = None
 
-    def __init__(self):
+    def __init__(self, scheduler=None, profiler=None):
         self.agents = []
+        self.scheduler = scheduler
+        self.graph = None
+        self.profiler = profiler
 
     def __enter__(self):
         """
@@ -72,6 +68,24 @@ class Crew:
             agent: The agent to be added to the crew.
         """
         self.agents.append(agent)
+        self.graph = None  # A compiled graph no longer matches the crew
+
+    def compile(self):
+        """
+        Freezes the agent graph into an indexed form (integer ids, CSR adjacency, name -> id map)
+        whose topological order is computed once and reused by every run.
+
+        Call it again after adding agents; dependencies added afterwards are picked up by
+        recompiling the graph on its next use.
+
+        Returns:
+            CompiledGraph: The compiled graph.
+
+        Raises:
+            ValueError: If there's a circular dependency among the agents.
+        """
+        self.graph = CompiledGraph(self.agents)
+        return self.graph
 
     @staticmethod
     def register_agent(agent):
@@ -88,14 +102,23 @@ class Crew:
         """
         Performs a topological sort of the agents based on their dependencies.
 
+        With a scheduler, agents with the longest remaining critical path come first among those
+        whose dependencies are satisfied; otherwise the order is FIFO.
+
         Returns:
             list: A list of agents sorted in topological order.
 
         Raises:
             ValueError: If there's a circular dependency among the agents.
         """
+        if self.graph is not None and self.graph.stale:
+            self.compile()
+        if self.graph is not None and self.scheduler is None:
+            return self.graph.sorted_agents()
+
         in_degree = {agent: len(agent.dependencies) for agent in self.agents}
-        queue = deque([agent for agent in self.agents if in_degree[agent] == 0])
+        queue = self.scheduler.ready_queue(self.agents) if self.scheduler is not None else deque()
+        queue.extend(agent for agent in self.agents if in_degree[agent] == 0)
 
         sorted_agents = []
 
@@ -122,6 +145,8 @@ class Crew:
         Returns:
             Digraph: A Graphviz Digraph object representing the agent dependencies.
         """
+        from graphviz import Digraph  # type: ignore
+
         dot = Digraph(format="png")  # Set format to PNG for inline display
 
         # Add nodes and edges for each agent in the crew
@@ -140,4 +165,14 @@ class Crew:
         sorted_agents = self.topological_sort()
         for agent in sorted_agents:
             custom_print(f"RUNNING AGENT: {agent}")
-            print(Fore.RED + f"{agent.run()}")
\ No newline at end of file
+            started = time.perf_counter()
+            with profile_section(f"agent.{agent.name}", self.profiler):
+                output = agent.run()
+            if self.scheduler is not None:
+                self.scheduler.record(agent, time.perf_counter() - started)
+            log_event("agent.output", f"{output}", color=Fore.RED, agent=agent.name)
+
+        if self.scheduler is not None:
+            self.scheduler.tracker.save()
+        if self.profiler is not None:
+            self.profiler.write_summary()
\ No newline at end of file
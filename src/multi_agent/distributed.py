@@ -0,0 +1,283 @@
+import importlib
+import multiprocessing
+import os
+import pickle
+import queue
+import sqlite3
+import time
+import uuid
+from abc import ABC
+from abc import abstractmethod
+
+from planning_agent.react_agent import ReactAgent
+from tool_agent.tool import Tool
+from tool_agent.tool import tool as make_tool
+from utils.deadline import Deadline
+from utils.deadline import deadline_scope
+
+STOP = "stop"
+STARTED = "started"
+
+# Seconds the coordinator waits for a result before checking that the workers are still alive
+POLL_TIMEOUT = 1.0
+
+
+class Broker(ABC):
+    """
+    Interface of the message broker between a distributed `Saga` coordinator and its workers.
+
+    The coordinator submits one task per ready agent and collects the results; workers take
+    tasks, run them and publish the results. A broker serves a single coordinator at a time.
+    """
+
+    @abstractmethod
+    def submit(self, task: dict) -> None:
+        """Enqueues a task for the workers."""
+
+    @abstractmethod
+    def next_task(self, timeout: float | None = None) -> dict | None:
+        """Takes the next task, waiting up to `timeout` seconds. Returns None on timeout."""
+
+    @abstractmethod
+    def publish_result(self, result: dict) -> None:
+        """Sends the result of a task back to the coordinator."""
+
+    @abstractmethod
+    def next_result(self, timeout: float | None = None) -> dict | None:
+        """Takes the next result, waiting up to `timeout` seconds. Returns None on timeout."""
+
+
+class QueueBroker(Broker):
+    """
+    A broker backed by a pair of `multiprocessing` queues, for workers on the local machine.
+
+    Args:
+        context (str | None, optional): The multiprocessing start method. Defaults to the platform default.
+    """
+
+    def __init__(self, context: str | None = None):
+        mp_context = multiprocessing.get_context(context)
+        self._tasks = mp_context.Queue()
+        self._results = mp_context.Queue()
+
+    def submit(self, task: dict) -> None:
+        self._tasks.put(task)
+
+    def next_task(self, timeout: float | None = None) -> dict | None:
+        try:
+            return self._tasks.get(timeout=timeout)
+        except queue.Empty:
+            return None
+
+    def publish_result(self, result: dict) -> None:
+        self._results.put(result)
+
+    def next_result(self, timeout: float | None = None) -> dict | None:
+        try:
+            return self._results.get(timeout=timeout)
+        except queue.Empty:
+            return None
+
+
+class SQLiteBroker(Broker):
+    """
+    A broker backed by a SQLite database, so that workers only need access to the same file.
+
+    Tasks are claimed atomically, which lets any number of worker processes poll the same
+    database. Each process opens its own connection.
+
+    Args:
+        path (str): Path of the SQLite database file.
+        poll_interval (float, optional): Seconds between polls while waiting. Defaults to 0.05.
+    """
+
+    def __init__(self, path: str, poll_interval: float = 0.05):
+        self.path = path
+        self.poll_interval = poll_interval
+        self._conn = None
+        self._pid = None
+        self._connection().executescript(
+            """
+            CREATE TABLE IF NOT EXISTS broker_tasks (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                payload BLOB NOT NULL,
+                claimed INTEGER NOT NULL DEFAULT 0
+            );
+            CREATE TABLE IF NOT EXISTS broker_results (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                payload BLOB NOT NULL
+            );
+            """
+        )
+
+    def __getstate__(self):
+        return {"path": self.path, "poll_interval": self.poll_interval, "_conn": None, "_pid": None}
+
+    def _connection(self) -> sqlite3.Connection:
+        if self._conn is None or self._pid != os.getpid():
+            self._conn = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._pid = os.getpid()
+        return self._conn
+
+    def _poll(self, take, timeout: float | None):
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while True:
+            item = take()
+            if item is not None:
+                return item
+            if deadline is not None and time.monotonic() >= deadline:
+                return None
+            time.sleep(self.poll_interval)
+
+    def _take_task(self) -> dict | None:
+        conn = self._connection()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            row = conn.execute(
+                "SELECT id, payload FROM broker_tasks WHERE claimed = 0 ORDER BY id LIMIT 1"
+            ).fetchone()
+            if row is not None:
+                conn.execute("UPDATE broker_tasks SET claimed = 1 WHERE id = ?", (row[0],))
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+        return None if row is None else pickle.loads(row[1])
+
+    def _take_result(self) -> dict | None:
+        conn = self._connection()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            row = conn.execute("SELECT id, payload FROM broker_results ORDER BY id LIMIT 1").fetchone()
+            if row is not None:
+                conn.execute("DELETE FROM broker_results WHERE id = ?", (row[0],))
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+        return None if row is None else pickle.loads(row[1])
+
+    def submit(self, task: dict) -> None:
+        self._connection().execute("INSERT INTO broker_tasks (payload) VALUES (?)", (pickle.dumps(task),))
+
+    def next_task(self, timeout: float | None = None) -> dict | None:
+        return self._poll(self._take_task, timeout)
+
+    def publish_result(self, result: dict) -> None:
+        self._connection().execute("INSERT INTO broker_results (payload) VALUES (?)", (pickle.dumps(result),))
+
+    def next_result(self, timeout: float | None = None) -> dict | None:
+        return self._poll(self._take_result, timeout)
+
+
+def agent_task(agent) -> dict:
+    """
+    Serialises everything a worker needs to run an agent: its prompt (including the context
+    received so far), model, backstory and tool references.
+
+    Tools are referenced by module and name rather than pickled, so they must be defined at
+    module level in an importable module.
+
+    Args:
+        agent (Agent): The agent to run remotely.
+
+    Returns:
+        dict: The task.
+    """
+    react_agent = agent.react_agent
+    return {
+        "task_id": uuid.uuid4().hex,
+        "agent": agent.name,
+        "model": react_agent.model,
+        "system_prompt": agent.backstory,
+        "prompt": agent.create_prompt(),
+        "tools": [(tool.fn.__module__, tool.fn.__name__) for tool in react_agent.tools],
+        "stream": react_agent.stream,
+    }
+
+
+def _resolve_tool(module_name: str, name: str) -> Tool:
+    obj = getattr(importlib.import_module(module_name), name)
+    return obj if isinstance(obj, Tool) else make_tool(obj)
+
+
+def run_task(task: dict) -> dict:
+    """
+    Runs a task submitted by `agent_task` in the current process, under the task's `timeout`
+    (in seconds) if the coordinator set one.
+
+    Args:
+        task (dict): The task.
+
+    Returns:
+        dict: The task id and agent name, with either an `output` or an `error`.
+    """
+    result = {"task_id": task["task_id"], "agent": task["agent"]}
+    try:
+        react_agent = ReactAgent(
+            tools=[_resolve_tool(module_name, name) for module_name, name in task["tools"]],
+            model=task["model"],
+            system_prompt=task["system_prompt"],
+            stream=task.get("stream", False),
+        )
+        deadline = Deadline(task.get("timeout"), name=f"Agent {task['agent']}")
+        with deadline_scope(deadline):
+            result["output"] = react_agent.run(user_msg=task["prompt"])
+    except Exception as e:
+        result["error"] = f"{type(e).__name__}: {e}"
+    return result
+
+
+def run_worker(broker: Broker, poll_timeout: float = 1.0) -> None:
+    """
+    Takes tasks from the broker and publishes their results until a stop message arrives.
+
+    Before running a task, the worker announces it with a `STARTED` message carrying its pid,
+    so that the coordinator can fail the task if the worker dies.
+
+    Args:
+        broker (Broker): The broker shared with the coordinator.
+        poll_timeout (float, optional): Seconds to wait for a task before polling again.
+    """
+    while True:
+        task = broker.next_task(timeout=poll_timeout)
+        if task is None:
+            continue
+        if task.get("type") == STOP:
+            return
+        broker.publish_result({"type": STARTED, "task_id": task["task_id"], "pid": os.getpid()})
+        broker.publish_result(run_task(task))
+
+
+def start_workers(broker: Broker, count: int, context: str | None = None) -> list:
+    """
+    Starts `count` local worker processes serving `broker`.
+
+    Args:
+        broker (Broker): The broker shared with the coordinator.
+        count (int): The number of worker processes.
+        context (str | None, optional): The multiprocessing start method. Defaults to the platform default.
+
+    Returns:
+        list[multiprocessing.Process]: The started processes.
+    """
+    mp_context = multiprocessing.get_context(context)
+    processes = [mp_context.Process(target=run_worker, args=(broker,), daemon=True) for _ in range(count)]
+    for process in processes:
+        process.start()
+    return processes
+
+
+def stop_workers(broker: Broker, processes: list) -> None:
+    """
+    Asks the worker processes to stop and waits for them.
+
+    Args:
+        broker (Broker): The broker shared with the workers.
+        processes (list[multiprocessing.Process]): The processes returned by `start_workers`.
+    """
+    for _ in processes:
+        broker.submit({"type": STOP})
+    for process in processes:
+        process.join()
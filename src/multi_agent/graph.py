@@ -0,0 +1,292 @@
+import itertools
+import threading
+from array import array
+from collections import deque
+
+
+class AgentSet:
+    """
+    An insertion-ordered set of agents, used for `Agent.dependencies` and `Agent.dependents`.
+
+    Membership tests are O(1), repeated edges are ignored, and iteration follows insertion order
+    so that context is still delivered in a deterministic order.
+
+    Args:
+        agents (Iterable[Agent], optional): Initial agents.
+    """
+
+    def __init__(self, agents=()):
+        self._agents = dict.fromkeys(agents)
+
+    def add(self, agent) -> bool:
+        """
+        Adds an agent.
+
+        Args:
+            agent (Agent): The agent.
+
+        Returns:
+            bool: False if the agent was already present.
+        """
+        if agent in self._agents:
+            return False
+        self._agents[agent] = None
+        return True
+
+    def discard(self, agent) -> None:
+        """Removes an agent if present."""
+        self._agents.pop(agent, None)
+
+    def __contains__(self, agent) -> bool:
+        return agent in self._agents
+
+    def __iter__(self):
+        return iter(self._agents)
+
+    def __reversed__(self):
+        return reversed(self._agents)
+
+    def __len__(self) -> int:
+        return len(self._agents)
+
+    def __repr__(self) -> str:
+        return repr(list(self._agents))
+
+
+class OnlineTopologicalOrder:
+    """
+    Maintains a topological order of agents while dependencies are being added (Pearce-Kelly).
+
+    Every registered agent holds a position in a global order. Adding an edge that already agrees
+    with the order costs O(1); otherwise only the agents whose positions lie between the two
+    endpoints are searched and reordered, and an edge closing a cycle is rejected before the
+    graph is modified.
+
+    Attributes:
+        version (int): Number of edges added so far, used to detect stale compiled graphs.
+    """
+
+    def __init__(self):
+        self._counter = itertools.count()
+        self._lock = threading.RLock()
+        self.version = 0
+
+    def register(self, agent) -> None:
+        """
+        Gives a new agent the last position in the order.
+
+        Args:
+            agent (Agent): The agent.
+        """
+        agent._topo_index = next(self._counter)
+
+    def add_edge(self, source, target) -> None:
+        """
+        Records that `target` depends on `source`, keeping the order consistent.
+
+        Args:
+            source (Agent): The agent depended upon.
+            target (Agent): The dependent agent.
+
+        Raises:
+            ValueError: If the edge would create a circular dependency.
+        """
+        with self._lock:
+            if target in source.dependents:
+                return  # Repeated edge
+            if source is target:
+                raise ValueError(f"Agent {source.name} cannot depend on itself.")
+
+            lower, upper = target._topo_index, source._topo_index
+            if lower < upper:
+                # The target currently comes first: search the affected region only
+                forward = self._collect(target, lambda a: a.dependents, lambda a: a._topo_index <= upper, source)
+                backward = self._collect(source, lambda a: a.dependencies, lambda a: a._topo_index >= lower)
+                self._reorder(backward, forward)
+
+            source.dependents.add(target)
+            target.dependencies.add(source)
+            self.version += 1
+
+    @staticmethod
+    def _collect(start, neighbours, in_region, forbidden=None):
+        seen = {start}
+        stack = [start]
+        while stack:
+            agent = stack.pop()
+            for neighbour in neighbours(agent):
+                if neighbour is forbidden:
+                    raise ValueError(
+                        f"Adding dependency {forbidden.name} >> {start.name} would create a circular dependency."
+                    )
+                if neighbour not in seen and in_region(neighbour):
+                    seen.add(neighbour)
+                    stack.append(neighbour)
+        return seen
+
+    @staticmethod
+    def _reorder(backward, forward):
+        backward = sorted(backward, key=lambda a: a._topo_index)
+        forward = sorted(forward, key=lambda a: a._topo_index)
+        positions = sorted(agent._topo_index for agent in backward + forward)
+        for agent, position in zip(backward + forward, positions):
+            agent._topo_index = position
+
+
+topological_order = OnlineTopologicalOrder()
+
+
+class CompiledGraph:
+    """
+    A frozen, indexed form of an agent DAG.
+
+    Agents get integer ids (their position in `agents`), adjacency is stored in CSR form
+    (`indptr`/`indices` arrays, with repeated edges removed), and the in-degrees, the topological
+    order and the name -> id map are computed once so they can be reused across runs.
+
+    The graph is a snapshot: compile again after adding agents or dependencies. A dependency
+    added after compilation marks the graph as `stale`.
+
+    Attributes:
+        agents (tuple[Agent, ...]): The agents, indexed by id.
+        version (int): The edge version of `topological_order` the graph was compiled from.
+        name_to_id (dict): Maps each agent name to its id.
+        dependents_indptr (array): CSR row pointers of the dependents adjacency.
+        dependents_indices (array): CSR column indices of the dependents adjacency.
+        dependencies_indptr (array): CSR row pointers of the dependencies adjacency.
+        dependencies_indices (array): CSR column indices of the dependencies adjacency.
+        in_degree (array): Number of distinct dependencies of each agent.
+        order (array): Agent ids in topological order.
+
+    Args:
+        agents (list[Agent]): The agents of the graph. Edges to agents outside the list are ignored.
+
+    Raises:
+        ValueError: If there's a circular dependency among the agents.
+    """
+
+    def __init__(self, agents):
+        self.version = topological_order.version  # Read first: a concurrent edge makes it stale
+        self.agents = tuple(agents)
+        self._ids = {agent: i for i, agent in enumerate(self.agents)}
+        self.name_to_id = {agent.name: i for i, agent in enumerate(self.agents)}
+
+        self.dependents_indptr, self.dependents_indices = self._csr(lambda agent: agent.dependents)
+        self.dependencies_indptr, self.dependencies_indices = self._csr(lambda agent: agent.dependencies)
+        self.in_degree = array(
+            "l",
+            (self.dependencies_indptr[i + 1] - self.dependencies_indptr[i] for i in range(len(self.agents))),
+        )
+        self.order = self._topological_order()
+        self._sorted_agents = tuple(self.agents[i] for i in self.order)
+
+    def _csr(self, neighbours):
+        indptr = array("l", [0])
+        indices = array("l")
+        for agent in self.agents:
+            ids = dict.fromkeys(self._ids[other] for other in neighbours(agent) if other in self._ids)
+            indices.extend(ids)
+            indptr.append(len(indices))
+        return indptr, indices
+
+    def _topological_order(self):
+        in_degree = array("l", self.in_degree)
+        queue = deque(i for i in range(len(self.agents)) if in_degree[i] == 0)
+        order = array("l")
+        indptr, indices = self.dependents_indptr, self.dependents_indices
+
+        while queue:
+            current = queue.popleft()
+            order.append(current)
+            for k in range(indptr[current], indptr[current + 1]):
+                dependent = indices[k]
+                in_degree[dependent] -= 1
+                if in_degree[dependent] == 0:
+                    queue.append(dependent)
+
+        if len(order) != len(self.agents):
+            raise ValueError("Circular dependencies detected, preventing execution order.")
+        return order
+
+    @property
+    def stale(self) -> bool:
+        """Whether a dependency was added since the graph was compiled."""
+        return self.version != topological_order.version
+
+    def __len__(self) -> int:
+        return len(self.agents)
+
+    def __contains__(self, agent) -> bool:
+        return agent in self._ids
+
+    def id_of(self, agent) -> int:
+        """
+        Returns the id of an agent.
+
+        Args:
+            agent (Agent): The agent.
+
+        Returns:
+            int: Its id.
+        """
+        return self._ids[agent]
+
+    def get(self, name: str):
+        """
+        Looks an agent up by name in O(1).
+
+        Args:
+            name (str): The agent name.
+
+        Returns:
+            Agent | None: The agent, or None if there's no agent with that name.
+        """
+        i = self.name_to_id.get(name)
+        return None if i is None else self.agents[i]
+
+    def sorted_agents(self) -> list:
+        """
+        Returns the agents in the precomputed topological order.
+
+        Returns:
+            list[Agent]: The sorted agents.
+        """
+        return list(self._sorted_agents)
+
+    def dependents(self, agent) -> list:
+        """
+        Returns the distinct dependents of an agent.
+
+        Args:
+            agent (Agent): The agent.
+
+        Returns:
+            list[Agent]: Its dependents.
+        """
+        i = self._ids[agent]
+        return [self.agents[j] for j in self.dependents_indices[self.dependents_indptr[i]:self.dependents_indptr[i + 1]]]
+
+    def dependencies(self, agent) -> list:
+        """
+        Returns the distinct dependencies of an agent.
+
+        Args:
+            agent (Agent): The agent.
+
+        Returns:
+            list[Agent]: Its dependencies.
+        """
+        i = self._ids[agent]
+        return [
+            self.agents[j]
+            for j in self.dependencies_indices[self.dependencies_indptr[i]:self.dependencies_indptr[i + 1]]
+        ]
+
+    def in_degrees(self) -> dict:
+        """
+        Returns the precomputed in-degree of every agent.
+
+        Returns:
+            dict: Maps each agent to its number of distinct dependencies.
+        """
+        return dict(zip(self.agents, self.in_degree))
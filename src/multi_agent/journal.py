@@ -0,0 +1,113 @@
+import json
+import sqlite3
+import threading
+import time
+import uuid
+
+AGENT_START = "start"
+AGENT_COMPLETE = "complete"
+AGENT_FAIL = "fail"
+AGENT_ROLLBACK = "rollback"
+
+
+class SagaJournal:
+    """
+    Durable write-ahead journal of saga runs, backed by an append-only SQLite table.
+
+    Every agent event of a run (start, completion with its output, failure and rollback) is
+    appended and committed before the saga moves on, so a run interrupted by a crash can be
+    replayed with `Saga.resume(run_id)` without re-running the agents that already finished.
+
+    Attributes:
+        path (str): Path of the SQLite database file.
+    """
+
+    def __init__(self, path: str = "saga_journal.db"):
+        self.path = path
+        self._lock = threading.Lock()  # Agents may complete on different threads
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=FULL")
+        self._conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS saga_events (
+                seq INTEGER PRIMARY KEY AUTOINCREMENT,
+                run_id TEXT NOT NULL,
+                agent TEXT NOT NULL,
+                event TEXT NOT NULL,
+                payload TEXT,
+                created_at REAL NOT NULL
+            )
+            """
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS saga_events_run ON saga_events (run_id, seq)")
+
+    @staticmethod
+    def new_run_id() -> str:
+        """
+        Generates a fresh identifier for a saga run.
+
+        Returns:
+            str: A unique run id.
+        """
+        return uuid.uuid4().hex
+
+    def record(self, run_id: str, agent_name: str, event: str, payload=None) -> None:
+        """
+        Appends an event to the journal. The write is committed before returning.
+
+        Args:
+            run_id (str): The run the event belongs to.
+            agent_name (str): The agent the event refers to.
+            event (str): One of `AGENT_START`, `AGENT_COMPLETE`, `AGENT_FAIL` or `AGENT_ROLLBACK`.
+            payload: Any JSON-serialisable value, e.g. the agent output or the error message.
+        """
+        with self._lock:
+            self._conn.execute(
+                "INSERT INTO saga_events (run_id, agent, event, payload, created_at) VALUES (?, ?, ?, ?, ?)",
+                (run_id, agent_name, event, json.dumps(payload), time.time()),
+            )
+
+    def events(self, run_id: str) -> list[dict]:
+        """
+        Returns the events of a run in the order they were recorded.
+
+        Args:
+            run_id (str): The run to read.
+
+        Returns:
+            list[dict]: The events, each with `agent`, `event`, `payload` and `created_at` keys.
+        """
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT agent, event, payload, created_at FROM saga_events WHERE run_id = ? ORDER BY seq",
+                (run_id,),
+            ).fetchall()
+        return [
+            {"agent": agent, "event": event, "payload": json.loads(payload), "created_at": created_at}
+            for agent, event, payload, created_at in rows
+        ]
+
+    def completed_outputs(self, run_id: str) -> dict:
+        """
+        Replays the journal of a run and returns the outputs of the agents that finished and were
+        not rolled back afterwards.
+
+        Args:
+            run_id (str): The run to replay.
+
+        Returns:
+            dict: Agent name -> output, in completion order.
+        """
+        outputs = {}
+        for event in self.events(run_id):
+            if event["event"] == AGENT_COMPLETE:
+                outputs[event["agent"]] = event["payload"]
+            elif event["event"] in (AGENT_START, AGENT_ROLLBACK):
+                outputs.pop(event["agent"], None)
+        return outputs
+
+    def close(self) -> None:
+        """Closes the underlying database connection."""
+        with self._lock:
+            self._conn.close()
@@ -0,0 +1,91 @@
+from concurrent.futures import FIRST_COMPLETED
+from concurrent.futures import ThreadPoolExecutor
+from concurrent.futures import wait
+
+
+def parallel_rollback(agents, compensate, max_workers=None, dependents=None):
+    """
+    Compensates agents following the reversed dependency DAG.
+
+    An agent is compensated only once every one of its dependents in `agents` has been
+    compensated, so a dependent is always rolled back before the agents it depends on, while
+    compensations of independent branches run concurrently on a thread pool. Dependencies are
+    followed transitively through the agents that are not compensated (e.g. memoized or
+    restored agents), so they don't break the ordering.
+
+    Args:
+        agents (list[Agent]): The executed agents to compensate.
+        compensate (Callable[[Agent], None]): Performs the rollback of a single agent. It is
+            expected to handle and report its own errors.
+        max_workers (int | None, optional): Maximum number of concurrent compensations.
+            Defaults to the ThreadPoolExecutor default.
+        dependents (Callable[[Agent], Iterable[Agent]] | None, optional): Returns the dependents
+            of an agent, e.g. from a compiled graph. Defaults to `Agent.dependents`.
+    """
+    agents = list(agents)
+    if dependents is None:
+        dependents = _dependents
+    waiting = {agent: [] for agent in agents}  # agent -> the agents compensated after it
+    pending_dependents = {}
+    for agent, nearest in _nearest_members(agents, dependents).items():
+        pending_dependents[agent] = len(nearest)
+        for dependent in nearest:
+            waiting[dependent].append(agent)
+    ready = [agent for agent in reversed(agents) if pending_dependents[agent] == 0]
+
+    if len(agents) <= 1:
+        for agent in ready:
+            compensate(agent)
+        return
+
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        running = {executor.submit(compensate, agent): agent for agent in ready}
+        while running:
+            done, _ = wait(running, return_when=FIRST_COMPLETED)
+            for future in done:
+                agent = running.pop(future)
+                future.result()
+                for dependency in waiting[agent]:
+                    pending_dependents[dependency] -= 1
+                    if pending_dependents[dependency] == 0:
+                        running[executor.submit(compensate, dependency)] = dependency
+
+
+def _dependents(agent):
+    return agent.dependents
+
+
+def _nearest_members(members, dependents):
+    """
+    Maps every agent of `members` to the members downstream of it, reached through non-members only.
+
+    A single depth-first pass visits each agent downstream of `members` once. An agent is finished
+    after all of its dependents, i.e. in reverse topological order, so its nearest members are
+    its member dependents plus the nearest members of its other dependents.
+    """
+    member_set = set(members)
+    nearest = {}
+    for root in members:
+        if root in nearest:
+            continue
+        nearest[root] = None  # Visited, not finished
+        root_dependents = list(dependents(root))
+        stack = [(root, root_dependents, iter(root_dependents))]
+        while stack:
+            agent, agent_dependents, remaining = stack[-1]
+            for dependent in remaining:
+                if dependent not in nearest:
+                    nearest[dependent] = None
+                    children = list(dependents(dependent))
+                    stack.append((dependent, children, iter(children)))
+                    break
+            else:
+                stack.pop()
+                found = set()
+                for dependent in agent_dependents:
+                    if dependent in member_set:
+                        found.add(dependent)
+                    else:
+                        found |= nearest[dependent]
+                nearest[agent] = found
+    return {agent: nearest[agent] for agent in members}
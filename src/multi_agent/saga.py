@@ -1,30 +1,35 @@
+import asyncio
+import logging
+import time
 from collections import deque
-from colorama import Fore
-from graphviz import Digraph  # type: ignore
-# from src.utils.logging import custom_print
-
-import sys
-import os
+from contextlib import contextmanager
+from concurrent.futures import FIRST_COMPLETED
+from concurrent.futures import ThreadPoolExecutor
+from concurrent.futures import wait
 
-# Get the project root by going up one level from 'applications'
-project_root = os.path.abspath(os.path.join(os.getcwd(), '..'))
-print(f"📂 Project Root: {project_root}")
-
-# Append 'src' directory to sys.path
-src_path = os.path.join(project_root, 'src')
-sys.path.append(src_path)
+from colorama import Fore
 
-# Print sys.path to verify
-print("🔍 Updated sys.path:")
-for path in sys.path:
-    print(path)
+from multi_agent.distributed import agent_task
+from multi_agent.distributed import POLL_TIMEOUT
+from multi_agent.distributed import STARTED
+from multi_agent.graph import CompiledGraph
+from multi_agent.journal import AGENT_COMPLETE
+from multi_agent.journal import AGENT_FAIL
+from multi_agent.journal import AGENT_ROLLBACK
+from multi_agent.journal import AGENT_START
+from multi_agent.rollback import parallel_rollback
+from utils.deadline import Cancelled
+from utils.deadline import Deadline
+from utils.deadline import deadline_scope
+from utils.logging import custom_print
+from utils.logging import log_event
+from utils.profiling import profile_section
+from utils.tracing import AGENT
+from utils.tracing import SAGA
+from utils.tracing import set_span_attributes
+from utils.tracing import span
+from utils.tracing import Tracer
 
-# Try importing Saga again
-try:
-    from utils.logging import custom_print
-    print("✅ Utils imported successfully!")
-except ModuleNotFoundError as e:
-    print("❌ Import failed:", e)
 
 class Saga:
     """
@@ -32,58 +37,898 @@ class Saga:
 
     Key Functions:
     1) `transaction_manager` - Initializes agents, sets dependencies.
-    2) `saga_coordinator` - Runs agents with or without rollback.
+    2) `saga_coordinator` - Runs agents with or without rollback (`arun` for asyncio).
     3) `intra_agent` - Prints intra-agent details.
     4) `inter_agent` - Prints inter-agent relationships.
     5) `select_context` - User input node and context display.
-    6) `restore_context` - Rolls back a selected node.
+    6) `restore_context` - Rolls back a selected node, optionally re-running its downstream subgraph.
+    7) `resume` - Resumes an interrupted run from the journal.
 
     Attributes:
         agents (list): List of all registered agents.
         context (dict): Stores execution context per agent.
+        journal (SagaJournal | None): Write-ahead journal recording every agent event, if any.
+        run_id (str | None): Identifier of the current or last run in the journal.
+        rollback_workers (int | None): Maximum number of compensations running at the same time.
+        scheduler (CriticalPathScheduler | None): Orders ready agents by remaining critical path.
+        schedule_report (dict | None): Predicted versus actual makespan of the last run, if scheduled.
+        error (Exception | None): The error that halted the last run, if any.
+        broker (Broker | None): Broker handing agents to worker processes in distributed mode.
+        workers (list[multiprocessing.Process] | None): Local worker processes checked for
+            liveness in distributed mode, if given.
+        graph (CompiledGraph | None): Frozen, indexed form of the agent graph, set by `compile`.
+        timeout (float | None): Maximum number of seconds of a whole run.
+        agent_timeout (float | None): Default maximum number of seconds of each agent.
+        deadline (Deadline | None): Deadline of the current or last run.
+        tracer (Tracer): Collects the spans of every run: saga run -> agent -> ReAct round ->
+            completion / tool call, with latencies, tokens, models, retries and outcomes.
+        profiler (Profiler | None): Profiles every agent and tool call of the runs, if set.
+        memo (ResponseCache | None): Store of agent outputs keyed by `Agent.memo_key`, if set.
+        memo_report (dict | None): The agents of the last run that were `skipped` (their output
+            was memoized) and the ones that `ran`, if memoized.
+
+    Args:
+        journal (SagaJournal | None, optional): Journal used to make runs resumable. Every event
+            is committed (and synced) to disk before the run moves on; in `arun`, the writes run
+            in a worker thread instead of blocking the event loop. Defaults to None.
+        rollback_workers (int | None, optional): Maximum number of concurrent compensations.
+            Defaults to the ThreadPoolExecutor default.
+        scheduler (CriticalPathScheduler | None, optional): Scheduler used to pick the dispatch
+            order and to learn agent latencies. Defaults to None (FIFO order).
+        broker (Broker | None, optional): If given, `saga_coordinator` runs in distributed mode:
+            ready agents are sent through the broker to worker processes (see
+            `multi_agent.distributed`) instead of running in this process. Defaults to None.
+        workers (list[multiprocessing.Process] | None, optional): The local worker processes
+            serving the broker, e.g. returned by `start_workers`. While waiting for results, the
+            coordinator fails the agents whose worker died, and every pending agent once no
+            worker is left alive. Defaults to None (workers are not checked).
+        timeout (float | None, optional): Maximum number of seconds of a run. Defaults to None.
+        agent_timeout (float | None, optional): Maximum number of seconds of each agent, unless the
+            agent sets its own `timeout`. Defaults to None.
+        tracer (Tracer | None, optional): Tracer recording the runs' spans. Defaults to a new one.
+        profiler (Profiler | None, optional): If given, every agent run and tool call is profiled
+            (cProfile and tracemalloc), per-agent profiles are written to the profiler's output
+            directory and a merged summary is written at the end of each run. Agents of a
+            distributed run execute in worker processes and are not profiled. Defaults to None.
+        memo (ResponseCache | None, optional): If given, agent outputs are memoized in it (see
+            `utils.cache`): an agent whose task, expected output, backstory, model, tools and
+            upstream context are unchanged is skipped and its stored output is reused. With a
+            disk path, agents are skipped across runs and processes. Defaults to None.
+
+    A memoized agent didn't run, so it is not rolled back when a later agent fails, and
+    `restore_context(..., recompute=True)` always re-runs the restored agent itself. Rolling an
+    agent back drops its memoized output, so the next run executes it again.
+
+    When an agent's or the run's deadline expires, the in-flight LLM request or tool call is
+    abandoned, the agent fails with `DeadlineExceeded` and the run goes through the usual
+    rollback path. After the first failure the other agents in flight are cancelled: they stop at
+    their next checkpoint (between ReAct rounds and tool calls), or immediately in `arun`.
     """
 
-    def __init__(self):
+    def __init__(
+        self,
+        journal=None,
+        rollback_workers=None,
+        scheduler=None,
+        broker=None,
+        timeout=None,
+        agent_timeout=None,
+        tracer=None,
+        profiler=None,
+        memo=None,
+        workers=None,
+    ):
         self.agents = []
         self.context = {}  # Stores execution results for rollback and context tracking
+        self.journal = journal
+        self.run_id = None
+        self.rollback_workers = rollback_workers
+        self.scheduler = scheduler
+        self.schedule_report = None
+        self.error = None
+        self.broker = broker
+        self.workers = workers
+        self.graph = None
+        self.timeout = timeout
+        self.agent_timeout = agent_timeout
+        self.deadline = None
+        self.tracer = tracer or Tracer()
+        self._span = None  # Span of the current run
+        self.profiler = profiler
+        self.memo = memo
+        self.memo_report = None
+        self._memo_keys = {}  # Agent -> key of its inputs in the current run
+        self._memo_stored = {}  # Agent -> key its current output is memoized under
+        self._memoized = set()  # Agents skipped in the current run
+        self._memo_bypass = set()  # Agents that must run even if memoized
 
     def transaction_manager(self, agents):
         """
         Defines the transaction context, initializes agents, and sets dependencies.
         """
         self.agents = agents
+        self.graph = None
         custom_print("🛠 Transaction Manager: Agents and dependencies initialized.")
 
-    def saga_coordinator(self, with_rollback=True):
+    def compile(self):
+        """
+        Freezes the agent graph into an indexed form (integer ids, CSR adjacency, name -> id map)
+        whose topological order and in-degrees are computed once and reused by every run.
+
+        Dependencies added afterwards are picked up by recompiling the graph on its next use.
+
+        Returns:
+            CompiledGraph: The compiled graph.
+
+        Raises:
+            ValueError: If there's a circular dependency among the agents.
+        """
+        self.graph = CompiledGraph(self.agents)
+        return self.graph
+
+    def _compiled(self):
+        """
+        Returns the compiled graph, recompiled first if dependencies were added since, or None.
+        """
+        if self.graph is not None and self.graph.stale:
+            self.compile()
+        return self.graph
+
+    def saga_coordinator(self, with_rollback=True, max_workers=1, run_id=None):
         """
         Runs all agents in topological order with optional rollback on failure.
+
+        Args:
+            with_rollback (bool): If True, rolls back executed agents on failure.
+            max_workers (int): Maximum number of agents running at the same time. With the default
+                of 1 agents run one after another; with more, every agent is dispatched as soon as
+                all of its dependencies have completed.
+            run_id (str | None): Journal identifier of this run. A new one is generated if omitted.
+        """
+        self._begin_run(run_id)
+        self._execute(self.topological_sort(), with_rollback, max_workers)
+
+    def resume(self, run_id, with_rollback=True, max_workers=1):
+        """
+        Resumes an interrupted run by replaying its journal.
+
+        Agents whose completion was journaled (and not rolled back since) are not run again: their
+        outputs are restored into `self.context` and delivered to their dependents. Only the agents
+        that never finished are executed. If the resumed run fails, the restored agents are rolled
+        back together with the executed ones.
+
+        Args:
+            run_id (str): Journal identifier of the run to resume.
+            with_rollback (bool): If True, rolls back executed agents on failure.
+            max_workers (int): Maximum number of agents running at the same time.
+
+        Raises:
+            ValueError: If the saga has no journal.
+        """
+        if self.journal is None:
+            raise ValueError("Cannot resume a run without a journal.")
+
+        self._begin_run(run_id)
+        completed = self.journal.completed_outputs(run_id)
+        pending = []
+        for agent in self.topological_sort():
+            if agent.name not in completed:
+                pending.append(agent)
+                continue
+            self.context[agent.name] = completed[agent.name]
+            for dependent in self._dependents(agent):
+                if dependent.name not in completed:
+                    dependent.receive_context(completed[agent.name], source=agent.name)
+
+        restored = [agent for agent in map(self._find_agent, completed) if agent is not None]  # Completion order
+        custom_print(f"♻️ Resuming run {run_id}: {len(completed)} agent(s) restored, {len(pending)} to run.")
+        self._execute(pending, with_rollback, max_workers, restored)
+
+    def _begin_run(self, run_id):
+        """
+        Sets the identifier of the run about to start and discards the context the agents
+        received in earlier runs, which the run delivers again.
+        """
+        if run_id is None and self.journal is not None:
+            run_id = self.journal.new_run_id()
+        self.run_id = run_id
+        self.error = None
+        self.deadline = Deadline(self.timeout, name="Saga run")
+        for agent in self.agents:
+            agent.clear_context()
+
+    def _execute(self, pending_agents, with_rollback, max_workers, restored_agents=()):
+        """
+        Runs the pending agents (in topological order) and rolls back on failure.
+
+        Dependencies outside `pending_agents` are considered already satisfied. The
+        `restored_agents`, completed by an earlier attempt of the run, are rolled back on failure
+        as if they had been executed first.
+        """
+        mode = "distributed" if self.broker is not None else "parallel" if max_workers > 1 else "sequential"
+        with self._trace_run(pending_agents, mode):
+            if self.scheduler is not None:
+                # Distributed agents are all dispatched when ready: the workers bound the concurrency
+                if self.broker is not None:
+                    concurrency = len(self.workers) if self.workers else len(pending_agents)
+                else:
+                    concurrency = max_workers
+                predicted = self.scheduler.predict_makespan(pending_agents, concurrency)
+                started = time.perf_counter()
+
+            if self.broker is not None:
+                executed_agents, failed_agent, error = self._run_distributed(pending_agents)
+            elif max_workers > 1:
+                executed_agents, failed_agent, error = self._run_parallel(pending_agents, max_workers)
+            else:
+                executed_agents, failed_agent, error = self._run_sequential(pending_agents)
+
+            if self.scheduler is not None:
+                self._report_schedule(predicted, time.perf_counter() - started)
+
+            if error is not None:
+                executed_agents = list(restored_agents) + executed_agents
+                self._halt(failed_agent, error, executed_agents if with_rollback else None)
+
+    @contextmanager
+    def _trace_run(self, agents, mode):
+        """
+        Traces a run as the root span of its agents' spans. A run halted by an agent's failure
+        ends with that error. With a profiler, the merged profile summary is written at the end,
+        and with a memo, the agents skipped by the run are reported.
+        """
+        self._span = self.tracer.start_span(
+            "saga.run", SAGA, run_id=self.run_id or "", agents=len(agents), mode=mode
+        )
+        self._memo_keys = {}
+        self._memoized = set()
+        try:
+            yield self._span
+        except BaseException as e:
+            self._span.finish(e)
+            raise
+        finally:
+            if self.profiler is not None:
+                self.profiler.write_summary()
+            if self.memo is not None:
+                self._report_memo(agents)
+            self._memo_bypass = set()
+        self._span.finish(self.error)
+
+    def agent_histograms(self):
+        """
+        Returns the latency histograms of the agents over the traced runs of this saga.
+
+        Returns:
+            dict: Maps each agent name to its `count`, `errors`, `mean`, `p50`, `p95`, `p99` and
+                `max` latencies (in seconds), cumulative `buckets` and summed token counts.
+        """
+        return self.tracer.histograms(AGENT, "agent")
+
+    def export_trace(self, path):
+        """
+        Appends the recorded spans to a file in the OTLP/JSON format (one document per line).
+
+        Args:
+            path (str): The output file.
+
+        Returns:
+            int: The number of exported spans.
+        """
+        return self.tracer.export_json(path)
+
+    def _report_memo(self, agents):
         """
+        Stores and prints which agents of a memoized run were skipped and which ones ran.
+        """
+        skipped = [agent.name for agent in agents if agent in self._memoized]
+        ran = [agent.name for agent in agents if agent in self._memo_keys and agent not in self._memoized]
+        self.memo_report = {"skipped": skipped, "ran": ran}
+        self._span.set(memoized=len(skipped))
+        log_event(
+            "saga.memo",
+            f"💾 Memoized agents: {len(skipped)} skipped, {len(ran)} run.",
+            color=Fore.CYAN,
+            run_id=self.run_id,
+            skipped=skipped,
+            ran=ran,
+        )
+
+    def _report_schedule(self, predicted, actual):
+        """
+        Stores and prints the predicted versus actual makespan of a scheduled run.
+        """
+        self.schedule_report = {"predicted_makespan": predicted, "actual_makespan": actual}
+        self.scheduler.tracker.save()
+        log_event(
+            "saga.makespan",
+            f"⏱ Makespan: predicted {predicted:.2f}s, actual {actual:.2f}s",
+            color=Fore.CYAN,
+            run_id=self.run_id,
+            predicted=predicted,
+            actual=actual,
+        )
+
+    async def arun(self, with_rollback=True, max_concurrency=None, run_id=None):
+        """
+        Asynchronous counterpart of `saga_coordinator`.
+
+        Every agent is scheduled on the running event loop as soon as all of its dependencies
+        have completed, so a single loop can drive many concurrent sagas and their DAG branches.
+
+        Args:
+            with_rollback (bool): If True, rolls back executed agents on failure.
+            max_concurrency (int | None): Maximum number of agents of this saga running at the
+                same time. None means no limit.
+            run_id (str | None): Journal identifier of this run. A new one is generated if omitted.
+        """
+        self._begin_run(run_id)
         sorted_agents = self.topological_sort()
+        semaphore = asyncio.Semaphore(max_concurrency) if max_concurrency else None
+
+        async def run_agent(agent):
+            if semaphore is None:
+                return await self._arun_timed(agent)
+            async with semaphore:
+                return await self._arun_timed(agent)
+
+        async def run_with_deadline(agent):
+            deadline = self._agent_deadline(agent)
+            with deadline_scope(deadline):
+                deadline.check()
+                try:
+                    return await asyncio.wait_for(run_agent(agent), deadline.remaining())
+                except asyncio.TimeoutError:
+                    if deadline.expired():
+                        raise deadline.exceeded() from None
+                    raise
+
+        with self._trace_run(sorted_agents, "async"):
+            if self.scheduler is not None:
+                predicted = self.scheduler.predict_makespan(sorted_agents, max_concurrency or len(sorted_agents))
+                started = time.perf_counter()
+
+            in_degree = self._pending_in_degree(sorted_agents)
+            ready = self._ready_queue(sorted_agents)
+            ready.extend(agent for agent in sorted_agents if in_degree[agent] == 0)
+            running = {}
+            executed_agents = []
+            failed_agent, error = None, None
+
+            while ready or running:
+                while ready and error is None:
+                    agent = ready.popleft()
+                    await self._journaled(self._start_agent, agent, False)
+                    running[asyncio.ensure_future(run_with_deadline(agent))] = agent
+
+                if not running:
+                    break
+
+                # Once cancelled, the remaining tasks only need to unwind
+                timeout = self.deadline.remaining() if error is None else None
+                done, _ = await asyncio.wait(running, timeout=timeout, return_when=asyncio.FIRST_COMPLETED)
+                if not done:
+                    # The run's deadline expired: cancel every agent still in flight
+                    failed_agent, error = next(iter(running.values())), self.deadline.exceeded()
+                    self._cancel_run(failed_agent, error, running)
+                    continue
+
+                for task in done:
+                    agent = running.pop(task)
+                    try:
+                        result = task.result()
+                    except asyncio.CancelledError:
+                        await self._journaled(
+                            self._fail_agent, agent, Cancelled(f"{agent.name} cancelled: {self.deadline.cancelled}")
+                        )
+                        continue
+                    except Exception as e:
+                        await self._journaled(self._fail_agent, agent, e)
+                        if error is None:
+                            failed_agent, error = agent, e
+                            self._cancel_run(agent, e, running)
+                        continue
+
+                    await self._journaled(self._complete_agent, agent, result, executed_agents)
+                    self._release_dependents(agent, in_degree, ready)
+
+            if self.scheduler is not None:
+                self._report_schedule(predicted, time.perf_counter() - started)
+
+            if error is not None:
+                await asyncio.to_thread(
+                    self._halt, failed_agent, error, executed_agents if with_rollback else None
+                )
+
+    async def _journaled(self, record, *args):
+        """
+        Calls a bookkeeping method of `arun` that journals an event. With a journal, it runs in a
+        worker thread, so that the event loop isn't blocked while the event is committed to disk.
+        """
+        if self.journal is None:
+            return record(*args)
+        return await asyncio.to_thread(record, *args)
+
+    def _run_sequential(self, sorted_agents):
+        """
+        Runs the agents one after another, stopping at the first failure.
+
+        Returns:
+            tuple: The executed agents in completion order, the failed agent and its error.
+        """
         executed_agents = []
+        for agent in sorted_agents:
+            self._start_agent(agent)
+            try:
+                result = self._run_timed(agent, self._agent_deadline(agent))
+            except Exception as e:
+                self._fail_agent(agent, e)
+                return executed_agents, agent, e
+            self._complete_agent(agent, result, executed_agents)
+        return executed_agents, None, None
+
+    def _run_parallel(self, sorted_agents, max_workers):
+        """
+        Runs the agents on a thread pool, dispatching each one as soon as its in-degree hits zero.
+
+        After the first failure no new agents are dispatched and the agents already in flight are
+        cancelled; the ones finishing anyway are kept so that they can be rolled back as well. When
+        the run's deadline expires, the agents still in flight are abandoned.
 
+        Returns:
+            tuple: The executed agents in completion order, the failed agent and its error.
+        """
+        in_degree = self._pending_in_degree(sorted_agents)
+        ready = self._ready_queue(sorted_agents)
+        ready.extend(agent for agent in sorted_agents if in_degree[agent] == 0)
+        running = {}
+        executed_agents = []
+        failed_agent, error = None, None
+        abandoned = False  # Whether agents were left running past the run's deadline
+
+        executor = ThreadPoolExecutor(max_workers=max_workers)
         try:
-            for agent in sorted_agents:
-                custom_print(f"🚀 Running Agent: {agent.name}")
-                result = agent.run()
-                self.context[agent.name] = result  # Store execution context
-                executed_agents.append(agent)
-                print(Fore.GREEN + f"✅ {agent.name} completed successfully.")
+            while ready or running:
+                while ready and error is None and len(running) < max_workers:
+                    agent = ready.popleft()
+                    self._start_agent(agent)
+                    running[executor.submit(self._run_timed, agent, self._agent_deadline(agent))] = agent
 
-        except Exception as e:
-            print(Fore.RED + f"❌ ERROR in {agent.name}: {str(e)}")
+                if not running:
+                    break
+
+                done, _ = wait(running, timeout=self.deadline.remaining(), return_when=FIRST_COMPLETED)
+                if not done:
+                    # The run's deadline expired: stop waiting for the agents still in flight
+                    expired = self.deadline.exceeded()
+                    if error is None:
+                        failed_agent, error = next(iter(running.values())), expired
+                        self._cancel_run(failed_agent, expired)
+                    for agent in running.values():
+                        self._fail_agent(agent, expired)
+                    abandoned = True
+                    running.clear()
+                    break
 
-            if with_rollback:
-                print(Fore.YELLOW + "🔄 Rolling back executed agents...")
-                for completed_agent in reversed(executed_agents):
+                for future in done:
+                    agent = running.pop(future)
                     try:
-                        completed_agent.rollback()
-                        print(Fore.BLUE + f"↩️ Rolled back: {completed_agent.name}")
-                    except AttributeError:
-                        print(Fore.RED + f"⚠️ {completed_agent.name} has no rollback method.")
-                    except Exception as rollback_error:
-                        print(Fore.RED + f"⚠️ Error rolling back {completed_agent.name}: {rollback_error}")
+                        result = future.result()
+                    except Exception as e:
+                        self._fail_agent(agent, e)
+                        if error is None:
+                            failed_agent, error = agent, e
+                            self._cancel_run(agent, e)
+                        continue
+
+                    self._complete_agent(agent, result, executed_agents)
+                    self._release_dependents(agent, in_degree, ready)
+        finally:
+            executor.shutdown(wait=not (abandoned or running), cancel_futures=True)
 
-            print(Fore.RED + "🚨 Execution halted due to error.")
+        return executed_agents, failed_agent, error
+
+    def _run_distributed(self, sorted_agents):
+        """
+        Sends each agent to the broker as soon as its in-degree hits zero and collects the results
+        from the worker processes. Outputs are delivered to the dependents here, in the coordinator.
+
+        Returns:
+            tuple: The executed agents in completion order, the failed agent and its error.
+        """
+        in_degree = self._pending_in_degree(sorted_agents)
+        ready = self._ready_queue(sorted_agents)
+        ready.extend(agent for agent in sorted_agents if in_degree[agent] == 0)
+        in_flight = {}  # task id -> (agent, dispatch time, deadline, span)
+        worker_pids = {}  # task id -> pid of the worker running it
+        executed_agents = []
+        failed_agent, error = None, None
+
+        while ready or in_flight:
+            while ready and error is None:
+                agent = ready.popleft()
+                self._start_agent(agent)
+                output = self._recall(agent)
+                if output is not None:
+                    self._complete_agent(agent, output, executed_agents)
+                    self._release_dependents(agent, in_degree, ready)
+                    continue
+                deadline = self._agent_deadline(agent)
+                task = agent_task(agent)
+                task["timeout"] = deadline.remaining()  # Enforced by the worker as well
+                agent_span = self.tracer.start_span(
+                    f"agent {agent.name}", AGENT, self._span, agent=agent.name, model=task["model"], distributed=True
+                )
+                in_flight[task["task_id"]] = (agent, time.perf_counter(), deadline, agent_span)
+                self.broker.submit(task)
+
+            if not in_flight:
+                break
+
+            result = self.broker.next_result(timeout=self._next_expiry(in_flight))
+            if result is None:
+                # Fail the agents whose deadline expired or whose worker died; their late results will be ignored
+                alive = self._live_workers()
+                for task_id, (agent, _, deadline, agent_span) in list(in_flight.items()):
+                    e = deadline.exceeded() if deadline.expired() else self._worker_lost(worker_pids.get(task_id), alive)
+                    if e is None:
+                        continue
+                    del in_flight[task_id]
+                    agent_span.finish(e)
+                    self._fail_agent(agent, e)
+                    if error is None:
+                        failed_agent, error = agent, e
+                        self._cancel_run(agent, e)
+                continue
+            if result["task_id"] not in in_flight:
+                continue  # A stale result from another run or from an expired agent
+            if result.get("type") == STARTED:
+                worker_pids[result["task_id"]] = result["pid"]
+                continue
+
+            agent, started, _, agent_span = in_flight.pop(result["task_id"])
+            if "error" in result:
+                e = RuntimeError(result["error"])
+                agent_span.finish(e)
+                self._fail_agent(agent, e)
+                if error is None:
+                    failed_agent, error = agent, e
+                    self._cancel_run(agent, e)
+                continue
+
+            output = result["output"]
+            agent_span.finish()
+            self._memorize(agent, output)
+            if self.scheduler is not None:
+                self.scheduler.record(agent, time.perf_counter() - started)
+            for dependent in self._dependents(agent):
+                dependent.receive_context(output, source=agent.name)
+            self._complete_agent(agent, output, executed_agents)
+            self._release_dependents(agent, in_degree, ready)
+
+        return executed_agents, failed_agent, error
+
+    def _agent_deadline(self, agent):
+        """
+        Creates the deadline of an agent, nested in the deadline of the run.
+        """
+        timeout = agent.timeout if getattr(agent, "timeout", None) is not None else self.agent_timeout
+        return self.deadline.child(timeout, name=f"Agent {agent.name}")
+
+    def _cancel_run(self, failed_agent, error, tasks=None):
+        """
+        Cancels the agents still in flight after a failure: threads and workers stop at their next
+        checkpoint, asyncio `tasks` are cancelled right away.
+        """
+        self.deadline.cancel(f"{failed_agent.name} failed ({error})")
+        for task in tasks or ():
+            task.cancel()
+
+    def _next_expiry(self, in_flight):
+        """
+        Returns the seconds to wait for a result: until the first deadline of the in-flight
+        distributed agents expires, and at most `POLL_TIMEOUT` so that dead workers are noticed.
+        """
+        remaining = [deadline.remaining() for _, _, deadline, _ in in_flight.values()]
+        return min([seconds for seconds in remaining if seconds is not None] + [POLL_TIMEOUT])
+
+    def _live_workers(self):
+        """
+        Returns the pids of the live local workers, or None if the saga doesn't know its workers.
+        """
+        if self.workers is None:
+            return None
+        return {process.pid for process in self.workers if process.is_alive()}
+
+    def _worker_lost(self, pid, alive):
+        """
+        Returns the error of a distributed agent that can't complete anymore, if any: its worker
+        died, or it was never picked up and no worker is left alive.
+        """
+        if alive is None:
+            return None
+        if pid is None:
+            return None if alive else RuntimeError("No live worker left to run the agent.")
+        known = {process.pid for process in self.workers}
+        if pid in known and pid not in alive:
+            return RuntimeError(f"Worker {pid} died while running the agent.")
+        return None
+
+    def _agent_span(self, agent):
+        """
+        Traces an agent as a child of the current run's span.
+        """
+        return span(
+            f"agent {agent.name}", AGENT, parent=self._span, agent=agent.name, model=agent.react_agent.model
+        )
+
+    def _profile(self, agent):
+        """
+        Profiles an agent run, if the saga (or the enclosing profiled section) has a profiler.
+        """
+        return profile_section(f"agent.{agent.name}", self.profiler)
+
+    def _run_timed(self, agent, deadline):
+        """
+        Runs an agent under its deadline and feeds its latency to the scheduler, if any.
+        A memoized agent is skipped.
+        """
+        output = self._recall(agent)
+        if output is not None:
+            return output
+        started = time.perf_counter()
+        with self._agent_span(agent), deadline_scope(deadline), self._profile(agent):
+            deadline.check()
+            result = agent.run()
+        if self.scheduler is not None:
+            self.scheduler.record(agent, time.perf_counter() - started)
+        self._memorize(agent, result)
+        return result
+
+    async def _arun_timed(self, agent):
+        """
+        Asynchronous counterpart of `_run_timed`.
+        """
+        output = self._recall(agent)
+        if output is not None:
+            return output
+        started = time.perf_counter()
+        with self._agent_span(agent), self._profile(agent):
+            result = await agent.arun()
+        if self.scheduler is not None:
+            self.scheduler.record(agent, time.perf_counter() - started)
+        self._memorize(agent, result)
+        return result
+
+    def _recall(self, agent):
+        """
+        Looks up the memoized output of an agent about to run. On a hit, the output is delivered
+        to the agent's dependents, as `Agent.run` would.
+
+        Returns:
+            str | None: The memoized output, or None if the agent must run.
+        """
+        if self.memo is None:
+            return None
+        key = self._memo_keys[agent] = agent.memo_key()
+        if agent in self._memo_bypass:
+            return None
+        output = self.memo.get(key)
+        if output is None:
+            return None
+
+        with self._agent_span(agent):
+            set_span_attributes(memoized=True)
+        for dependent in self._dependents(agent):
+            dependent.receive_context(output, source=agent.name)
+        self._memoized.add(agent)
+        self._memo_stored[agent] = key
+        log_event(
+            "agent.memoized",
+            f"💾 {agent.name} skipped: inputs unchanged, reusing its memoized output.",
+            color=Fore.CYAN,
+            agent=agent.name,
+            run_id=self.run_id,
+        )
+        return output
+
+    def _memorize(self, agent, output):
+        """
+        Memoizes the output of an agent that ran, under the key of the inputs it ran with.
+        """
+        key = self._memo_keys.get(agent)
+        if self.memo is not None and key is not None:
+            self.memo.put(key, output)
+            self._memo_stored[agent] = key
+
+    def _forget(self, agent):
+        """
+        Drops the memoized output of a rolled-back agent, whose effects no longer hold.
+        """
+        key = self._memo_stored.pop(agent, None)
+        if self.memo is not None and key is not None:
+            self.memo.delete(key)
+
+    def _ready_queue(self, agents):
+        """
+        Creates an empty ready queue: prioritised by critical path with a scheduler, FIFO otherwise.
+        """
+        if self.scheduler is not None:
+            return self.scheduler.ready_queue(agents)
+        return deque()
+
+    def _dependents(self, agent):
+        """
+        Returns the dependents of an agent, from the compiled graph if there is one.
+        """
+        graph = self._compiled()
+        if graph is not None and agent in graph:
+            return graph.dependents(agent)
+        return agent.dependents
+
+    def _dependencies(self, agent):
+        """
+        Returns the dependencies of an agent, from the compiled graph if there is one.
+        """
+        graph = self._compiled()
+        if graph is not None and agent in graph:
+            return graph.dependencies(agent)
+        return agent.dependencies
+
+    def _find_agent(self, name):
+        """
+        Looks an agent up by name, in O(1) if the graph is compiled.
+        """
+        graph = self._compiled()
+        if graph is not None:
+            return graph.get(name)
+        return next((a for a in self.agents if a.name == name), None)
+
+    def _pending_in_degree(self, sorted_agents):
+        """
+        Counts, for every pending agent, the dependencies that are still pending themselves.
+        """
+        graph = self._compiled()
+        if graph is not None and len(sorted_agents) == len(graph):
+            return graph.in_degrees()  # Full run: reuse the precomputed in-degrees
+
+        pending = set(sorted_agents)
+        return {
+            agent: sum(1 for dependency in self._dependencies(agent) if dependency in pending)
+            for agent in sorted_agents
+        }
+
+    def _release_dependents(self, agent, in_degree, ready):
+        """
+        Decrements the in-degree of the pending dependents of a completed agent and queues the
+        ones that became ready.
+        """
+        for dependent in self._dependents(agent):
+            if dependent in in_degree:
+                in_degree[dependent] -= 1
+                if in_degree[dependent] == 0:
+                    ready.append(dependent)
+
+    def _journal(self, agent, event, payload=None):
+        """
+        Appends an agent event to the journal, if the saga has one.
+        """
+        if self.journal is not None and self.run_id is not None:
+            self.journal.record(self.run_id, agent.name, event, payload)
+
+    def _start_agent(self, agent, banner=True):
+        """
+        Announces an agent about to run and journals its start.
+        """
+        log_event(
+            "agent.started",
+            f"🚀 Running Agent: {agent.name}",
+            color=Fore.MAGENTA,
+            banner=banner,
+            agent=agent.name,
+            run_id=self.run_id,
+        )
+        self._journal(agent, AGENT_START)
+
+    def _fail_agent(self, agent, error):
+        """
+        Journals the failure of an agent.
+        """
+        self._journal(agent, AGENT_FAIL, str(error))
+        log_event(
+            "agent.failed",
+            f"{agent.name} failed: {error}",
+            level=logging.DEBUG,
+            agent=agent.name,
+            run_id=self.run_id,
+            error=repr(error),
+        )
+
+    def _complete_agent(self, agent, result, executed_agents):
+        """
+        Stores the result of a successful agent and records it for rollback.
+        """
+        self._journal(agent, AGENT_COMPLETE, result)
+        self.context[agent.name] = result  # Store execution context
+        if agent not in self._memoized:  # A skipped agent has nothing to roll back
+            executed_agents.append(agent)
+        log_event(
+            "agent.completed",
+            f"✅ {agent.name} completed successfully.",
+            color=Fore.GREEN,
+            agent=agent.name,
+            run_id=self.run_id,
+        )
+
+    def _halt(self, failed_agent, error, executed_agents=None):
+        """
+        Reports a failed run and, if `executed_agents` is given, rolls them back.
+        """
+        self.error = error
+        log_event(
+            "saga.error",
+            f"❌ ERROR in {failed_agent.name}: {str(error)}",
+            level=logging.ERROR,
+            agent=failed_agent.name,
+            run_id=self.run_id,
+            error=repr(error),
+        )
+
+        if executed_agents is not None:
+            log_event(
+                "saga.rollback",
+                "🔄 Rolling back executed agents...",
+                level=logging.WARNING,
+                run_id=self.run_id,
+                agents=[agent.name for agent in executed_agents],
+            )
+            self._rollback_agents(executed_agents)
+
+        log_event("saga.halted", "🚨 Execution halted due to error.", level=logging.ERROR, run_id=self.run_id)
+
+    def _rollback_agents(self, executed_agents):
+        """
+        Rolls back the executed agents following the reversed dependency DAG.
+
+        Compensations of independent branches run in parallel, while a dependent is always
+        rolled back before the agents it depends on.
+        """
+        parallel_rollback(executed_agents, self._compensate, self.rollback_workers, self._dependents)
+
+    def _compensate(self, completed_agent):
+        """
+        Rolls back a single agent and journals it, reporting any error.
+        """
+        try:
+            completed_agent.rollback()
+            self._forget(completed_agent)
+            self._journal(completed_agent, AGENT_ROLLBACK)
+            log_event(
+                "agent.rolled_back",
+                f"↩️ Rolled back: {completed_agent.name}",
+                color=Fore.BLUE,
+                agent=completed_agent.name,
+                run_id=self.run_id,
+            )
+        except AttributeError:
+            log_event(
+                "agent.rollback_failed",
+                f"⚠️ {completed_agent.name} has no rollback method.",
+                level=logging.WARNING,
+                color=Fore.RED,
+                agent=completed_agent.name,
+                run_id=self.run_id,
+            )
+        except Exception as rollback_error:
+            self._forget(completed_agent)  # Partly undone: its output can't be trusted
+            log_event(
+                "agent.rollback_failed",
+                f"⚠️ Error rolling back {completed_agent.name}: {rollback_error}",
+                level=logging.ERROR,
+                agent=completed_agent.name,
+                run_id=self.run_id,
+                error=repr(rollback_error),
+            )
 
     def intra_agent(self):
         """
@@ -111,29 +956,106 @@ class Saga:
         else:
             print(Fore.RED + f"⚠️ No execution context found for {node_name}.")
 
-    def restore_context(self, node_name):
+    def restore_context(self, node_name, recompute=False, with_rollback=True, max_workers=1):
         """
         Rolls back the specified agent and restores its previous state.
+
+        With `recompute`, the agent and its transitive dependents are marked dirty, the dependents'
+        results are rolled back as well, and only that subgraph is re-executed. Every other result
+        in `self.context` is reused as-is.
+
+        Args:
+            node_name (str): The name of the agent to restore.
+            recompute (bool): If True, re-runs the restored agent and everything downstream of it.
+            with_rollback (bool): If True, rolls back the re-executed agents on failure.
+            max_workers (int): Maximum number of agents re-running at the same time.
         """
-        agent = next((a for a in self.agents if a.name == node_name), None)
-        if agent:
-            try:
-                agent.rollback()
-                del self.context[node_name]  # Remove from execution context
-                print(Fore.BLUE + f"🔄 {node_name} rolled back successfully.")
-            except AttributeError:
-                print(Fore.RED + f"⚠️ {node_name} has no rollback method.")
-            except Exception as e:
-                print(Fore.RED + f"⚠️ Error during rollback of {node_name}: {e}")
-        else:
-            print(Fore.RED + f"⚠️ Agent {node_name} not found.")
+        agent = self._find_agent(node_name)
+        if agent is None:
+            log_event(
+                "saga.restore", f"⚠️ Agent {node_name} not found.", level=logging.WARNING, color=Fore.RED, agent=node_name
+            )
+            return
+
+        try:
+            agent.rollback()
+            self._forget(agent)
+            self._journal(agent, AGENT_ROLLBACK)
+            del self.context[node_name]  # Remove from execution context
+            log_event("agent.rolled_back", f"🔄 {node_name} rolled back successfully.", color=Fore.BLUE, agent=node_name)
+        except AttributeError:
+            log_event(
+                "agent.rollback_failed",
+                f"⚠️ {node_name} has no rollback method.",
+                level=logging.WARNING,
+                color=Fore.RED,
+                agent=node_name,
+            )
+            return
+        except Exception as e:
+            log_event(
+                "agent.rollback_failed",
+                f"⚠️ Error during rollback of {node_name}: {e}",
+                level=logging.ERROR,
+                agent=node_name,
+                error=repr(e),
+            )
+            return
+
+        if recompute:
+            self._recompute_downstream(agent, with_rollback, max_workers)
+
+    def _recompute_downstream(self, agent, with_rollback, max_workers):
+        """
+        Re-executes `agent` and its transitive dependents, reusing every other stored result.
+        """
+        dirty = {agent}
+        stack = [agent]
+        while stack:
+            for dependent in self._dependents(stack.pop()):
+                if dependent not in dirty:
+                    dirty.add(dependent)
+                    stack.append(dependent)
+
+        dirty_agents = [a for a in self.topological_sort() if a in dirty]
+
+        # Compensate the stale downstream results before they are replaced
+        stale_agents = [a for a in dirty_agents if a is not agent and a.name in self.context]
+        self._rollback_agents(stale_agents)
+        for stale_agent in stale_agents:
+            del self.context[stale_agent.name]
+
+        # Rebuild the received context of the dirty agents from their clean dependencies
+        for dirty_agent in dirty_agents:
+            dirty_agent.clear_context()
+            for dependency in self._dependencies(dirty_agent):
+                if dependency not in dirty and dependency.name in self.context:
+                    dirty_agent.receive_context(self.context[dependency.name], source=dependency.name)
+
+        custom_print(
+            f"♻️ Recomputing {len(dirty_agents)} agent(s) downstream of {agent.name}, "
+            f"reusing {len(self.context)} stored result(s)."
+        )
+        self.error = None
+        self.deadline = Deadline(self.timeout, name="Saga run")
+        self._memo_bypass = {agent}  # Its inputs are unchanged, but it was explicitly restored
+        self._execute(dirty_agents, with_rollback, max_workers)
 
     def topological_sort(self):
         """
         Sorts agents in topological order based on dependencies.
+
+        With a scheduler, agents with the longest remaining critical path come first among those
+        whose dependencies are satisfied; otherwise the order is FIFO. A compiled graph's
+        precomputed order is reused when there is no scheduler.
         """
+        graph = self._compiled()
+        if graph is not None and self.scheduler is None:
+            return graph.sorted_agents()
+
         in_degree = {agent: len(agent.dependencies) for agent in self.agents}
-        queue = deque([agent for agent in self.agents if in_degree[agent] == 0])
+        queue = self._ready_queue(self.agents)
+        queue.extend(agent for agent in self.agents if in_degree[agent] == 0)
 
         sorted_agents = []
         while queue:
@@ -0,0 +1,227 @@
+import heapq
+import itertools
+import json
+import os
+import threading
+
+
+class LatencyTracker:
+    """
+    Keeps an exponential moving average of agent latencies, keyed by agent name and model.
+
+    Attributes:
+        alpha (float): Weight of the newest observation in the moving average.
+        default (float): Estimate, in seconds, used for agents that were never observed.
+        path (str | None): JSON file the history is loaded from and saved to, if any.
+        history (dict): Maps "agent name|model" to the average latency in seconds.
+
+    Args:
+        alpha (float, optional): Weight of the newest observation. Defaults to 0.3.
+        default (float, optional): Estimate for unseen agents, in seconds. Defaults to 1.0.
+        path (str | None, optional): JSON file used to persist the history across processes.
+    """
+
+    def __init__(self, alpha: float = 0.3, default: float = 1.0, path: str | None = None):
+        self.alpha = alpha
+        self.default = default
+        self.path = path
+        self.history = {}
+        self._lock = threading.Lock()
+
+        if path and os.path.exists(path):
+            with open(path) as f:
+                self.history = json.load(f)
+
+    @staticmethod
+    def key(agent) -> str:
+        """
+        Builds the history key of an agent from its name and model.
+
+        Args:
+            agent (Agent): The agent.
+
+        Returns:
+            str: The history key.
+        """
+        react_agent = getattr(agent, "react_agent", None)
+        return f"{agent.name}|{getattr(react_agent, 'model', '')}"
+
+    def estimate(self, agent) -> float:
+        """
+        Returns the expected latency of an agent.
+
+        Args:
+            agent (Agent): The agent.
+
+        Returns:
+            float: The moving average of its latency, or `default` if it was never observed.
+        """
+        return self.history.get(self.key(agent), self.default)
+
+    def record(self, agent, seconds: float) -> None:
+        """
+        Folds an observed latency into the moving average of an agent.
+
+        Args:
+            agent (Agent): The agent.
+            seconds (float): The observed latency.
+        """
+        key = self.key(agent)
+        with self._lock:
+            previous = self.history.get(key)
+            self.history[key] = seconds if previous is None else (
+                self.alpha * seconds + (1 - self.alpha) * previous
+            )
+
+    def save(self) -> None:
+        """Writes the history to `path`, if one was given."""
+        if not self.path:
+            return
+        with self._lock:
+            with open(self.path, "w") as f:
+                json.dump(self.history, f, indent=2)
+
+
+class ReadyQueue:
+    """
+    A ready queue popping the agent with the longest remaining critical path first.
+
+    It exposes the subset of the `deque` interface used by the topological sorts and executors
+    (`append`, `extend`, `popleft`, `len`), so it can replace a FIFO deque transparently.
+
+    Args:
+        priorities (dict): Maps each agent to its remaining critical path length.
+    """
+
+    def __init__(self, priorities: dict):
+        self.priorities = priorities
+        self._heap = []
+        self._counter = itertools.count()  # Keeps FIFO order among equal priorities
+
+    def append(self, agent) -> None:
+        heapq.heappush(self._heap, (-self.priorities.get(agent, 0.0), next(self._counter), agent))
+
+    def extend(self, agents) -> None:
+        for agent in agents:
+            self.append(agent)
+
+    def popleft(self):
+        return heapq.heappop(self._heap)[2]
+
+    def __len__(self) -> int:
+        return len(self._heap)
+
+
+class CriticalPathScheduler:
+    """
+    Orders ready agents by their remaining critical path, estimated from past latencies.
+
+    The remaining critical path of an agent is its own expected latency plus the longest
+    remaining critical path among its dependents. When workers are limited, dispatching the
+    ready agents with the longest one first keeps the makespan close to the critical path.
+
+    Attributes:
+        tracker (LatencyTracker): The latency history used for the estimates.
+
+    Args:
+        tracker (LatencyTracker | None, optional): The latency history. Defaults to a new one.
+    """
+
+    def __init__(self, tracker: LatencyTracker | None = None):
+        self.tracker = tracker or LatencyTracker()
+
+    def priorities(self, agents) -> dict:
+        """
+        Computes the remaining critical path of every agent, restricted to `agents`.
+
+        Args:
+            agents (list[Agent]): The agents to schedule.
+
+        Returns:
+            dict: Maps each agent to its remaining critical path length, in seconds.
+        """
+        members = set(agents)
+        priorities = {}
+        for root in agents:
+            if root in priorities:
+                continue
+            # Iterative post-order DFS, so that deep chains don't hit the recursion limit
+            stack = [(root, False)]
+            on_path = set()
+            while stack:
+                agent, expanded = stack.pop()
+                if expanded:
+                    on_path.discard(agent)
+                    downstream = [
+                        priorities.get(dependent, 0.0)
+                        for dependent in agent.dependents
+                        if dependent in members
+                    ]
+                    priorities[agent] = self.tracker.estimate(agent) + max(downstream, default=0.0)
+                    continue
+                if agent in priorities or agent in on_path:
+                    continue  # Already computed, or a cycle left for topological_sort to report
+                on_path.add(agent)
+                stack.append((agent, True))
+                for dependent in agent.dependents:
+                    if dependent in members and dependent not in priorities:
+                        stack.append((dependent, False))
+        return priorities
+
+    def ready_queue(self, agents) -> ReadyQueue:
+        """
+        Creates an empty ready queue prioritised for `agents`.
+
+        Args:
+            agents (list[Agent]): The agents to schedule.
+
+        Returns:
+            ReadyQueue: The priority queue.
+        """
+        return ReadyQueue(self.priorities(agents))
+
+    def predict_makespan(self, agents, max_workers: int = 1) -> float:
+        """
+        Simulates a run of `agents` on `max_workers` workers using the latency estimates.
+
+        Args:
+            agents (list[Agent]): The agents to run, in topological order.
+            max_workers (int, optional): The number of workers. Defaults to 1.
+
+        Returns:
+            float: The predicted makespan, in seconds.
+        """
+        members = set(agents)
+        in_degree = {
+            agent: sum(1 for dependency in agent.dependencies if dependency in members)
+            for agent in agents
+        }
+        ready = self.ready_queue(agents)
+        ready.extend(agent for agent in agents if in_degree[agent] == 0)
+        running = []
+        counter = itertools.count()
+        now = 0.0
+
+        while ready or running:
+            while ready and len(running) < max(max_workers, 1):
+                agent = ready.popleft()
+                heapq.heappush(running, (now + self.tracker.estimate(agent), next(counter), agent))
+
+            now, _, agent = heapq.heappop(running)
+            for dependent in agent.dependents:
+                if dependent in in_degree:
+                    in_degree[dependent] -= 1
+                    if in_degree[dependent] == 0:
+                        ready.append(dependent)
+
+        return now
+
+    def record(self, agent, seconds: float) -> None:
+        """
+        Records the observed latency of an agent.
+
+        Args:
+            agent (Agent): The agent.
+            seconds (float): The observed latency.
+        """
+        self.tracker.record(agent, seconds)
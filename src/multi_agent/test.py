@@ -1,9 +1,9 @@
 from collections import deque
 
 from colorama import Fore
-from graphviz import Digraph  # type: ignore
 
-from src.utils.logging import custom_print
+from multi_agent.rollback import parallel_rollback
+from utils.logging import custom_print
 
 
 class Saga:
@@ -104,6 +104,8 @@ class Saga:
         Returns:
             Digraph: A Graphviz Digraph object representing the agent dependencies.
         """
+        from graphviz import Digraph  # type: ignore
+
         dot = Digraph(format="png")  # Set format to PNG for inline display
 
         # Add nodes and edges for each agent in the crew
@@ -114,18 +116,22 @@ class Saga:
         return dot
 
     def rollback(self):
-        """Performs rollback for executed agents in reverse order."""
+        """Performs rollback for executed agents following the reversed dependency DAG."""
         print("\n🔄 Rolling back due to failure...\n")
-        while self.rollback_stack:
-            agent = self.rollback_stack.pop()
-            try:
-                custom_print(f"ROLLBACK AGENT: {agent.name}")
-                agent.rollback()  # Call rollback method for each completed agent
-            except Exception as e:
-                print(Fore.YELLOW + f"⚠️ Rollback failed for {agent.name}: {e}")
+        executed_agents = list(self.rollback_stack)
+        self.rollback_stack.clear()
+        parallel_rollback(executed_agents, self._compensate)
 
         print(Fore.GREEN + "✅ Rollback complete.")
 
+    def _compensate(self, agent):
+        """Rolls back a single executed agent, reporting any error."""
+        try:
+            custom_print(f"ROLLBACK AGENT: {agent.name}")
+            agent.rollback()  # Call rollback method for each completed agent
+        except Exception as e:
+            print(Fore.YELLOW + f"⚠️ Rollback failed for {agent.name}: {e}")
+
     def run(self, with_rollback=True):
         """
         Runs agents in topological order, with optional rollback on failure.
@@ -1,43 +1,30 @@
+import asyncio
 import json
 import re
+from typing import TYPE_CHECKING
 
 from colorama import Fore
-from dotenv import load_dotenv
-from openai import OpenAI
-
-import sys
-import os
-
-# Get the project root by going up one level from 'applications'
-project_root = os.path.abspath(os.path.join(os.getcwd(), '..'))
-print(f"📂 Project Root: {project_root}")
-
-# Append 'src' directory to sys.path
-src_path = os.path.join(project_root, 'src')
-sys.path.append(src_path)
-
-# Print sys.path to verify
-print("🔍 Updated sys.path:")
-for path in sys.path:
-    print(path)
-
-# Try importing Saga again
-try:
-    from tool_agent.tool import Tool
-    from tool_agent.tool import validate_arguments
-    from utils.completions import build_prompt_structure
-    from utils.completions import ChatHistory
-    from utils.completions import completions_create
-    from utils.completions import update_chat_history
-    from utils.extraction import extract_tag_content
-
-    print("✅ tool_agent.tool imported successfully!")
-    print("✅ utils.completions imported successfully!")
-    print("✅ utils.extraction imported successfully!")
-except ModuleNotFoundError as e:
-    print("❌ Import failed:", e)
-
-load_dotenv()
+
+from tool_agent.tool import Tool
+from tool_agent.tool import validate_arguments
+from utils.clients import get_async_client
+from utils.clients import get_client
+from utils.completions import acompletions_create
+from utils.completions import build_prompt_structure
+from utils.completions import ChatHistory
+from utils.completions import completions_create
+from utils.completions import update_chat_history
+from utils.deadline import call_with_deadline
+from utils.deadline import check_deadline
+from utils.extraction import extract_tag_content
+from utils.logging import log_event
+from utils.tracing import ROUND
+from utils.tracing import span
+from utils.tracing import TOOL
+
+if TYPE_CHECKING:
+    from openai import AsyncOpenAI
+    from openai import OpenAI
 
 BASE_SYSTEM_PROMPT = ""
 
@@ -87,10 +74,20 @@ class ReactAgent:
     collect tool signatures, and process multiple tool calls in a given round of interaction.
 
     Attributes:
-        client (OpenAI): The OpenAI client used to handle model-based completions.
+        client (OpenAI | None): The client used to handle model-based completions. If None, the
+            shared client of the process-wide registry (see `utils.clients`) is looked up for
+            every request, so reconfiguring the registry reaches existing agents.
+        async_client (AsyncOpenAI | None): The async client used by `arun`. If None, the shared
+            async client of the running event loop is looked up for every request.
         model (str): The name of the model used for generating responses.
         tools (list[Tool]): A list of Tool instances available for execution.
+        system_prompt (str): The base system prompt, to which the tool block is appended (once,
+            see `compiled_system_prompt`) when the agent has tools.
         tools_dict (dict): A dictionary mapping tool names to their corresponding Tool instances.
+        stream (bool): Whether completions are streamed and cut at the first closing
+            `</tool_call>` or `</response>` tag, so tools start earlier and no trailing tokens are paid.
+            Only the first tool call of a turn is then run; later `<tool_call>` blocks of the same
+            turn are never generated.
     """
 
     def __init__(
@@ -98,12 +95,18 @@ class ReactAgent:
         tools: Tool | list[Tool],
         model: str = "gpt-4o",
         system_prompt: str = BASE_SYSTEM_PROMPT,
+        client: "OpenAI | None" = None,
+        stream: bool = False,
+        async_client: "AsyncOpenAI | None" = None,
     ) -> None:
-        self.client = OpenAI()
+        self.client = client
+        self.async_client = async_client
         self.model = model
         self.system_prompt = system_prompt
         self.tools = tools if isinstance(tools, list) else [tools]
         self.tools_dict = {tool.name: tool for tool in self.tools}
+        self.stream = stream
+        self._compiled = None  # ((system prompt, tools), compiled system prompt)
 
     def add_tool_signatures(self) -> str:
         """
@@ -114,9 +117,30 @@ class ReactAgent:
         """
         return "".join([tool.fn_signature for tool in self.tools])
 
+    def compiled_system_prompt(self) -> str:
+        """
+        Returns the system prompt followed by the ReAct instructions and tool signatures.
+
+        It is built once per agent and reused by every run, so that it is byte-identical across
+        runs and rounds (provider-side prompt caching then covers it). It is only rebuilt if
+        `system_prompt` or `tools` are replaced.
+
+        Returns:
+            str: The compiled system prompt.
+        """
+        key = (self.system_prompt, tuple(self.tools))
+        compiled = self._compiled
+        if compiled is None or compiled[0] != key:
+            prompt = self.system_prompt
+            if self.tools:
+                prompt += "\n" + REACT_SYSTEM_PROMPT % self.add_tool_signatures()
+            compiled = self._compiled = (key, prompt)
+        return compiled[1]
+
     def process_tool_calls(self, tool_calls_content: list) -> dict:
         """
         Processes each tool call, validates arguments, executes the tools, and collects results.
+        Tool calls are abandoned if the current deadline expires while they run.
 
         Args:
             tool_calls_content (list): List of strings, each representing a tool call in JSON format.
@@ -130,16 +154,19 @@ class ReactAgent:
             tool_name = tool_call["name"]
             tool = self.tools_dict[tool_name]
 
-            print(Fore.GREEN + f"\nUsing Tool: {tool_name}")
+            log_event("tool.selected", f"\nUsing Tool: {tool_name}", color=Fore.GREEN, tool=tool_name)
 
             # Validate and execute the tool call
             validated_tool_call = validate_arguments(
                 tool_call, json.loads(tool.fn_signature)
             )
-            print(Fore.GREEN + f"\nTool call dict: \n{validated_tool_call}")
+            log_event(
+                "tool.call", f"\nTool call dict: \n{validated_tool_call}", color=Fore.GREEN, tool=tool_name
+            )
 
-            result = tool.run(**validated_tool_call["arguments"])
-            print(Fore.GREEN + f"\nTool result: \n{result}")
+            with span(f"tool {tool_name}", TOOL, tool=tool_name):
+                result = call_with_deadline(tool.run, **validated_tool_call["arguments"])
+            log_event("tool.result", f"\nTool result: \n{result}", color=Fore.GREEN, tool=tool_name)
 
             # Store the result using the tool call ID
             observations[validated_tool_call["id"]] = result
@@ -156,6 +183,10 @@ class ReactAgent:
         handles tool calls, and updates chat history until a final response is ready or the maximum
         number of rounds is reached.
 
+        Under a deadline (see `utils.deadline`), every round is a cancellation checkpoint, the
+        completion requests are given the remaining time as timeout, and tool calls are abandoned
+        when the deadline expires.
+
         Args:
             user_msg (str): The user's input message to start the interaction.
             max_rounds (int, optional): Maximum number of interaction rounds the agent should perform. Default is 10.
@@ -163,44 +194,121 @@ class ReactAgent:
         Returns:
             str: The final response generated by the agent after processing user input and any tool calls.
         """
+        chat_history = self._build_chat_history(user_msg)
+
+        if self.tools:
+            # Run the ReAct loop for max_rounds
+            for round_index in range(max_rounds):
+                check_deadline()
+
+                with span(f"react.round {round_index}", ROUND, round=round_index, model=self.model):
+                    completion = completions_create(self._client(), chat_history, self.model, stream=self.stream)
+
+                    response = self._process_completion(completion, chat_history)
+                    if response is not None:
+                        return response
+
+                    tool_calls = extract_tag_content(str(completion), "tool_call")
+                    if tool_calls.found:
+                        observations = self.process_tool_calls(tool_calls.content)
+                        log_event("react.observations", f"\nObservations: {observations}", color=Fore.BLUE)
+                        update_chat_history(chat_history, f"{observations}", "user")
+
+        check_deadline()
+        with span("react.final", ROUND, model=self.model):
+            return completions_create(self._client(), chat_history, self.model, stream=self.stream)
+
+    async def arun(
+        self,
+        user_msg: str,
+        max_rounds: int = 5,
+    ) -> str:
+        """
+        Asynchronous counterpart of `run`. Completions are awaited on the async client and
+        tool calls are executed in a worker thread, so the event loop is never blocked.
+
+        Args:
+            user_msg (str): The user's input message to start the interaction.
+            max_rounds (int, optional): Maximum number of interaction rounds the agent should perform. Default is 5.
+
+        Returns:
+            str: The final response generated by the agent after processing user input and any tool calls.
+        """
+        chat_history = self._build_chat_history(user_msg)
+
+        if self.tools:
+            for round_index in range(max_rounds):
+                check_deadline()
+
+                with span(f"react.round {round_index}", ROUND, round=round_index, model=self.model):
+                    completion = await acompletions_create(
+                        self._async_client(), chat_history, self.model, stream=self.stream
+                    )
+
+                    response = self._process_completion(completion, chat_history)
+                    if response is not None:
+                        return response
+
+                    tool_calls = extract_tag_content(str(completion), "tool_call")
+                    if tool_calls.found:
+                        observations = await asyncio.to_thread(self.process_tool_calls, tool_calls.content)
+                        log_event("react.observations", f"\nObservations: {observations}", color=Fore.BLUE)
+                        update_chat_history(chat_history, f"{observations}", "user")
+
+        check_deadline()
+        with span("react.final", ROUND, model=self.model):
+            return await acompletions_create(self._async_client(), chat_history, self.model, stream=self.stream)
+
+    def _client(self):
+        """Returns the client of the next request: the injected one, or the registry's."""
+        return self.client or get_client()
+
+    def _async_client(self):
+        """Returns the async client of the next request: the injected one, or the registry's."""
+        return self.async_client or get_async_client()
+
+    def _build_chat_history(self, user_msg: str) -> ChatHistory:
+        """
+        Builds the initial chat history made of the compiled system prompt and the user's question.
+
+        Args:
+            user_msg (str): The user's input message to start the interaction.
+
+        Returns:
+            ChatHistory: The chat history to start the ReAct loop with.
+        """
         user_prompt = build_prompt_structure(
             prompt=user_msg, role="user", tag="question"
         )
-        if self.tools:
-            self.system_prompt += (
-                "\n" + REACT_SYSTEM_PROMPT % self.add_tool_signatures()
-            )
-
-        chat_history = ChatHistory(
+        return ChatHistory(
             [
                 build_prompt_structure(
-                    prompt=self.system_prompt,
+                    prompt=self.compiled_system_prompt(),
                     role="system",
                 ),
                 user_prompt,
             ]
         )
 
-        if self.tools:
-            # Run the ReAct loop for max_rounds
-            for _ in range(max_rounds):
-
-                completion = completions_create(self.client, chat_history, self.model)
-
-                response = extract_tag_content(str(completion), "response")
-                if response.found:
-                    return response.content[0]
+    def _process_completion(self, completion: str, chat_history: ChatHistory) -> str | None:
+        """
+        Handles a single ReAct round: returns the final response if the model produced one,
+        otherwise records the completion in the chat history and prints the model's thought.
 
-                thought = extract_tag_content(str(completion), "thought")
-                tool_calls = extract_tag_content(str(completion), "tool_call")
+        Args:
+            completion (str): The completion returned by the model for this round.
+            chat_history (ChatHistory): The chat history of the current session.
 
-                update_chat_history(chat_history, completion, "assistant")
+        Returns:
+            str | None: The content of the <response> tag, or None if the loop must continue.
+        """
+        response = extract_tag_content(str(completion), "response")
+        if response.found:
+            return response.content[0]
 
-                print(Fore.MAGENTA + f"\nThought: {thought.content[0]}")
+        thought = extract_tag_content(str(completion), "thought")
 
-                if tool_calls.found:
-                    observations = self.process_tool_calls(tool_calls.content)
-                    print(Fore.BLUE + f"\nObservations: {observations}")
-                    update_chat_history(chat_history, f"{observations}", "user")
+        update_chat_history(chat_history, completion, "assistant")
 
-        return completions_create(self.client, chat_history, self.model)
\ No newline at end of file
+        log_event("react.thought", f"\nThought: {thought.content[0]}", color=Fore.MAGENTA)
+        return None
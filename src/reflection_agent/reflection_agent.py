@@ -1,14 +1,12 @@
 from colorama import Fore
-from dotenv import load_dotenv
-from openai import OpenAI
 
-from src.utils.completions import build_prompt_structure
-from src.utils.completions import completions_create
-from src.utils.completions import FixedFirstChatHistory
-from src.utils.completions import update_chat_history
-from src.utils.logging import custom_step_tracker
-
-load_dotenv()
+from utils.clients import get_client
+from utils.completions import build_prompt_structure
+from utils.completions import completions_create
+from utils.completions import FixedFirstChatHistory
+from utils.completions import update_chat_history
+from utils.logging import custom_step_tracker
+from utils.logging import log_event
 
 
 BASE_GENERATION_SYSTEM_PROMPT = """
@@ -33,11 +31,13 @@ class ReflectionAgent:
 
     Attributes:
         model (str): The model name used for generating and reflecting on responses.
-        client (OpenAI): An instance of the OpenAI client to interact with the language model.
+        client (OpenAI | None): The client used to interact with the language model. If None, the
+            shared client of the process-wide registry (see `utils.clients`) is looked up for
+            every request.
     """
 
-    def __init__(self, model: str = "gpt-4o"):
-        self.client = OpenAI()
+    def __init__(self, model: str = "gpt-4o", client=None):
+        self.client = client
         self.model = model
 
     def _request_completion(
@@ -57,10 +57,10 @@ class ReflectionAgent:
         Returns:
             str: The model-generated response.
         """
-        output = completions_create(self.client, history, self.model)
+        output = completions_create(self.client or get_client(), history, self.model)
 
         if verbose > 0:
-            print(log_color, f"\n\n{log_title}\n\n", output)
+            log_event(f"reflection.{log_title.lower()}", f"\n\n{log_title}\n\n {output}", color=log_color)
 
         return output
 
@@ -148,9 +148,10 @@ class ReflectionAgent:
 
             if "<OK>" in critique:
                 # If no additional suggestions are made, stop the loop
-                print(
-                    Fore.RED,
+                log_event(
+                    "reflection.stopped",
                     "\n\nStop Sequence found. Stopping the reflection loop ... \n\n",
+                    color=Fore.RED,
                 )
                 break
 
@@ -1,6 +1,8 @@
 import json
 from typing import Callable
 
+from utils.profiling import profile_section
+
 
 def get_fn_signature(fn: Callable) -> dict:
     """
@@ -83,7 +85,8 @@ class Tool:
         Returns:
             The result of the function call.
         """
-        return self.fn(**kwargs)
+        with profile_section(f"tool.{self.name}"):
+            return self.fn(**kwargs)
 
 
 def tool(fn: Callable):
@@ -2,43 +2,16 @@ import json
 import re
 
 from colorama import Fore
-from dotenv import load_dotenv
-from openai import OpenAI
 
-
-import sys
-import os
-
-# Get the project root by going up one level from 'applications'
-project_root = os.path.abspath(os.path.join(os.getcwd(), '..'))
-print(f"📂 Project Root: {project_root}")
-
-# Append 'src' directory to sys.path
-src_path = os.path.join(project_root, 'src')
-sys.path.append(src_path)
-
-# Print sys.path to verify
-print("🔍 Updated sys.path:")
-for path in sys.path:
-    print(path)
-
-# Try importing Saga again
-try:
-    from tool_agent.tool import Tool
-    from tool_agent.tool import validate_arguments
-    from utils.completions import build_prompt_structure
-    from utils.completions import ChatHistory
-    from utils.completions import completions_create
-    from utils.completions import update_chat_history
-    from utils.extraction import extract_tag_content
-
-    print("✅ tool_agent.tool imported successfully!")
-    print("✅ utils.completions imported successfully!")
-    print("✅ utils.extraction imported successfully!")
-except ModuleNotFoundError as e:
-    print("❌ Import failed:", e)
-
-load_dotenv()
+from tool_agent.tool import Tool
+from tool_agent.tool import validate_arguments
+from utils.clients import get_client
+from utils.completions import build_prompt_structure
+from utils.completions import ChatHistory
+from utils.completions import completions_create
+from utils.completions import update_chat_history
+from utils.extraction import extract_tag_content
+from utils.logging import log_event
 
 
 TOOL_SYSTEM_PROMPT = """
@@ -69,7 +42,9 @@ class ToolAgent:
     Attributes:
         tools (Tool | list[Tool]): A list of tools available to the agent.
         model (str): The model to be used for generating tool calls and responses.
-        client (OpenAI): The OpenAI client used to interact with the language model.
+        client (OpenAI | None): The client used to interact with the language model. If None, the
+            shared client of the process-wide registry (see `utils.clients`) is looked up for
+            every request.
         tools_dict (dict): A dictionary mapping tool names to their corresponding Tool objects.
     """
 
@@ -77,8 +52,9 @@ class ToolAgent:
         self,
         tools: Tool | list[Tool],
         model: str = "gpt-4o-mini",
+        client=None,
     ) -> None:
-        self.client = OpenAI()
+        self.client = client
         self.model = model
         self.tools = tools if isinstance(tools, list) else [tools]
         self.tools_dict = {tool.name: tool for tool in self.tools}
@@ -108,16 +84,18 @@ class ToolAgent:
             tool_name = tool_call["name"]
             tool = self.tools_dict[tool_name]
 
-            print(Fore.GREEN + f"\nUsing Tool: {tool_name}")
+            log_event("tool.selected", f"\nUsing Tool: {tool_name}", color=Fore.GREEN, tool=tool_name)
 
             # Validate and execute the tool call
             validated_tool_call = validate_arguments(
                 tool_call, json.loads(tool.fn_signature)
             )
-            print(Fore.GREEN + f"\nTool call dict: \n{validated_tool_call}")
+            log_event(
+                "tool.call", f"\nTool call dict: \n{validated_tool_call}", color=Fore.GREEN, tool=tool_name
+            )
 
             result = tool.run(**validated_tool_call["arguments"])
-            print(Fore.GREEN + f"\nTool result: \n{result}")
+            log_event("tool.result", f"\nTool result: \n{result}", color=Fore.GREEN, tool=tool_name)
 
             # Store the result using the tool call ID
             observations[validated_tool_call["id"]] = result
@@ -151,7 +129,7 @@ class ToolAgent:
         agent_chat_history = ChatHistory([user_prompt])
 
         tool_call_response = completions_create(
-            self.client, messages=tool_chat_history, model=self.model
+            self.client or get_client(), messages=tool_chat_history, model=self.model
         )
         tool_calls = extract_tag_content(str(tool_call_response), "tool_call")
 
@@ -161,4 +139,4 @@ class ToolAgent:
                 agent_chat_history, f'f"Observation: {observations}"', "user"
             )
 
-        return completions_create(self.client, agent_chat_history, self.model)
\ No newline at end of file
+        return completions_create(self.client or get_client(), agent_chat_history, self.model)
\ No newline at end of file
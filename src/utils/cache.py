@@ -0,0 +1,347 @@
+import asyncio
+import hashlib
+import json
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+
+from .tracing import set_span_attributes
+
+
+def cache_key(
+    model: str, messages: list, temperature: float | None = None, max_tokens: int | None = None, **params
+) -> str:
+    """
+    Computes the canonical key of a completion request.
+
+    Messages are serialised with sorted keys and no whitespace, so requests that differ only in
+    dict ordering or in the container type (list, `ChatHistory`, ...) share a key.
+
+    Args:
+        model (str): The model.
+        messages (list[dict]): The messages sent to the model.
+        temperature (float | None, optional): The sampling temperature.
+        max_tokens (int | None, optional): The completion token budget.
+        **params: Other parameters changing the response, e.g. the stop tags of a streamed request.
+
+    Returns:
+        str: The SHA-256 hex digest of the request.
+    """
+    request = {
+        "model": model,
+        "messages": [dict(message) for message in messages],
+        "temperature": temperature,
+        "max_tokens": max_tokens,
+        **params,
+    }
+    canonical = json.dumps(request, sort_keys=True, separators=(",", ":"), ensure_ascii=False, default=str)
+    return hashlib.sha256(canonical.encode("utf-8")).hexdigest()
+
+
+class ResponseCache:
+    """
+    A two-tier cache of LLM responses: an in-memory LRU in front of an optional SQLite file.
+
+    A lookup checks the memory tier first, then the disk tier, whose hits are promoted to memory.
+    Entries older than `ttl` are treated as missing and deleted. The disk tier is bounded by the
+    total size of the responses it holds: above `max_disk_bytes`, the least recently used
+    responses are evicted.
+
+    Args:
+        path (str | None, optional): SQLite file of the disk tier. Defaults to None (memory only).
+        max_entries (int, optional): Capacity of the memory tier. Defaults to 1024.
+        max_disk_bytes (int | None, optional): Maximum total size of the responses on disk.
+            Defaults to 256 MiB; None means no limit.
+        ttl (float | None, optional): Lifetime of an entry, in seconds. Defaults to None (no expiry).
+    """
+
+    def __init__(
+        self,
+        path: str | None = None,
+        max_entries: int = 1024,
+        max_disk_bytes: int | None = 256 * 1024 * 1024,
+        ttl: float | None = None,
+    ):
+        self.path = path
+        self.max_entries = max_entries
+        self.max_disk_bytes = max_disk_bytes
+        self.ttl = ttl
+        self._memory = OrderedDict()  # key -> (value, created_at)
+        self._lock = threading.Lock()
+        self._counters = dict.fromkeys(
+            ("memory_hits", "disk_hits", "misses", "bypasses", "stores", "evictions", "expirations"), 0
+        )
+        self._conn = None
+        self._disk_bytes = 0
+        if path is not None:
+            self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute("PRAGMA synchronous=NORMAL")  # A lost entry is only a future miss
+            self._conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS responses (
+                    key TEXT PRIMARY KEY,
+                    value TEXT NOT NULL,
+                    size INTEGER NOT NULL,
+                    created_at REAL NOT NULL,
+                    accessed_at REAL NOT NULL
+                )
+                """
+            )
+            self._conn.execute("CREATE INDEX IF NOT EXISTS responses_accessed ON responses (accessed_at)")
+            with self._lock:
+                self._purge_expired()
+                self._disk_bytes = self._conn.execute("SELECT COALESCE(SUM(size), 0) FROM responses").fetchone()[0]
+
+    def get(self, key: str) -> str | None:
+        """
+        Looks up a response.
+
+        Args:
+            key (str): The request key, see `cache_key`.
+
+        Returns:
+            str | None: The cached response, or None on a miss.
+        """
+        now = time.time()
+        with self._lock:
+            value = self._get_memory(key, now)
+            if value is not None:
+                return value
+
+            if self._conn is not None:
+                row = self._conn.execute("SELECT value, created_at FROM responses WHERE key = ?", (key,)).fetchone()
+                if row is not None:
+                    value, created_at = row
+                    if not self._expired(created_at, now):
+                        self._conn.execute("UPDATE responses SET accessed_at = ? WHERE key = ?", (now, key))
+                        self._remember(key, value, created_at)
+                        self._counters["disk_hits"] += 1
+                        return value
+                    self._delete(key)
+                    self._counters["expirations"] += 1
+
+            self._counters["misses"] += 1
+            return None
+
+    def get_from_memory(self, key: str) -> str | None:
+        """
+        Looks up a response in the memory tier only, e.g. before a disk lookup moved off the
+        event loop. A miss is not counted: it is left to the `get` that follows.
+
+        Args:
+            key (str): The request key, see `cache_key`.
+
+        Returns:
+            str | None: The cached response, or None if it is not in memory.
+        """
+        with self._lock:
+            return self._get_memory(key, time.time())
+
+    @property
+    def persistent(self) -> bool:
+        """Whether the cache has a disk tier, whose lookups and stores do file I/O."""
+        return self._conn is not None
+
+    def put(self, key: str, value: str) -> None:
+        """
+        Stores a response in both tiers.
+
+        Args:
+            key (str): The request key, see `cache_key`.
+            value (str): The response.
+        """
+        now = time.time()
+        with self._lock:
+            self._remember(key, value, now)
+            self._counters["stores"] += 1
+            if self._conn is not None:
+                self._delete(key)  # Even if the new value doesn't fit, the old one is stale
+                size = len(value.encode("utf-8"))
+                if self.max_disk_bytes is not None and size > self.max_disk_bytes:
+                    return
+                self._conn.execute(
+                    "INSERT INTO responses (key, value, size, created_at, accessed_at) VALUES (?, ?, ?, ?, ?)",
+                    (key, value, size, now, now),
+                )
+                self._disk_bytes += size
+                self._evict_disk()
+
+    def delete(self, key: str) -> None:
+        """
+        Drops a response from both tiers, e.g. once it no longer reflects the state of the world.
+
+        Args:
+            key (str): The request key, see `cache_key`.
+        """
+        with self._lock:
+            self._memory.pop(key, None)
+            if self._conn is not None:
+                self._delete(key)
+
+    def record_bypass(self) -> None:
+        """Counts a request that skipped the cache."""
+        with self._lock:
+            self._counters["bypasses"] += 1
+
+    def stats(self) -> dict:
+        """
+        Returns the cache counters.
+
+        Returns:
+            dict: The `memory_hits`, `disk_hits`, `misses`, `bypasses`, `stores`, `evictions` (disk
+                entries evicted for size) and `expirations` counters, the `hit_rate` over lookups,
+                and the current `memory_entries` and `disk_bytes`.
+        """
+        with self._lock:
+            stats = dict(self._counters)
+            stats["memory_entries"] = len(self._memory)
+            stats["disk_bytes"] = self._disk_bytes
+        lookups = stats["memory_hits"] + stats["disk_hits"] + stats["misses"]
+        stats["hit_rate"] = (stats["memory_hits"] + stats["disk_hits"]) / lookups if lookups else 0.0
+        return stats
+
+    def clear(self) -> None:
+        """Drops every entry of both tiers."""
+        with self._lock:
+            self._memory.clear()
+            if self._conn is not None:
+                self._conn.execute("DELETE FROM responses")
+                self._disk_bytes = 0
+
+    def close(self) -> None:
+        """Closes the underlying database connection, if any."""
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
+
+    def _expired(self, created_at: float, now: float) -> bool:
+        return self.ttl is not None and now - created_at > self.ttl
+
+    def _get_memory(self, key: str, now: float) -> str | None:
+        entry = self._memory.get(key)
+        if entry is None:
+            return None
+        if not self._expired(entry[1], now):
+            self._memory.move_to_end(key)
+            self._counters["memory_hits"] += 1
+            return entry[0]
+        del self._memory[key]
+        self._counters["expirations"] += 1
+        return None
+
+    def _remember(self, key: str, value: str, created_at: float) -> None:
+        self._memory[key] = (value, created_at)
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.max_entries:
+            self._memory.popitem(last=False)
+
+    def _delete(self, key: str) -> None:
+        row = self._conn.execute("SELECT size FROM responses WHERE key = ?", (key,)).fetchone()
+        if row is not None:
+            self._conn.execute("DELETE FROM responses WHERE key = ?", (key,))
+            self._disk_bytes -= row[0]
+
+    def _evict_disk(self) -> None:
+        """Deletes the least recently used responses until the disk tier fits in `max_disk_bytes`."""
+        if self.max_disk_bytes is None:
+            return
+        while self._disk_bytes > self.max_disk_bytes:
+            rows = self._conn.execute("SELECT key, size FROM responses ORDER BY accessed_at LIMIT 64").fetchall()
+            if not rows:
+                break
+            evicted = []
+            for key, size in rows:
+                if self._disk_bytes <= self.max_disk_bytes:
+                    break
+                evicted.append((key,))
+                self._disk_bytes -= size
+            self._conn.executemany("DELETE FROM responses WHERE key = ?", evicted)
+            self._counters["evictions"] += len(evicted)
+
+    def _purge_expired(self) -> None:
+        if self.ttl is not None:
+            self._conn.execute("DELETE FROM responses WHERE created_at < ?", (time.time() - self.ttl,))
+
+
+_response_cache = None
+
+
+def set_response_cache(cache: ResponseCache | None) -> None:
+    """
+    Enables the process-wide response cache used by `completions_create`, `acompletions_create`
+    and the skills, or disables it with None (the default).
+
+    Args:
+        cache (ResponseCache | None): The cache.
+    """
+    global _response_cache
+    _response_cache = cache
+
+
+def get_response_cache() -> ResponseCache | None:
+    """
+    Returns the process-wide response cache, if caching is enabled.
+
+    Returns:
+        ResponseCache | None: The shared cache.
+    """
+    return _response_cache
+
+
+def cached_completion(key: str, create, use_cache: bool = True) -> str:
+    """
+    Returns the cached response of a request, or calls `create` and caches its response.
+
+    Args:
+        key (str): The request key, see `cache_key`.
+        create (Callable[[], str]): Sends the request and returns the response text.
+        use_cache (bool, optional): False bypasses the cache for this call. Defaults to True.
+
+    Returns:
+        str: The response.
+    """
+    cache = _response_cache
+    if cache is None:
+        return create()
+    if not use_cache:
+        cache.record_bypass()
+        return create()
+    response = cache.get(key)
+    if response is not None:
+        set_span_attributes(cached=True)
+    else:
+        response = create()
+        if response:
+            cache.put(key, response)
+    return response
+
+
+async def acached_completion(key: str, create, use_cache: bool = True) -> str:
+    """
+    Asynchronous counterpart of `cached_completion`, where `create` returns an awaitable.
+
+    Memory-tier hits are served on the event loop; disk-tier lookups and stores run in a worker
+    thread so that SQLite I/O never blocks the loop.
+    """
+    cache = _response_cache
+    if cache is None:
+        return await create()
+    if not use_cache:
+        cache.record_bypass()
+        return await create()
+    response = cache.get_from_memory(key)
+    if response is None:
+        response = await asyncio.to_thread(cache.get, key) if cache.persistent else cache.get(key)
+    if response is not None:
+        set_span_attributes(cached=True)
+    else:
+        response = await create()
+        if response:
+            if cache.persistent:
+                await asyncio.to_thread(cache.put, key, response)
+            else:
+                cache.put(key, response)
+    return response
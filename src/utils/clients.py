@@ -0,0 +1,223 @@
+import asyncio
+import os
+import threading
+import weakref
+from dataclasses import dataclass
+
+DEFAULT = "default"
+
+
+@dataclass
+class PoolConfig:
+    """
+    Connection pooling of the clients created by a `ClientRegistry`.
+
+    Attributes:
+        max_connections (int): Maximum number of open connections per client.
+        max_keepalive_connections (int): Maximum number of idle connections kept open per client.
+        keepalive_expiry (float): Seconds an idle connection is kept open. Long enough to be
+            reused between the ReAct rounds of an agent and across agents.
+        connect_timeout (float): Seconds allowed to open a connection.
+        timeout (float): Default read/write timeout of a request, in seconds. Requests running
+            under a deadline (see `utils.deadline`) get the remaining time instead.
+        max_retries (int): Retries done by the client itself. 0 by default, as `completions_create`
+            already retries transient errors (see `utils.retry`).
+    """
+
+    max_connections: int = 100
+    max_keepalive_connections: int = 20
+    keepalive_expiry: float = 30.0
+    connect_timeout: float = 5.0
+    timeout: float = 600.0
+    max_retries: int = 0
+
+
+def _http():
+    """Returns the HTTP library the installed OpenAI SDK is built on."""
+    try:
+        import httpx
+    except ImportError:  # Releases of the SDK built on httpx2
+        import httpx2 as httpx
+    return httpx
+
+
+class ClientRegistry:
+    """
+    A process-wide registry of named LLM clients, so that every agent, tool agent, reflection
+    agent and skill shares one connection pool per client instead of opening its own.
+
+    Clients are created on first use from their configuration (OpenAI clients by default) or
+    registered explicitly, e.g. a local stand-in in tests or a client of another provider.
+    Async clients are kept per event loop, as their connections can't outlive the loop they were
+    opened on. Clients are dropped in forked children (e.g. distributed workers), which create
+    their own on first use.
+
+    Args:
+        pool (PoolConfig | None, optional): Default pooling of the created clients.
+    """
+
+    def __init__(self, pool: PoolConfig | None = None):
+        self.pool = pool or PoolConfig()
+        self._settings = {}  # name -> (pool, client keyword arguments)
+        self._clients = {}
+        self._async_clients = {}  # name -> {event loop (or None): client}
+        self._registered = {}
+        self._registered_async = {}
+        self._lock = threading.Lock()
+
+    def configure(self, name: str = DEFAULT, pool: PoolConfig | None = None, **options) -> None:
+        """
+        Sets how the client `name` is created, e.g. its `base_url` or `api_key`. The client is
+        recreated with the new settings on next use.
+
+        Args:
+            name (str, optional): The client name. Defaults to "default".
+            pool (PoolConfig | None, optional): Its pooling. Defaults to the registry's.
+            **options: Keyword arguments of `OpenAI` / `AsyncOpenAI`.
+        """
+        with self._lock:
+            self._settings[name] = (pool, options)
+            self._drop(name)
+
+    def register(self, client=None, async_client=None, name: str = DEFAULT) -> None:
+        """
+        Registers clients built by the caller under `name`, replacing the created ones.
+        Passing None for both restores the configured clients.
+
+        Args:
+            client (Any, optional): The synchronous client, with the `chat.completions.create` API.
+            async_client (Any, optional): The asynchronous client, used by `arun`.
+            name (str, optional): The client name. Defaults to "default".
+        """
+        with self._lock:
+            self._drop(name)
+            self._registered.pop(name, None)
+            self._registered_async.pop(name, None)
+            if client is not None:
+                self._registered[name] = client
+            if async_client is not None:
+                self._registered_async[name] = async_client
+
+    def get(self, name: str = DEFAULT):
+        """
+        Returns the shared synchronous client `name`, creating it on first use.
+
+        Args:
+            name (str, optional): The client name. Defaults to "default".
+
+        Returns:
+            OpenAI: The client.
+        """
+        client = self._registered.get(name) or self._clients.get(name)
+        if client is not None:
+            return client
+        with self._lock:
+            if name not in self._clients:
+                from openai import OpenAI
+
+                pool, options = self._client_settings(name)
+                self._clients[name] = OpenAI(http_client=self._http_client(pool), **options)
+            return self._clients[name]
+
+    def get_async(self, name: str = DEFAULT):
+        """
+        Returns the shared asynchronous client `name` of the running event loop, creating it on
+        first use.
+
+        Args:
+            name (str, optional): The client name. Defaults to "default".
+
+        Returns:
+            AsyncOpenAI: The client.
+        """
+        client = self._registered_async.get(name)
+        if client is not None:
+            return client
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            loop = None
+        with self._lock:
+            clients = self._async_clients.setdefault(name, weakref.WeakKeyDictionary())
+            key = loop if loop is not None else _NO_LOOP
+            if key not in clients:
+                from openai import AsyncOpenAI
+
+                pool, options = self._client_settings(name)
+                clients[key] = AsyncOpenAI(http_client=self._http_client(pool, asynchronous=True), **options)
+            return clients[key]
+
+    def close(self) -> None:
+        """
+        Closes the synchronous clients created by the registry and forgets every created client.
+        Registered clients are left to their owner.
+        """
+        with self._lock:
+            for name in list(self._clients) + list(self._async_clients):
+                self._drop(name)
+
+    def _client_settings(self, name: str):
+        pool, options = self._settings.get(name, (None, {}))
+        pool = pool or self.pool
+        return pool, {"max_retries": pool.max_retries, **options}
+
+    def _http_client(self, pool: PoolConfig, asynchronous: bool = False):
+        import openai
+
+        httpx = _http()
+        http_client = openai.DefaultAsyncHttpxClient if asynchronous else openai.DefaultHttpxClient
+        return http_client(
+            limits=httpx.Limits(
+                max_connections=pool.max_connections,
+                max_keepalive_connections=pool.max_keepalive_connections,
+                keepalive_expiry=pool.keepalive_expiry,
+            ),
+            timeout=httpx.Timeout(pool.timeout, connect=pool.connect_timeout),
+        )
+
+    def _drop(self, name: str) -> None:
+        client = self._clients.pop(name, None)
+        if client is not None:
+            client.close()
+        self._async_clients.pop(name, None)  # Closed with their event loop
+
+    def _reset_after_fork(self) -> None:
+        """Pooled connections can't be shared with a forked child: it opens its own."""
+        self._clients = {}
+        self._async_clients = {}
+        self._lock = threading.Lock()
+
+
+class _NoLoop:
+    """Key of the async clients created outside of an event loop."""
+
+
+_NO_LOOP = _NoLoop()
+
+_client_registry = ClientRegistry()
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=_client_registry._reset_after_fork)
+
+
+def get_client_registry() -> ClientRegistry:
+    """
+    Returns the process-wide client registry.
+
+    Returns:
+        ClientRegistry: The shared registry.
+    """
+    return _client_registry
+
+
+def get_client(name: str = DEFAULT):
+    """
+    Returns the shared synchronous client `name`. See `ClientRegistry.get`.
+    """
+    return _client_registry.get(name)
+
+
+def get_async_client(name: str = DEFAULT):
+    """
+    Returns the shared asynchronous client `name` of the running event loop. See `ClientRegistry.get_async`.
+    """
+    return _client_registry.get_async(name)
@@ -1,19 +1,268 @@
-def completions_create(client, messages: list, model: str) -> str:
+import functools
+
+from .cache import acached_completion
+from .cache import cache_key
+from .cache import cached_completion
+from .deadline import check_deadline
+from .deadline import remaining_time
+from .extraction import TagStreamParser
+from .rate_limit import estimate_tokens
+from .rate_limit import get_rate_limiter
+from .retry import get_resilient_caller
+from .singleflight import get_single_flight
+from .tracing import add_to_span
+from .tracing import COMPLETION
+from .tracing import set_span_attributes
+from .tracing import span
+
+TEMPERATURE = 0.3
+MAX_TOKENS = 3000
+STOP_TAGS = ("tool_call", "response")
+
+
+def completions_create(
+    client, messages: list, model: str, stream: bool = False, stop_tags=STOP_TAGS, use_cache: bool = True
+) -> str:
     """
     Sends a request to the client's `completions.create` method to interact with the language model.
 
+    The request first goes through the process-wide rate limiter, which queues it if the model's
+    request-per-minute or token-per-minute budget is exhausted. Under a deadline (see
+    `utils.deadline`), the request is given the remaining time as its timeout. Transient errors
+    are retried and slow requests optionally hedged according to the model's `RetryPolicy`
+    (see `utils.retry`).
+
+    In a traced run (see `utils.tracing`) the call is recorded as a completion span with its
+    model, token usage and retries.
+
+    In streaming mode the completion is parsed as it arrives and the stream is closed as soon as
+    one of `stop_tags` is closed, which stops the generation of the remaining tokens.
+
+    If a response cache is enabled (see `utils.cache`), a request identical to a cached one
+    (same model, messages, sampling parameters and stop tags) returns the cached response
+    without reaching the rate limiter or the provider. If coalescing is enabled (see
+    `utils.singleflight`), concurrent identical requests are sent once and every caller gets
+    the same response.
+
     Args:
         client (OpenAI): The OpenAI client object
         messages (list[dict]): A list of message objects containing chat history for the model.
         model (str): The model to use for generating tool calls and responses.
+        stream (bool, optional): Whether to stream the completion. Defaults to False.
+        stop_tags (Iterable[str], optional): In streaming mode, the tags whose closing ends the
+            completion. Defaults to `STOP_TAGS` (`</tool_call>` and `</response>`).
+        use_cache (bool, optional): False bypasses the response cache and the coalescing of
+            identical requests for this call, e.g. to sample a fresh response. Defaults to True.
+
+    Returns:
+        str: The content of the model's response (cut after the stop tag when streaming).
+
+    Raises:
+        Cancelled: If the current deadline is cancelled or expires before the request is sent.
+    """
+    with span("chat.completions", COMPLETION, model=model, stream=stream):
+        if stream:
+            request = functools.partial(_create_streamed, client, messages, model, stop_tags)
+        else:
+            request = functools.partial(_create, client, messages, model)
+        key = cache_key(model, messages, **_cache_params(stream, stop_tags))
+
+        def create():
+            single_flight = get_single_flight()
+            if single_flight is None or not use_cache:
+                return get_resilient_caller().call(model, request)
+            return single_flight.do(key, lambda: get_resilient_caller().call(model, request))
+
+        return cached_completion(key, create, use_cache)
+
+
+async def acompletions_create(
+    client, messages: list, model: str, stream: bool = False, stop_tags=STOP_TAGS, use_cache: bool = True
+) -> str:
+    """
+    Asynchronous counterpart of `completions_create`, awaiting the async client's `completions.create`.
+
+    Args:
+        client (AsyncOpenAI): The AsyncOpenAI client object
+        messages (list[dict]): A list of message objects containing chat history for the model.
+        model (str): The model to use for generating tool calls and responses.
+        stream (bool, optional): Whether to stream the completion. Defaults to False.
+        stop_tags (Iterable[str], optional): In streaming mode, the tags whose closing ends the
+            completion. Defaults to `STOP_TAGS`.
+        use_cache (bool, optional): False bypasses the response cache and the coalescing of
+            identical requests for this call. Defaults to True.
 
     Returns:
         str: The content of the model's response.
+
+    Raises:
+        Cancelled: If the current deadline is cancelled or expires before the request is sent.
+    """
+    with span("chat.completions", COMPLETION, model=model, stream=stream):
+        if stream:
+            request = functools.partial(_acreate_streamed, client, messages, model, stop_tags)
+        else:
+            request = functools.partial(_acreate, client, messages, model)
+        key = cache_key(model, messages, **_cache_params(stream, stop_tags))
+
+        async def create():
+            single_flight = get_single_flight()
+            if single_flight is None or not use_cache:
+                return await get_resilient_caller().acall(model, request)
+            return await single_flight.ado(key, lambda: get_resilient_caller().acall(model, request))
+
+        return await acached_completion(key, create, use_cache)
+
+
+def _create(client, messages: list, model: str) -> str:
     """
-    response = client.chat.completions.create(messages=messages, model=model,temperature=0.3, max_tokens=3000 )
+    Sends a single rate-limited request.
+    """
+    rate_limiter = get_rate_limiter()
+    estimated_tokens = estimate_tokens(messages, MAX_TOKENS)
+    rate_limiter.acquire(model, estimated_tokens)
+    check_deadline()
+
+    response = client.chat.completions.create(
+        messages=messages, model=model, temperature=TEMPERATURE, max_tokens=MAX_TOKENS, **_request_options()
+    )
+    rate_limiter.settle(model, estimated_tokens, _total_tokens(response))
+    _record_usage(getattr(response, "usage", None))
     return str(response.choices[0].message.content)
 
 
+async def _acreate(client, messages: list, model: str) -> str:
+    """
+    Sends a single rate-limited request on the async client.
+    """
+    rate_limiter = get_rate_limiter()
+    estimated_tokens = estimate_tokens(messages, MAX_TOKENS)
+    await rate_limiter.aacquire(model, estimated_tokens)
+    check_deadline()
+
+    response = await client.chat.completions.create(
+        messages=messages, model=model, temperature=TEMPERATURE, max_tokens=MAX_TOKENS, **_request_options()
+    )
+    rate_limiter.settle(model, estimated_tokens, _total_tokens(response))
+    _record_usage(getattr(response, "usage", None))
+    return str(response.choices[0].message.content)
+
+
+def _create_streamed(client, messages: list, model: str, stop_tags) -> str:
+    """
+    Sends a single rate-limited streaming request, closing the stream once a stop tag is closed.
+    """
+    rate_limiter = get_rate_limiter()
+    estimated_tokens = estimate_tokens(messages, MAX_TOKENS)
+    rate_limiter.acquire(model, estimated_tokens)
+    check_deadline()
+
+    parser = TagStreamParser(stop_tags)
+    usage = None
+    stream = client.chat.completions.create(
+        messages=messages, model=model, temperature=TEMPERATURE, max_tokens=MAX_TOKENS,
+        stream=True, stream_options={"include_usage": True}, **_request_options()
+    )
+    try:
+        for chunk in stream:
+            usage = getattr(chunk, "usage", None) or usage
+            if parser.feed(_delta_content(chunk)):
+                break
+    finally:
+        stream.close()  # Closing the connection early stops the generation
+
+    rate_limiter.settle(model, estimated_tokens, _streamed_usage(usage, messages, parser))
+    return parser.text
+
+
+async def _acreate_streamed(client, messages: list, model: str, stop_tags) -> str:
+    """
+    Asynchronous counterpart of `_create_streamed`.
+    """
+    rate_limiter = get_rate_limiter()
+    estimated_tokens = estimate_tokens(messages, MAX_TOKENS)
+    await rate_limiter.aacquire(model, estimated_tokens)
+    check_deadline()
+
+    parser = TagStreamParser(stop_tags)
+    usage = None
+    stream = await client.chat.completions.create(
+        messages=messages, model=model, temperature=TEMPERATURE, max_tokens=MAX_TOKENS,
+        stream=True, stream_options={"include_usage": True}, **_request_options()
+    )
+    try:
+        async for chunk in stream:
+            usage = getattr(chunk, "usage", None) or usage
+            if parser.feed(_delta_content(chunk)):
+                break
+    finally:
+        await stream.close()
+
+    rate_limiter.settle(model, estimated_tokens, _streamed_usage(usage, messages, parser))
+    return parser.text
+
+
+def _delta_content(chunk) -> str:
+    """
+    Returns the text carried by a streamed chunk (empty for the final usage-only chunk).
+    """
+    if not chunk.choices:
+        return ""
+    return chunk.choices[0].delta.content or ""
+
+
+def _streamed_usage(usage, messages: list, parser: TagStreamParser) -> int:
+    """
+    Records the usage of a stream and returns its total tokens, estimated if the stream was
+    closed before the provider reported them.
+    """
+    set_span_attributes(stopped_at=parser.stopped_at or "")
+    if usage is not None:
+        _record_usage(usage)
+        return usage.total_tokens
+    prompt_tokens, completion_tokens = estimate_tokens(messages), len(parser.text) // 4
+    add_to_span("prompt_tokens", prompt_tokens, propagate=True)
+    add_to_span("completion_tokens", completion_tokens, propagate=True)
+    set_span_attributes(tokens_estimated=True)
+    return prompt_tokens + completion_tokens
+
+
+def _record_usage(usage) -> None:
+    """
+    Adds the token usage reported by the provider to the current completion span and to the
+    enclosing round, agent and run spans, if traced.
+    """
+    if usage is not None:
+        add_to_span("prompt_tokens", getattr(usage, "prompt_tokens", 0) or 0, propagate=True)
+        add_to_span("completion_tokens", getattr(usage, "completion_tokens", 0) or 0, propagate=True)
+
+
+def _cache_params(stream: bool, stop_tags) -> dict:
+    """
+    Returns the request parameters, besides the model and messages, that the response depends on.
+    """
+    params = {"temperature": TEMPERATURE, "max_tokens": MAX_TOKENS}
+    if stream:
+        params["stop_tags"] = sorted(stop_tags)  # A streamed response is cut after a stop tag
+    return params
+
+
+def _request_options() -> dict:
+    """
+    Returns the per-request options derived from the current deadline, if any.
+    """
+    timeout = remaining_time()
+    return {} if timeout is None else {"timeout": timeout}
+
+
+def _total_tokens(response) -> int | None:
+    """
+    Returns the total tokens reported in a completion response, if any.
+    """
+    usage = getattr(response, "usage", None)
+    return getattr(usage, "total_tokens", None)
+
+
 def build_prompt_structure(prompt: str, role: str, tag: str = "") -> dict:
     """
     Builds a structured prompt that includes the role and content.
@@ -0,0 +1,195 @@
+import contextvars
+import threading
+import time
+from contextlib import contextmanager
+
+
+class Cancelled(Exception):
+    """Raised at a cancellation checkpoint once the surrounding deadline has been cancelled."""
+
+
+class DeadlineExceeded(Cancelled, TimeoutError):
+    """Raised at a cancellation checkpoint once the surrounding deadline has expired."""
+
+
+class Deadline:
+    """
+    A point in time by which an operation must finish, which can also be cancelled explicitly.
+
+    Deadlines form a tree: a child never expires later than its parent and is cancelled whenever
+    its parent is, so cancelling a saga's deadline cancels every agent running under it.
+    Cancellation is cooperative: code checks the deadline at safe points with `check`, and
+    blocking calls (LLM requests, tool calls) are given `remaining()` as their timeout.
+
+    Attributes:
+        name (str): What the deadline applies to, used in error messages.
+        timeout (float | None): The timeout the deadline was created with, in seconds.
+        expires_at (float | None): The monotonic expiry time, or None for no time limit.
+        parent (Deadline | None): The enclosing deadline.
+
+    Args:
+        timeout (float | None, optional): Seconds from now. Defaults to None (no time limit).
+        parent (Deadline | None, optional): The enclosing deadline. Defaults to None.
+        name (str, optional): What the deadline applies to. Defaults to "operation".
+    """
+
+    def __init__(self, timeout: float | None = None, parent=None, name: str = "operation"):
+        self.name = name
+        self.timeout = timeout
+        self.parent = parent
+        self.expires_at = None if timeout is None else time.monotonic() + timeout
+        if parent is not None and parent.expires_at is not None:
+            if self.expires_at is None or parent.expires_at < self.expires_at:
+                self.expires_at = parent.expires_at
+        self._reason = None
+        self._lock = threading.Lock()
+
+    def child(self, timeout: float | None = None, name: str = "operation"):
+        """
+        Creates a deadline nested in this one.
+
+        Args:
+            timeout (float | None, optional): Seconds from now. Defaults to None (the parent's limit).
+            name (str, optional): What the deadline applies to.
+
+        Returns:
+            Deadline: The child deadline.
+        """
+        return Deadline(timeout, parent=self, name=name)
+
+    def remaining(self) -> float | None:
+        """
+        Returns the seconds left before expiry (0 once expired), or None if there's no time limit.
+        """
+        if self.expires_at is None:
+            return None
+        return max(self.expires_at - time.monotonic(), 0.0)
+
+    def expired(self) -> bool:
+        """Returns True once the expiry time has passed."""
+        return self.expires_at is not None and time.monotonic() >= self.expires_at
+
+    def cancel(self, reason: str = "cancelled") -> None:
+        """
+        Cancels the deadline and all its children. Only the first reason is kept.
+
+        Args:
+            reason (str, optional): Why the operation was cancelled.
+        """
+        with self._lock:
+            if self._reason is None:
+                self._reason = reason
+
+    @property
+    def cancelled(self) -> str | None:
+        """The cancellation reason of this deadline or of its nearest cancelled ancestor, if any."""
+        deadline = self
+        while deadline is not None:
+            if deadline._reason is not None:
+                return deadline._reason
+            deadline = deadline.parent
+        return None
+
+    def exceeded(self) -> DeadlineExceeded:
+        """Builds the error reported when the deadline expires."""
+        return DeadlineExceeded(f"{self.name} exceeded its deadline.")
+
+    def check(self) -> None:
+        """
+        Cancellation checkpoint.
+
+        Raises:
+            Cancelled: If the deadline, or one of its ancestors, was cancelled.
+            DeadlineExceeded: If the deadline has expired.
+        """
+        reason = self.cancelled
+        if reason is not None:
+            raise Cancelled(f"{self.name} cancelled: {reason}")
+        if self.expired():
+            raise self.exceeded()
+
+
+_current_deadline = contextvars.ContextVar("deadline", default=None)
+
+
+def current_deadline() -> Deadline | None:
+    """Returns the deadline of the running operation, if any."""
+    return _current_deadline.get()
+
+
+@contextmanager
+def deadline_scope(deadline: Deadline | None):
+    """
+    Makes `deadline` the current deadline within the block (and in asyncio tasks started from it).
+
+    Args:
+        deadline (Deadline | None): The deadline.
+    """
+    token = _current_deadline.set(deadline)
+    try:
+        yield deadline
+    finally:
+        _current_deadline.reset(token)
+
+
+def check_deadline() -> None:
+    """
+    Cancellation checkpoint for the current deadline, if any.
+
+    Raises:
+        Cancelled: If the current deadline was cancelled.
+        DeadlineExceeded: If the current deadline has expired.
+    """
+    deadline = _current_deadline.get()
+    if deadline is not None:
+        deadline.check()
+
+
+def remaining_time() -> float | None:
+    """Returns the seconds left before the current deadline, or None if there's no time limit."""
+    deadline = _current_deadline.get()
+    return None if deadline is None else deadline.remaining()
+
+
+def call_with_deadline(fn, *args, **kwargs):
+    """
+    Calls `fn`, giving up when the current deadline expires.
+
+    Without a time limit `fn` is simply called. Otherwise it runs in a helper thread which is
+    abandoned on expiry, so a hung call cannot block its caller past the deadline.
+
+    Args:
+        fn (Callable): The function to call.
+        *args: Positional arguments for `fn`.
+        **kwargs: Keyword arguments for `fn`.
+
+    Returns:
+        Any: The result of `fn`.
+
+    Raises:
+        Cancelled: If the current deadline was cancelled before the call.
+        DeadlineExceeded: If the current deadline expired before `fn` returned.
+    """
+    deadline = _current_deadline.get()
+    if deadline is None:
+        return fn(*args, **kwargs)
+    deadline.check()
+    if deadline.expires_at is None:
+        return fn(*args, **kwargs)
+
+    outcome = {}
+
+    def target():
+        try:
+            outcome["result"] = fn(*args, **kwargs)
+        except BaseException as e:
+            outcome["error"] = e
+
+    thread = threading.Thread(target=contextvars.copy_context().run, args=(target,), daemon=True)
+    thread.start()
+    thread.join(deadline.remaining())
+    if thread.is_alive():
+        raise deadline.exceeded()
+    if "error" in outcome:
+        raise outcome["error"]
+    return outcome["result"]
@@ -39,4 +39,63 @@ def extract_tag_content(text: str, tag: str) -> TagContentResult:
     return TagContentResult(
         content=[content.strip() for content in matched_contents],
         found=bool(matched_contents),
-    )
\ No newline at end of file
+    )
+
+class TagStreamParser:
+    """
+    Incrementally scans a streamed completion for the closing tags that end a ReAct turn.
+
+    Chunks are appended as they arrive and only the new text (plus a tag-length overlap, for tags
+    split across chunks) is searched, so a stream is scanned in linear time. Once a stop tag is
+    closed, `done` becomes True and `text` is cut right after it.
+
+    Attributes:
+        stop_tags (tuple[str, ...]): The tags whose closing ends the turn.
+        done (bool): True once one of the stop tags has been closed.
+        stopped_at (str | None): The tag that ended the turn, if any.
+
+    Args:
+        stop_tags (Iterable[str], optional): The tags whose closing ends the turn.
+            Defaults to ("tool_call", "response").
+    """
+
+    def __init__(self, stop_tags=("tool_call", "response")):
+        self.stop_tags = tuple(stop_tags)
+        self._closing = [(f"</{tag}>", tag) for tag in self.stop_tags]
+        self._overlap = max((len(closing) for closing, _ in self._closing), default=1) - 1
+        self._buffer = ""
+        self._scanned = 0
+        self.done = False
+        self.stopped_at = None
+
+    def feed(self, chunk: str) -> bool:
+        """
+        Appends a chunk of the completion.
+
+        Args:
+            chunk (str): The new text.
+
+        Returns:
+            bool: True once a stop tag has been closed; further chunks are ignored.
+        """
+        if self.done or not chunk:
+            return self.done
+
+        self._buffer += chunk
+        start = max(self._scanned - self._overlap, 0)
+        end = None
+        for closing, tag in self._closing:
+            position = self._buffer.find(closing, start)
+            if position != -1 and (end is None or position + len(closing) < end):
+                end, self.stopped_at = position + len(closing), tag
+        self._scanned = len(self._buffer)
+
+        if end is not None:
+            self._buffer = self._buffer[:end]
+            self.done = True
+        return self.done
+
+    @property
+    def text(self) -> str:
+        """The completion received so far, cut after the stop tag once `done`."""
+        return self._buffer
@@ -1,20 +1,191 @@
-import time
+import atexit
+import json
+import logging
+import os
+import queue
+import sys
+import threading
+from logging.handlers import QueueHandler
+from logging.handlers import QueueListener
 
 from colorama import Fore
 from colorama import Style
 
+LOGGER_NAME = "sagallm"
+
+LEVEL_COLORS = {
+    logging.DEBUG: Fore.WHITE,
+    logging.WARNING: Fore.YELLOW,
+    logging.ERROR: Fore.RED,
+    logging.CRITICAL: Fore.RED,
+}
+
+_logger = logging.getLogger(LOGGER_NAME)
+_logger.propagate = False
+_listener = None
+_settings = {}  # Arguments of the last `configure_logging` call
+_configure_lock = threading.RLock()
+
+
+class PrettyFormatter(logging.Formatter):
+    """
+    Renders events the way the framework always printed them: colored text, with banners framed
+    by separator lines.
+    """
+
+    def format(self, record: logging.LogRecord) -> str:
+        message = record.getMessage()
+        if getattr(record, "banner", False):
+            line = "=" * 50
+            return (
+                f"{Style.BRIGHT}{Fore.CYAN}\n{line}\n{Style.NORMAL}{Fore.MAGENTA}{message}\n"
+                f"{Style.BRIGHT}{Fore.CYAN}{line}\n{Style.RESET_ALL}"
+            )
+        color = getattr(record, "color", None) or LEVEL_COLORS.get(record.levelno, "")
+        return f"{color}{message}{Style.RESET_ALL}" if color else message
+
+
+class PlainFormatter(logging.Formatter):
+    """
+    Renders events as single uncolored lines: time, level, event name, message and fields.
+    """
+
+    def format(self, record: logging.LogRecord) -> str:
+        fields = " ".join(f"{key}={value}" for key, value in getattr(record, "fields", {}).items())
+        line = f"{self.formatTime(record)} {record.levelname} {getattr(record, 'event', '-')} {record.getMessage()}"
+        return f"{line} {fields}" if fields else line
+
+
+class JSONLFormatter(logging.Formatter):
+    """
+    Renders events as JSON lines with their structured fields.
+    """
+
+    def format(self, record: logging.LogRecord) -> str:
+        event = {
+            "time": record.created,
+            "level": record.levelname,
+            "event": getattr(record, "event", None),
+            "message": record.getMessage(),
+            **getattr(record, "fields", {}),
+        }
+        return json.dumps(event, ensure_ascii=False, default=str)
+
+
+def configure_logging(
+    level: int = logging.INFO,
+    console: bool = True,
+    pretty: bool = True,
+    jsonl_path: str | None = None,
+    stream=None,
+) -> None:
+    """
+    Configures the framework's event logger.
+
+    Events are put on an in-memory queue by the caller and written by a background thread, so
+    logging never blocks agents on terminal or disk I/O. Calling it again replaces the previous
+    configuration after flushing the pending events.
+
+    Args:
+        level (int, optional): Minimum level of the logged events. Defaults to logging.INFO.
+        console (bool, optional): Whether to write events to the console. Defaults to True.
+        pretty (bool, optional): Colored, human-friendly console output instead of plain lines.
+            Defaults to True.
+        jsonl_path (str | None, optional): File the events are appended to as JSON lines.
+        stream (IO | None, optional): The console stream. Defaults to sys.stdout.
+    """
+    global _listener, _settings
+
+    handlers = []
+    if console:
+        console_handler = logging.StreamHandler(stream or sys.stdout)
+        console_handler.setFormatter(PrettyFormatter() if pretty else PlainFormatter())
+        handlers.append(console_handler)
+    if jsonl_path is not None:
+        file_handler = logging.FileHandler(jsonl_path, encoding="utf-8")
+        file_handler.setFormatter(JSONLFormatter())
+        handlers.append(file_handler)
+
+    with _configure_lock:
+        _stop_listener()
+        _settings = {"level": level, "console": console, "pretty": pretty, "jsonl_path": jsonl_path, "stream": stream}
+        events = queue.SimpleQueue()
+        _logger.handlers = [QueueHandler(events)]
+        _logger.setLevel(level)
+        _listener = QueueListener(events, *handlers, respect_handler_level=True)
+        _listener.start()
+
+
+def shutdown_logging() -> None:
+    """
+    Writes the pending events and stops the background writer. Called automatically at exit.
+    """
+    with _configure_lock:
+        _stop_listener()
+
+
+def _stop_listener() -> None:
+    global _listener
+    if _listener is not None:
+        _listener.stop()
+        for handler in _listener.handlers:
+            handler.close()
+        _listener = None
+
+
+def _reset_after_fork() -> None:
+    """The writer thread doesn't survive a fork: the child starts its own on first use."""
+    global _listener
+    _listener = None
+    _logger.handlers = []
+
+
+atexit.register(shutdown_logging)
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=_reset_after_fork)
+
+
+def log_event(
+    event: str,
+    message: str,
+    level: int = logging.INFO,
+    color: str | None = None,
+    banner: bool = False,
+    **fields,
+) -> None:
+    """
+    Logs a structured event without blocking.
+
+    The default configuration (colored console output) is applied on first use if
+    `configure_logging` was never called in this process.
+
+    Args:
+        event (str): The event name, e.g. "agent.completed".
+        message (str): The human-readable message.
+        level (int, optional): The level. Defaults to logging.INFO.
+        color (str | None, optional): Console color used by the pretty renderer.
+        banner (bool, optional): Whether the pretty renderer frames the message. Defaults to False.
+        **fields: Structured fields, e.g. the agent name, written as-is to the JSONL sink.
+    """
+    if _listener is None:
+        with _configure_lock:
+            if _listener is None:
+                configure_logging(**_settings)
+    if _logger.isEnabledFor(level):
+        _logger.log(level, message, extra={"event": event, "color": color, "banner": banner, "fields": fields})
+
 
 def custom_print(message: str) -> None:
     """
     Displays a fancy print message.
 
+    The message is logged as a "banner" event, so it is written by the background writer
+    instead of blocking the caller.
+
     Args:
         message (str): The message to display.
     """
-    print(Style.BRIGHT + Fore.CYAN + f"\n{'=' * 50}")
-    print(Fore.MAGENTA + f"{message}")
-    print(Style.BRIGHT + Fore.CYAN + f"{'=' * 50}\n")
-    time.sleep(0.5)
+    log_event("banner", message, banner=True)
 
 
 def custom_step_tracker(step: int, total_steps: int) -> None:
@@ -25,4 +196,4 @@ def custom_step_tracker(step: int, total_steps: int) -> None:
         step (int): The current step in the loop.
         total_steps (int): The total number of steps in the loop.
     """
-    custom_print(f"STEP {step + 1}/{total_steps}")
\ No newline at end of file
+    custom_print(f"STEP {step + 1}/{total_steps}")
@@ -0,0 +1,230 @@
+import contextvars
+import cProfile
+import io
+import os
+import pstats
+import re
+import threading
+import time
+import tracemalloc
+from contextlib import contextmanager
+from contextlib import nullcontext
+
+_current_profiler = contextvars.ContextVar("profiler", default=None)
+_profiled_threads = threading.local()  # The cProfile running on this thread, if any
+_IGNORED_FILES = (tracemalloc.__file__, pstats.__file__, cProfile.__file__, __file__)
+
+
+class _Section:
+    """Accumulated measurements of every profiled call sharing a label."""
+
+    def __init__(self):
+        self.calls = 0
+        self.wall = 0.0
+        self.cpu = 0.0
+        self.stats = None  # pstats.Stats, if the label ran under its own cProfile
+        self.allocations = {}  # "file:line" -> [size diff, count diff]
+        self.nested = False
+
+
+class Profiler:
+    """
+    Opt-in profiler for agent runs and tool calls.
+
+    Each profiled section runs under a deterministic profiler (cProfile) and between two
+    `tracemalloc` snapshots, whose difference gives the memory the section allocated and kept. Sections sharing a label (e.g. the same agent run twice) are merged.
+    A section started on a thread that is already profiled (a tool called by its agent, or an
+    agent of an async run started while another one is running) only records its time and
+    allocations, as its functions already appear in the enclosing profile.
+
+    Allocation differences are process-wide: with agents running concurrently, a section's
+    allocations include those of its neighbours, so concurrent profiles are approximate.
+
+    Files written to `output_dir`:
+        - `<label>.prof`: the pstats of the label, readable with `pstats` or snakeviz.
+        - `<label>.alloc.txt`: the label's top allocation sites.
+        - `summary.txt`: per-label timings and the top functions and allocation sites over all labels.
+
+    Args:
+        output_dir (str, optional): Directory of the profile files. Defaults to "profiles".
+        top (int, optional): Number of functions and allocation sites in the reports. Defaults to 20.
+        frames (int, optional): Traceback depth recorded by tracemalloc. Defaults to 1.
+    """
+
+    def __init__(self, output_dir: str = "profiles", top: int = 20, frames: int = 1):
+        self.output_dir = output_dir
+        self.top = top
+        self.frames = frames
+        self._sections = {}
+        self._lock = threading.Lock()
+        self._started_tracemalloc = False
+
+    @contextmanager
+    def profile(self, label: str):
+        """
+        Profiles the enclosed block under `label`.
+
+        Args:
+            label (str): The section label, e.g. "agent.<name>" or "tool.<name>".
+        """
+        if not tracemalloc.is_tracing():
+            tracemalloc.start(self.frames)
+            self._started_tracemalloc = True
+
+        nested = _current_profiler.get() is not None
+        enclosing = getattr(_profiled_threads, "profile", None)
+        profile = None
+        if enclosing is None:
+            profile = cProfile.Profile()
+        else:
+            enclosing.disable()  # Keeps the snapshots out of the enclosing profile
+
+        token = _current_profiler.set(self)
+        before = tracemalloc.take_snapshot()
+        if profile is not None:
+            try:
+                profile.enable()
+                _profiled_threads.profile = profile
+            except ValueError:  # Another profiler is already active
+                profile = None
+        else:
+            enclosing.enable()
+        wall, cpu = time.perf_counter(), time.thread_time()
+        try:
+            yield self
+        finally:
+            wall, cpu = time.perf_counter() - wall, time.thread_time() - cpu
+            if profile is not None:
+                profile.disable()
+                _profiled_threads.profile = None
+            elif enclosing is not None:
+                enclosing.disable()
+            allocations = tracemalloc.take_snapshot().compare_to(before, "lineno")
+            _current_profiler.reset(token)
+            self._record(label, wall, cpu, profile, allocations, nested)
+            if enclosing is not None:
+                enclosing.enable()
+
+    def _record(self, label, wall, cpu, profile, allocations, nested):
+        with self._lock:
+            section = self._sections.setdefault(label, _Section())
+            section.calls += 1
+            section.wall += wall
+            section.cpu += cpu
+            section.nested = section.nested or nested
+            if profile is not None:
+                if section.stats is None:
+                    section.stats = pstats.Stats(profile)
+                else:
+                    section.stats.add(profile)
+            for difference in allocations:
+                frame = difference.traceback[0]
+                if frame.filename in _IGNORED_FILES or frame.filename.startswith("<frozen importlib"):
+                    continue
+                site = section.allocations.setdefault(f"{frame.filename}:{frame.lineno}", [0, 0])
+                site[0] += difference.size_diff
+                site[1] += difference.count_diff
+            self._write_section(label, section)
+
+    def _write_section(self, label: str, section: _Section) -> None:
+        os.makedirs(self.output_dir, exist_ok=True)
+        path = os.path.join(self.output_dir, _file_name(label))
+        if section.stats is not None:
+            section.stats.dump_stats(path + ".prof")
+        with open(path + ".alloc.txt", "w") as f:
+            f.write(_format_allocations(section.allocations, self.top))
+
+    def summary(self) -> dict:
+        """
+        Merges the profiles of every label.
+
+        Returns:
+            dict: `sections` (per-label `calls`, `wall` and `cpu` seconds), `functions` (the top
+                functions by cumulative time, as formatted by pstats) and `allocations` (the top
+                allocation sites over the outermost sections, as (site, bytes, blocks) tuples).
+        """
+        with self._lock:
+            sections = dict(self._sections)
+            merged = pstats.Stats(stream=io.StringIO())
+            allocations = {}
+            for section in sections.values():
+                if section.stats is not None:
+                    merged.add(section.stats)
+                if not section.nested:
+                    for site, (size, count) in section.allocations.items():
+                        total = allocations.setdefault(site, [0, 0])
+                        total[0] += size
+                        total[1] += count
+
+        functions = ""
+        if merged.stats:
+            merged.sort_stats("cumulative").print_stats(self.top)
+            functions = merged.stream.getvalue()
+
+        return {
+            "sections": {
+                label: {"calls": section.calls, "wall": section.wall, "cpu": section.cpu}
+                for label, section in sections.items()
+            },
+            "functions": functions,
+            "allocations": [
+                (site, size, count)
+                for site, (size, count) in sorted(allocations.items(), key=lambda item: -item[1][0])[: self.top]
+            ],
+        }
+
+    def write_summary(self) -> str:
+        """
+        Writes `summary.txt` to the output directory.
+
+        Returns:
+            str: The path of the summary.
+        """
+        summary = self.summary()
+        lines = ["Sections (calls, wall s, cpu s):"]
+        for label, section in sorted(summary["sections"].items(), key=lambda item: -item[1]["wall"]):
+            lines.append(f"  {label:<40} {section['calls']:>6} {section['wall']:>10.3f} {section['cpu']:>10.3f}")
+        lines += ["", "Top allocation sites (bytes, blocks):"]
+        lines += [f"  {site} {size:+d} B {count:+d}" for site, size, count in summary["allocations"]]
+        lines += ["", "Top functions by cumulative time:", summary["functions"]]
+
+        os.makedirs(self.output_dir, exist_ok=True)
+        path = os.path.join(self.output_dir, "summary.txt")
+        with open(path, "w") as f:
+            f.write("\n".join(lines))
+        return path
+
+    def close(self) -> None:
+        """Stops tracemalloc if this profiler started it."""
+        if self._started_tracemalloc and tracemalloc.is_tracing():
+            tracemalloc.stop()
+        self._started_tracemalloc = False
+
+
+def _file_name(label: str) -> str:
+    return re.sub(r"[^\w.-]", "_", label)
+
+
+def _format_allocations(allocations: dict, top: int) -> str:
+    ranked = sorted(allocations.items(), key=lambda item: -item[1][0])[:top]
+    return "".join(f"{site} {size:+d} B {count:+d}\n" for site, (size, count) in ranked)
+
+
+def current_profiler() -> Profiler | None:
+    """Returns the profiler of the running agent, if it is being profiled."""
+    return _current_profiler.get()
+
+
+def profile_section(label: str, profiler: Profiler | None = None):
+    """
+    Profiles a block with `profiler`, or with the profiler of the enclosing section if any.
+
+    Args:
+        label (str): The section label.
+        profiler (Profiler | None, optional): The profiler. Defaults to the current one.
+
+    Returns:
+        ContextManager: The profiling context, or a no-op one when profiling is off.
+    """
+    profiler = profiler or _current_profiler.get()
+    return nullcontext() if profiler is None else profiler.profile(label)
@@ -0,0 +1,87 @@
+import string
+from dataclasses import dataclass
+
+_formatter = string.Formatter()
+
+
+@dataclass(frozen=True)
+class CompiledPrompt:
+    """
+    An immutable prompt template whose static fields are interpolated once, at compile time.
+
+    The template is stored as literal text alternating with the remaining (dynamic) fields, so
+    rendering is a single join with no parsing, and the text before the first dynamic field is
+    byte-identical across renders. Keeping that prefix stable lets provider-side prompt caching
+    reuse it between calls.
+
+    Attributes:
+        parts (tuple[tuple[str, str | None, str | None, str], ...]): The literal text preceding
+            each dynamic field, with the field's name (None after the last field), conversion and
+            format spec.
+    """
+
+    parts: tuple
+
+    @property
+    def fields(self) -> tuple[str, ...]:
+        """The names of the dynamic fields, in order."""
+        return tuple(name for _, name, _, _ in self.parts if name is not None)
+
+    @property
+    def prefix(self) -> str:
+        """The static text before the first dynamic field."""
+        return self.parts[0][0]
+
+    def render(self, **values) -> str:
+        """
+        Fills the dynamic fields.
+
+        Args:
+            **values: The value of every dynamic field.
+
+        Returns:
+            str: The prompt.
+
+        Raises:
+            KeyError: If a dynamic field has no value.
+        """
+        pieces = []
+        for literal, name, conversion, spec in self.parts:
+            pieces.append(literal)
+            if name is not None:
+                pieces.append(_format(values[name], conversion, spec))
+        return "".join(pieces)
+
+
+def compile_prompt(template: str, **static) -> CompiledPrompt:
+    """
+    Compiles a `str.format` template, interpolating the `static` fields right away.
+
+    Static values are inserted verbatim: braces they contain are not parsed as fields.
+
+    Args:
+        template (str): The template.
+        **static: The values known at compile time, e.g. an agent's task description.
+
+    Returns:
+        CompiledPrompt: The compiled prompt, whose remaining fields are filled by `render`.
+    """
+    parts = []
+    literal = []
+    for text, name, spec, conversion in _formatter.parse(template):
+        literal.append(text)
+        if name is None:
+            continue
+        if name in static:
+            literal.append(_format(static[name], conversion, spec))
+        else:
+            parts.append(("".join(literal), name, conversion, spec))
+            literal = []
+    parts.append(("".join(literal), None, None, ""))
+    return CompiledPrompt(tuple(parts))
+
+
+def _format(value, conversion: str | None, spec: str) -> str:
+    if conversion is None and not spec:
+        return str(value)
+    return _formatter.format_field(_formatter.convert_field(value, conversion), spec)
@@ -0,0 +1,244 @@
+import asyncio
+import threading
+import time
+
+from .deadline import current_deadline
+
+
+def estimate_tokens(messages: list, max_tokens: int = 0) -> int:
+    """
+    Roughly estimates the tokens a chat completion request counts against a token-per-minute limit.
+
+    Args:
+        messages (list[dict]): The messages sent to the model.
+        max_tokens (int, optional): The completion token budget of the request. Defaults to 0.
+
+    Returns:
+        int: The estimated number of tokens (about 4 characters per token, plus `max_tokens`).
+    """
+    characters = sum(len(str(message.get("content", ""))) for message in messages)
+    return characters // 4 + max_tokens
+
+
+class TokenBucket:
+    """
+    A token bucket refilled continuously at `per_minute` tokens per minute.
+
+    Tokens are reserved rather than waited for: a reservation always succeeds, possibly leaving
+    the bucket in debt, and returns how long the caller must wait before proceeding. Since
+    reservations are serialised, callers are served in the order they arrived.
+
+    Attributes:
+        capacity (float): The size of the bucket, equal to the per-minute limit.
+        rate (float): The refill rate, in tokens per second.
+        tokens (float): The tokens currently available (negative when in debt).
+    """
+
+    def __init__(self, per_minute: float):
+        self.capacity = float(per_minute)
+        self.rate = per_minute / 60.0
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+
+    def _refill(self, now: float) -> None:
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def reserve(self, amount: float, now: float) -> float:
+        """
+        Takes `amount` tokens from the bucket.
+
+        Args:
+            amount (float): The tokens to take.
+            now (float): The current monotonic time.
+
+        Returns:
+            float: The number of seconds to wait before the tokens are actually available.
+        """
+        self._refill(now)
+        self.tokens -= amount
+        return 0.0 if self.tokens >= 0 else -self.tokens / self.rate
+
+    def adjust(self, amount: float) -> None:
+        """
+        Gives back (positive) or takes (negative) tokens after the fact, e.g. once the real
+        usage of a request is known.
+
+        Args:
+            amount (float): The tokens to give back.
+        """
+        self.tokens = min(self.capacity, self.tokens + amount)
+
+
+class RateLimiter:
+    """
+    A process-wide rate limiter keyed by model, with request-per-minute and token-per-minute buckets.
+
+    Models without configured limits are not throttled. Callers over the limit are queued in
+    arrival order instead of failing, and the time they spend waiting is exposed by `metrics`.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._buckets = {}  # model -> (requests bucket | None, tokens bucket | None)
+        self._metrics = {}  # model -> wait time counters
+
+    def configure(self, model: str, rpm: float | None = None, tpm: float | None = None) -> None:
+        """
+        Sets the limits of a model. Passing neither limit removes them.
+
+        Args:
+            model (str): The model name.
+            rpm (float | None, optional): Maximum requests per minute.
+            tpm (float | None, optional): Maximum tokens per minute.
+        """
+        with self._lock:
+            if rpm is None and tpm is None:
+                self._buckets.pop(model, None)
+                return
+            self._buckets[model] = (
+                TokenBucket(rpm) if rpm else None,
+                TokenBucket(tpm) if tpm else None,
+            )
+
+    def reserve(self, model: str, tokens: int = 0, max_wait: float | None = None) -> float | None:
+        """
+        Reserves one request and `tokens` tokens for a model.
+
+        Args:
+            model (str): The model name.
+            tokens (int, optional): The estimated tokens of the request. Defaults to 0.
+            max_wait (float | None, optional): The longest acceptable wait, in seconds. Defaults
+                to None (no limit).
+
+        Returns:
+            float | None: The number of seconds the caller must wait before sending the request,
+                or None if that exceeds `max_wait`, in which case nothing is reserved.
+        """
+        with self._lock:
+            buckets = self._buckets.get(model)
+            if buckets is None:
+                return 0.0
+            requests, token_bucket = buckets
+            now = time.monotonic()
+            delay = 0.0
+            if requests is not None:
+                delay = max(delay, requests.reserve(1, now))
+            if token_bucket is not None:
+                delay = max(delay, token_bucket.reserve(tokens, now))
+
+            if max_wait is not None and delay > max_wait:
+                # Give the reservation back so that later callers are not delayed by it
+                if requests is not None:
+                    requests.adjust(1)
+                if token_bucket is not None:
+                    token_bucket.adjust(tokens)
+                return None
+
+            metrics = self._metrics.setdefault(
+                model, {"requests": 0, "queued": 0, "total_wait": 0.0, "max_wait": 0.0}
+            )
+            metrics["requests"] += 1
+            if delay > 0:
+                metrics["queued"] += 1
+                metrics["total_wait"] += delay
+                metrics["max_wait"] = max(metrics["max_wait"], delay)
+            return delay
+
+    def acquire(self, model: str, tokens: int = 0) -> float:
+        """
+        Blocks until a request of `tokens` tokens may be sent to `model`.
+
+        Under a deadline (see `utils.deadline`), a request that could only be sent after the
+        deadline fails right away instead of waiting for it.
+
+        Args:
+            model (str): The model name.
+            tokens (int, optional): The estimated tokens of the request. Defaults to 0.
+
+        Returns:
+            float: The number of seconds spent waiting.
+
+        Raises:
+            DeadlineExceeded: If the wait would outlast the current deadline.
+        """
+        delay = self._reserve_before_deadline(model, tokens)
+        if delay > 0:
+            time.sleep(delay)
+        return delay
+
+    async def aacquire(self, model: str, tokens: int = 0) -> float:
+        """
+        Asynchronous counterpart of `acquire`, waiting without blocking the event loop.
+
+        Args:
+            model (str): The model name.
+            tokens (int, optional): The estimated tokens of the request. Defaults to 0.
+
+        Returns:
+            float: The number of seconds spent waiting.
+
+        Raises:
+            DeadlineExceeded: If the wait would outlast the current deadline.
+        """
+        delay = self._reserve_before_deadline(model, tokens)
+        if delay > 0:
+            await asyncio.sleep(delay)
+        return delay
+
+    def _reserve_before_deadline(self, model: str, tokens: int) -> float:
+        """
+        Reserves a request, waiting at most until the current deadline.
+        """
+        deadline = current_deadline()
+        max_wait = None if deadline is None else deadline.remaining()
+        delay = self.reserve(model, tokens, max_wait)
+        if delay is None:
+            raise deadline.exceeded()
+        return delay
+
+    def settle(self, model: str, estimated: int, actual: int | None) -> None:
+        """
+        Corrects the token bucket of a model once the real usage of a request is known.
+
+        Args:
+            model (str): The model name.
+            estimated (int): The tokens reserved for the request.
+            actual (int | None): The tokens actually used, if reported by the provider.
+        """
+        if actual is None:
+            return
+        with self._lock:
+            buckets = self._buckets.get(model)
+            if buckets is not None and buckets[1] is not None:
+                buckets[1].adjust(estimated - actual)
+
+    def metrics(self) -> dict:
+        """
+        Returns the queue wait time counters per model.
+
+        Returns:
+            dict: Maps each model to its `requests`, `queued`, `total_wait`, `max_wait` and
+                `avg_wait` (over queued requests) values, in seconds.
+        """
+        with self._lock:
+            return {
+                model: {
+                    **metrics,
+                    "avg_wait": metrics["total_wait"] / metrics["queued"] if metrics["queued"] else 0.0,
+                }
+                for model, metrics in self._metrics.items()
+            }
+
+
+_rate_limiter = RateLimiter()
+
+
+def get_rate_limiter() -> RateLimiter:
+    """
+    Returns the process-wide rate limiter shared by all agents and skills.
+
+    Returns:
+        RateLimiter: The shared rate limiter.
+    """
+    return _rate_limiter
@@ -0,0 +1,353 @@
+import asyncio
+import contextvars
+import functools
+import random
+import threading
+import time
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED
+from concurrent.futures import ThreadPoolExecutor
+from concurrent.futures import wait
+from dataclasses import dataclass
+
+from .deadline import Cancelled
+from .deadline import check_deadline
+from .deadline import remaining_time
+from .tracing import add_to_span
+from .tracing import set_span_attributes
+
+RETRYABLE_STATUS_CODES = {408, 409, 429}
+
+
+@dataclass
+class RetryPolicy:
+    """
+    How the completion requests of a model are retried and hedged.
+
+    Attributes:
+        max_attempts (int): Maximum number of attempts, including the first one.
+        base_delay (float): Backoff before the first retry, in seconds; doubled at every retry.
+        max_delay (float): Upper bound of the backoff, in seconds.
+        hedge (bool): Whether to send a duplicate request when the first one is slower than usual.
+        hedge_quantile (float): Latency quantile after which the duplicate request is sent.
+        hedge_min_samples (int): Number of latency samples needed before hedging starts.
+
+    Raises:
+        ValueError: If `max_attempts` is below 1 or a delay is negative.
+    """
+
+    max_attempts: int = 3
+    base_delay: float = 0.5
+    max_delay: float = 20.0
+    hedge: bool = False
+    hedge_quantile: float = 0.95
+    hedge_min_samples: int = 20
+
+    def __post_init__(self):
+        if self.max_attempts < 1:
+            raise ValueError(f"max_attempts must be at least 1, got {self.max_attempts}.")
+        if self.base_delay < 0 or self.max_delay < 0:
+            raise ValueError(
+                f"Retry delays must not be negative, got base_delay={self.base_delay}, max_delay={self.max_delay}."
+            )
+
+
+@functools.lru_cache(maxsize=1)
+def _transient_error_types() -> tuple:
+    """Returns the exception types worth retrying, including OpenAI's if the package is installed."""
+    types = [ConnectionError, TimeoutError]
+    try:
+        import openai
+
+        # APITimeoutError is a subclass of APIConnectionError
+        types += [openai.APIConnectionError, openai.RateLimitError, openai.InternalServerError]
+    except ImportError:
+        pass
+    return tuple(types)
+
+
+def is_retryable(error: Exception) -> bool:
+    """
+    Classifies an error raised by a completion request.
+
+    Connection errors, timeouts, rate limiting (429), conflicts (409), request timeouts (408) and
+    server errors (5xx) are transient; cancellations, expired deadlines and every other client
+    error (bad request, authentication, ...) are not.
+
+    Args:
+        error (Exception): The error.
+
+    Returns:
+        bool: True if the request may succeed when retried.
+    """
+    if isinstance(error, Cancelled):
+        return False
+    status_code = getattr(error, "status_code", None)
+    if isinstance(status_code, int):
+        return status_code in RETRYABLE_STATUS_CODES or status_code >= 500
+    return isinstance(error, _transient_error_types())
+
+
+def _retry_after(error: Exception) -> float | None:
+    """Returns the delay requested by the server through a Retry-After header, if any."""
+    response = getattr(error, "response", None)
+    headers = getattr(response, "headers", None)
+    if not headers:
+        return None
+    try:
+        return float(headers.get("retry-after"))
+    except (TypeError, ValueError):
+        return None
+
+
+class ResilientCaller:
+    """
+    A process-wide call layer retrying and hedging completion requests, with per-model policies.
+
+    Transient errors (see `is_retryable`) are retried with exponential backoff and full jitter,
+    honouring the server's Retry-After header and never sleeping past the current deadline. With
+    hedging enabled, a duplicate request is sent once the first one has been running for longer
+    than the model's recent latency quantile (p95 by default), and whichever answers first wins.
+
+    Args:
+        default_policy (RetryPolicy | None, optional): Policy of the models without their own one.
+        window (int, optional): Number of recent latencies kept per model. Defaults to 200.
+        hedge_workers (int, optional): Threads available to synchronous hedged requests. Defaults to 64.
+    """
+
+    def __init__(self, default_policy: RetryPolicy | None = None, window: int = 200, hedge_workers: int = 64):
+        self.default_policy = default_policy or RetryPolicy()
+        self._window = window
+        self._hedge_workers = hedge_workers
+        self._executor = None
+        self._policies = {}
+        self._latencies = {}  # model -> recent successful request latencies
+        self._metrics = {}  # model -> counters
+        self._lock = threading.Lock()
+
+    def configure(self, model: str, policy: RetryPolicy | None = None) -> None:
+        """
+        Sets the policy of a model. Passing None restores the default policy.
+
+        Args:
+            model (str): The model name.
+            policy (RetryPolicy | None, optional): The policy.
+        """
+        with self._lock:
+            if policy is None:
+                self._policies.pop(model, None)
+            else:
+                self._policies[model] = policy
+
+    def policy(self, model: str) -> RetryPolicy:
+        """Returns the policy of a model."""
+        return self._policies.get(model, self.default_policy)
+
+    def hedge_delay(self, model: str) -> float | None:
+        """
+        Returns how long to wait for a request before hedging it, or None if it must not be hedged.
+
+        Args:
+            model (str): The model name.
+        """
+        policy = self.policy(model)
+        if not policy.hedge:
+            return None
+        with self._lock:
+            latencies = sorted(self._latencies.get(model, ()))
+        if len(latencies) < policy.hedge_min_samples:
+            return None
+        return latencies[int(policy.hedge_quantile * (len(latencies) - 1))]
+
+    def call(self, model: str, request):
+        """
+        Calls `request` with retries and, if enabled, hedging.
+
+        Args:
+            model (str): The model the request is sent to.
+            request (Callable[[], Any]): Sends the request and returns its result.
+
+        Returns:
+            Any: The result of the first successful request.
+
+        Raises:
+            Exception: The last error, once it is not retryable or the attempts are exhausted.
+        """
+        policy = self.policy(model)
+        self._count(model, "calls")
+        for attempt in range(policy.max_attempts):
+            self._count(model, "attempts")
+            try:
+                return self._hedged(model, request)
+            except Exception as e:
+                delay = self._retry_delay(model, policy, attempt, e)
+                if delay is None:
+                    raise
+            time.sleep(delay)
+            check_deadline()
+
+    async def acall(self, model: str, request):
+        """
+        Asynchronous counterpart of `call`. Losing hedged requests are cancelled.
+
+        Args:
+            model (str): The model the request is sent to.
+            request (Callable[[], Awaitable]): Sends the request and returns its result.
+
+        Returns:
+            Any: The result of the first successful request.
+        """
+        policy = self.policy(model)
+        self._count(model, "calls")
+        for attempt in range(policy.max_attempts):
+            self._count(model, "attempts")
+            try:
+                return await self._ahedged(model, request)
+            except Exception as e:
+                delay = self._retry_delay(model, policy, attempt, e)
+                if delay is None:
+                    raise
+            await asyncio.sleep(delay)
+            check_deadline()
+
+    def _retry_delay(self, model: str, policy: RetryPolicy, attempt: int, error: Exception) -> float | None:
+        """
+        Returns the backoff before the next attempt, or None if the error must be raised.
+        """
+        if attempt + 1 >= policy.max_attempts or not is_retryable(error):
+            self._count(model, "failures")
+            return None
+
+        delay = random.uniform(0, min(policy.max_delay, policy.base_delay * 2**attempt))
+        retry_after = _retry_after(error)
+        if retry_after is not None:
+            delay = max(delay, min(retry_after, policy.max_delay))
+
+        remaining = remaining_time()
+        if remaining is not None and delay >= remaining:
+            self._count(model, "failures")
+            return None  # The retry could not finish before the deadline anyway
+
+        self._count(model, "retries")
+        add_to_span("retries")
+        return delay
+
+    def _timed(self, model: str, request):
+        started = time.perf_counter()
+        result = request()
+        self._record(model, time.perf_counter() - started)
+        return result
+
+    async def _atimed(self, model: str, request):
+        started = time.perf_counter()
+        result = await request()
+        self._record(model, time.perf_counter() - started)
+        return result
+
+    def _hedged(self, model: str, request):
+        delay = self.hedge_delay(model)
+        if delay is None:
+            return self._timed(model, request)
+
+        executor = self._hedge_executor()
+        primary = executor.submit(contextvars.copy_context().run, self._timed, model, request)
+        done, _ = wait([primary], timeout=delay)
+        if done:
+            return primary.result()
+
+        self._count(model, "hedges")
+        add_to_span("hedges")
+        hedge = executor.submit(contextvars.copy_context().run, self._timed, model, request)
+        pending = {primary, hedge}
+        error = None
+        while pending:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                try:
+                    result = future.result()
+                except Exception as e:
+                    error = e
+                    continue
+                if future is hedge:
+                    self._count(model, "hedge_wins")
+                    set_span_attributes(hedge_won=True)
+                return result  # The slower request still completes in the background
+        raise error
+
+    async def _ahedged(self, model: str, request):
+        delay = self.hedge_delay(model)
+        if delay is None:
+            return await self._atimed(model, request)
+
+        primary = asyncio.ensure_future(self._atimed(model, request))
+        tasks = {primary}
+        try:
+            done, _ = await asyncio.wait(tasks, timeout=delay)
+            if done:
+                return primary.result()
+
+            self._count(model, "hedges")
+            add_to_span("hedges")
+            hedge = asyncio.ensure_future(self._atimed(model, request))
+            tasks.add(hedge)
+            pending = set(tasks)
+            error = None
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    if task.exception() is not None:
+                        error = task.exception()
+                        continue
+                    if task is hedge:
+                        self._count(model, "hedge_wins")
+                        set_span_attributes(hedge_won=True)
+                    return task.result()
+            raise error
+        finally:
+            for task in tasks:
+                task.cancel()
+
+    def _hedge_executor(self) -> ThreadPoolExecutor:
+        with self._lock:
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(max_workers=self._hedge_workers, thread_name_prefix="hedge")
+            return self._executor
+
+    def _record(self, model: str, latency: float) -> None:
+        with self._lock:
+            latencies = self._latencies.get(model)
+            if latencies is None:
+                latencies = self._latencies[model] = deque(maxlen=self._window)
+            latencies.append(latency)
+
+    def _count(self, model: str, counter: str) -> None:
+        with self._lock:
+            metrics = self._metrics.setdefault(
+                model, {"calls": 0, "attempts": 0, "retries": 0, "failures": 0, "hedges": 0, "hedge_wins": 0}
+            )
+            metrics[counter] += 1
+
+    def metrics(self) -> dict:
+        """
+        Returns the retry and hedging counters per model.
+
+        Returns:
+            dict: Maps each model to its `calls`, `attempts`, `retries`, `failures` (calls that
+                raised), `hedges` (duplicate requests sent) and `hedge_wins` (duplicates that
+                answered first) counters.
+        """
+        with self._lock:
+            return {model: dict(metrics) for model, metrics in self._metrics.items()}
+
+
+_resilient_caller = ResilientCaller()
+
+
+def get_resilient_caller() -> ResilientCaller:
+    """
+    Returns the process-wide call layer used by `completions_create` and `acompletions_create`.
+
+    Returns:
+        ResilientCaller: The shared call layer.
+    """
+    return _resilient_caller
@@ -0,0 +1,181 @@
+import asyncio
+import threading
+import weakref
+
+from .deadline import Cancelled
+from .deadline import check_deadline
+from .deadline import remaining_time
+from .tracing import set_span_attributes
+
+
+class _Call:
+    """A request in flight in a thread, shared by its leader and the callers waiting on it."""
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+
+
+class SingleFlight:
+    """
+    Coalesces identical requests in flight: the first caller (the leader) sends the request and
+    concurrent callers with the same key wait for its result instead of sending their own.
+
+    Threads and asyncio tasks are coalesced separately, tasks per event loop. If the leader fails,
+    its waiters get the same error, unless the leader was cancelled (e.g. its own deadline
+    expired): the waiters then elect a new leader among themselves.
+
+    Args:
+        enabled (bool, optional): Whether requests are coalesced. Defaults to True.
+    """
+
+    def __init__(self, enabled: bool = True):
+        self.enabled = enabled
+        self._calls = {}  # key -> _Call
+        self._async_calls = weakref.WeakKeyDictionary()  # event loop -> {key -> Future}
+        self._lock = threading.Lock()
+        self._counters = {"calls": 0, "coalesced": 0}
+
+    def do(self, key: str, fn):
+        """
+        Calls `fn`, unless a call with the same key is in flight, whose result is then returned.
+
+        Args:
+            key (str): The request key, see `utils.cache.cache_key`.
+            fn (Callable[[], Any]): Sends the request.
+
+        Returns:
+            Any: The result of `fn`, or of the identical call in flight.
+
+        Raises:
+            DeadlineExceeded: If the current deadline expires while waiting for the leader.
+        """
+        if not self.enabled:
+            return fn()
+        while True:
+            with self._lock:
+                call = self._calls.get(key)
+                leader = call is None
+                if leader:
+                    call = self._calls[key] = _Call()
+                    self._counters["calls"] += 1
+
+            if leader:
+                try:
+                    call.result = fn()
+                    return call.result
+                except BaseException as e:
+                    call.error = e
+                    raise
+                finally:
+                    with self._lock:
+                        del self._calls[key]
+                    call.done.set()
+
+            if not call.done.wait(remaining_time()):
+                check_deadline()  # Raises, as the wait only times out on the deadline
+            if isinstance(call.error, Cancelled):
+                continue
+            self._coalesced()
+            if call.error is not None:
+                raise call.error
+            return call.result
+
+    async def ado(self, key: str, fn):
+        """
+        Asynchronous counterpart of `do`, where `fn` returns an awaitable.
+
+        Args:
+            key (str): The request key.
+            fn (Callable[[], Awaitable]): Sends the request.
+
+        Returns:
+            Any: The result of `fn`, or of the identical call in flight on this event loop.
+        """
+        if not self.enabled:
+            return await fn()
+        loop = asyncio.get_running_loop()
+        while True:
+            with self._lock:
+                calls = self._async_calls.setdefault(loop, {})
+                future = calls.get(key)
+                leader = future is None
+                if leader:
+                    future = calls[key] = loop.create_future()
+                    self._counters["calls"] += 1
+
+            if leader:
+                try:
+                    result = await fn()
+                except (Cancelled, asyncio.CancelledError):
+                    future.cancel()  # Waiters elect a new leader
+                    raise
+                except BaseException as e:
+                    future.set_exception(e)
+                    future.exception()  # Marks the error as retrieved if nobody was waiting
+                    raise
+                else:
+                    future.set_result(result)
+                    return result
+                finally:
+                    with self._lock:
+                        del calls[key]
+
+            try:
+                result = await asyncio.shield(future)
+            except asyncio.CancelledError:
+                if future.cancelled():
+                    continue
+                raise  # This waiter itself was cancelled
+            except BaseException:
+                self._coalesced()
+                raise
+            self._coalesced()
+            return result
+
+    def _coalesced(self) -> None:
+        with self._lock:
+            self._counters["coalesced"] += 1
+        set_span_attributes(coalesced=True)
+
+    def stats(self) -> dict:
+        """
+        Returns the coalescing counters.
+
+        Returns:
+            dict: `calls` (requests actually sent), `coalesced` (requests saved by waiting on an
+                identical one in flight) and `in_flight` (requests currently being sent).
+        """
+        with self._lock:
+            stats = dict(self._counters)
+            stats["in_flight"] = len(self._calls) + sum(len(calls) for calls in self._async_calls.values())
+        return stats
+
+
+_single_flight = None
+
+
+def set_single_flight(single_flight: SingleFlight | None) -> None:
+    """
+    Enables the process-wide request coalescer used by `completions_create` and
+    `acompletions_create`, or disables it with None (the default).
+
+    Coalesced callers share one sampled completion, so leave it off when identical requests are
+    meant to be sampled independently, e.g. the repeated runs of `multi_agent.batch`.
+
+    Args:
+        single_flight (SingleFlight | None): The coalescer.
+    """
+    global _single_flight
+    _single_flight = single_flight
+
+
+def get_single_flight() -> SingleFlight | None:
+    """
+    Returns the process-wide request coalescer, if coalescing is enabled.
+
+    Returns:
+        SingleFlight | None: The shared coalescer.
+    """
+    return _single_flight
@@ -0,0 +1,306 @@
+import asyncio
+import contextvars
+import json
+import random
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+
+from .deadline import Cancelled
+
+# Span kinds, from outermost to innermost
+SAGA = "saga"
+AGENT = "agent"
+ROUND = "round"
+COMPLETION = "completion"
+TOOL = "tool"
+
+LATENCY_BUCKETS = (0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, float("inf"))
+
+_OTLP_KIND_INTERNAL = 1
+_OTLP_KIND_CLIENT = 3
+_OTLP_STATUS = {"ok": 1, "error": 2, "cancelled": 2}
+
+
+class Span:
+    """
+    A timed operation of a traced run, e.g. a saga run, an agent, a ReAct round, a completion
+    request or a tool call.
+
+    Attributes:
+        tracer (Tracer): The tracer the span is reported to.
+        name (str): The span name.
+        kind (str): One of `SAGA`, `AGENT`, `ROUND`, `COMPLETION` and `TOOL`.
+        trace_id (str): 32 hex digits shared by all the spans of a run.
+        span_id (str): 16 hex digits.
+        parent (Span | None): The enclosing span.
+        parent_id (str | None): The id of the enclosing span.
+        attributes (dict): Model, tokens, retries, agent name...
+        start (int): Start time, in nanoseconds since the epoch.
+        end (int | None): End time, once ended.
+        status (str | None): "ok", "error" or "cancelled", once ended.
+        error (str | None): The error message of a failed span.
+    """
+
+    def __init__(self, tracer, name: str, kind: str, parent=None, attributes: dict | None = None):
+        self.tracer = tracer
+        self.name = name
+        self.kind = kind
+        self.trace_id = parent.trace_id if parent is not None else f"{random.getrandbits(128):032x}"
+        self.span_id = f"{random.getrandbits(64):016x}"
+        self.parent = parent
+        self.parent_id = parent.span_id if parent is not None else None
+        self.attributes = dict(attributes or {})
+        self.start = time.time_ns()
+        self.end = None
+        self.status = None
+        self.error = None
+        self._started = time.perf_counter()
+        self._duration = None
+        self._lock = threading.Lock()
+
+    def set(self, **attributes) -> None:
+        """Sets attributes of the span."""
+        with self._lock:
+            self.attributes.update(attributes)
+
+    def add(self, key: str, amount: int | float = 1) -> None:
+        """Increments a numeric attribute, e.g. a token or retry count."""
+        with self._lock:
+            self.attributes[key] = self.attributes.get(key, 0) + amount
+
+    def finish(self, error: BaseException | None = None) -> None:
+        """
+        Ends the span and reports it to its tracer. Only the first call has an effect.
+
+        Args:
+            error (BaseException | None, optional): The error that ended the operation, if any.
+        """
+        with self._lock:
+            if self.end is not None:
+                return
+            self._duration = time.perf_counter() - self._started
+            self.end = self.start + int(self._duration * 1e9)
+            if error is None:
+                self.status = "ok"
+            else:
+                cancelled = isinstance(error, (Cancelled, asyncio.CancelledError))
+                self.status = "cancelled" if cancelled else "error"
+                self.error = f"{type(error).__name__}: {error}"
+        self.tracer.record(self)
+
+    @property
+    def duration(self) -> float | None:
+        """The duration in seconds, once ended."""
+        return self._duration
+
+    def to_otlp(self) -> dict:
+        """Returns the span in the OTLP/JSON format."""
+        attributes = {"sagallm.kind": self.kind, **self.attributes}
+        span = {
+            "traceId": self.trace_id,
+            "spanId": self.span_id,
+            "name": self.name,
+            "kind": _OTLP_KIND_CLIENT if self.kind == COMPLETION else _OTLP_KIND_INTERNAL,
+            "startTimeUnixNano": str(self.start),
+            "endTimeUnixNano": str(self.end),
+            "attributes": [{"key": key, "value": _otlp_value(value)} for key, value in attributes.items()],
+            "status": {"code": _OTLP_STATUS.get(self.status, 0)},
+        }
+        if self.parent_id is not None:
+            span["parentSpanId"] = self.parent_id
+        if self.error is not None:
+            span["status"]["message"] = self.error
+        return span
+
+
+def _otlp_value(value) -> dict:
+    if isinstance(value, bool):
+        return {"boolValue": value}
+    if isinstance(value, int):
+        return {"intValue": str(value)}
+    if isinstance(value, float):
+        return {"doubleValue": value}
+    if isinstance(value, (list, tuple)):
+        return {"arrayValue": {"values": [_otlp_value(item) for item in value]}}
+    return {"stringValue": str(value)}
+
+
+class Tracer:
+    """
+    Collects the finished spans of traced runs and summarises them.
+
+    Args:
+        service_name (str, optional): The service name of the exported resource. Defaults to "sagallm".
+        max_spans (int, optional): Maximum number of finished spans kept; the oldest are dropped
+            first. Defaults to 100000.
+    """
+
+    def __init__(self, service_name: str = "sagallm", max_spans: int = 100_000):
+        self.service_name = service_name
+        self._spans = deque(maxlen=max_spans)
+        self._lock = threading.Lock()
+
+    def start_span(self, name: str, kind: str, parent: Span | None = None, **attributes) -> Span:
+        """
+        Starts a span that must be ended with `Span.finish`. See `span` for the context manager.
+
+        Args:
+            name (str): The span name.
+            kind (str): The span kind.
+            parent (Span | None, optional): The enclosing span.
+            **attributes: Initial attributes.
+
+        Returns:
+            Span: The started span.
+        """
+        return Span(self, name, kind, parent, attributes)
+
+    def record(self, span: Span) -> None:
+        """Stores a finished span."""
+        with self._lock:
+            self._spans.append(span)
+
+    @property
+    def spans(self) -> list[Span]:
+        """The finished spans, oldest first."""
+        with self._lock:
+            return list(self._spans)
+
+    def clear(self) -> None:
+        """Drops the finished spans."""
+        with self._lock:
+            self._spans.clear()
+
+    def export_json(self, path: str, trace_id: str | None = None) -> int:
+        """
+        Appends the finished spans to `path` as one OTLP/JSON `resourceSpans` document per line,
+        the format read by OpenTelemetry collectors' file receivers.
+
+        Args:
+            path (str): The output file.
+            trace_id (str | None, optional): Only export the spans of this trace.
+
+        Returns:
+            int: The number of exported spans.
+        """
+        spans = [span for span in self.spans if trace_id is None or span.trace_id == trace_id]
+        document = {
+            "resourceSpans": [
+                {
+                    "resource": {"attributes": [{"key": "service.name", "value": _otlp_value(self.service_name)}]},
+                    "scopeSpans": [{"scope": {"name": "sagallm"}, "spans": [span.to_otlp() for span in spans]}],
+                }
+            ]
+        }
+        with open(path, "a") as f:
+            f.write(json.dumps(document) + "\n")
+        return len(spans)
+
+    def histograms(self, kind: str = AGENT, key: str = "agent") -> dict:
+        """
+        Summarises the latency of the spans of a kind, grouped by an attribute.
+
+        Args:
+            kind (str, optional): The span kind. Defaults to `AGENT`.
+            key (str, optional): The attribute to group by. Defaults to "agent".
+
+        Returns:
+            dict: Maps each attribute value to the `count`, `errors`, `mean`, `p50`, `p95`, `p99`
+                and `max` latencies (in seconds), the cumulative `buckets` counts (upper bound ->
+                count, see `LATENCY_BUCKETS`) and the summed `prompt_tokens` and `completion_tokens`.
+        """
+        groups = {}
+        for span in self.spans:
+            if span.kind == kind:
+                groups.setdefault(span.attributes.get(key), []).append(span)
+
+        summary = {}
+        for value, spans in groups.items():
+            latencies = sorted(span.duration for span in spans)
+            summary[value] = {
+                "count": len(latencies),
+                "errors": sum(1 for span in spans if span.status != "ok"),
+                "mean": sum(latencies) / len(latencies),
+                "p50": _quantile(latencies, 0.5),
+                "p95": _quantile(latencies, 0.95),
+                "p99": _quantile(latencies, 0.99),
+                "max": latencies[-1],
+                "buckets": {bound: sum(1 for latency in latencies if latency <= bound) for bound in LATENCY_BUCKETS},
+                "prompt_tokens": sum(span.attributes.get("prompt_tokens", 0) for span in spans),
+                "completion_tokens": sum(span.attributes.get("completion_tokens", 0) for span in spans),
+            }
+        return summary
+
+
+def _quantile(sorted_values: list, q: float) -> float:
+    return sorted_values[int(q * (len(sorted_values) - 1))]
+
+
+_current_span = contextvars.ContextVar("span", default=None)
+
+
+def current_span() -> Span | None:
+    """Returns the innermost span of the running operation, if it is traced."""
+    return _current_span.get()
+
+
+@contextmanager
+def span(name: str, kind: str, tracer: Tracer | None = None, parent: Span | None = None, **attributes):
+    """
+    Traces the enclosed block as a child of `parent` (by default, the current span).
+
+    Outside of a traced run (no parent and no tracer) nothing is recorded and None is yielded,
+    so instrumented code costs next to nothing when tracing is off.
+
+    Args:
+        name (str): The span name.
+        kind (str): The span kind.
+        tracer (Tracer | None, optional): Starts a new trace on this tracer when there's no parent.
+        parent (Span | None, optional): The enclosing span. Defaults to the current span.
+        **attributes: Initial attributes.
+
+    Yields:
+        Span | None: The span.
+    """
+    parent = parent if parent is not None else _current_span.get()
+    tracer = tracer or (parent.tracer if parent is not None else None)
+    if tracer is None:
+        yield None
+        return
+
+    current = tracer.start_span(name, kind, parent, **attributes)
+    token = _current_span.set(current)
+    try:
+        yield current
+    except BaseException as e:
+        current.finish(e)
+        raise
+    else:
+        current.finish()
+    finally:
+        _current_span.reset(token)
+
+
+def set_span_attributes(**attributes) -> None:
+    """Sets attributes of the current span, if any."""
+    current = _current_span.get()
+    if current is not None:
+        current.set(**attributes)
+
+
+def add_to_span(key: str, amount: int | float = 1, propagate: bool = False) -> None:
+    """
+    Increments a numeric attribute of the current span, if any.
+
+    Args:
+        key (str): The attribute.
+        amount (int | float, optional): The increment. Defaults to 1.
+        propagate (bool, optional): Also increment it on every enclosing span, e.g. to total the
+            tokens of an agent or a run. Defaults to False.
+    """
+    current = _current_span.get()
+    while current is not None:
+        current.add(key, amount)
+        current = current.parent if propagate else None
@@ -0,0 +1,79 @@
+import asyncio
+import threading
+
+from utils.cache import acached_completion
+from utils.cache import ResponseCache
+from utils.cache import set_response_cache
+
+
+def test_oversized_value_replaces_the_disk_entry(tmp_path):
+    cache = ResponseCache(str(tmp_path / "cache.db"), max_entries=1, max_disk_bytes=10)
+    cache.put("key", "old")
+    cache.put("key", "a value larger than the disk tier")
+    cache.put("other", "x")  # Evicts "key" from the memory tier
+
+    assert cache.get("key") is None
+    assert cache.stats()["disk_bytes"] == 1
+    cache.close()
+
+
+def test_disk_hit_after_memory_eviction(tmp_path):
+    cache = ResponseCache(str(tmp_path / "cache.db"), max_entries=1)
+    cache.put("key", "value")
+    cache.put("other", "x")
+
+    assert cache.get("key") == "value"
+    assert cache.stats()["disk_hits"] == 1
+    cache.close()
+
+
+def _record_threads(cache, threads):
+    for name in ("get", "put"):
+        method = getattr(cache, name)
+
+        def record(*args, _method=method, _name=name):
+            threads.append((_name, threading.get_ident()))
+            return _method(*args)
+
+        setattr(cache, name, record)
+
+
+def test_async_disk_tier_runs_off_the_event_loop(tmp_path):
+    cache = ResponseCache(str(tmp_path / "cache.db"), max_entries=1)
+    threads = []
+    _record_threads(cache, threads)
+
+    async def create():
+        return "response"
+
+    async def complete(key):
+        return await acached_completion(key, create), threading.get_ident()
+
+    set_response_cache(cache)
+    try:
+        _, loop_thread = asyncio.run(complete("key"))  # Miss, then store
+        assert [name for name, _ in threads] == ["get", "put"]
+        assert all(thread != loop_thread for _, thread in threads)
+        cache.put("other", "x")  # Evicts "key" from the memory tier
+        threads.clear()
+        response, loop_thread = asyncio.run(complete("key"))  # Disk hit
+        other, _ = asyncio.run(complete("key"))  # Memory hit
+    finally:
+        set_response_cache(None)
+        cache.close()
+
+    assert response == other == "response"
+    assert [name for name, _ in threads] == ["get"]  # The memory hit never left the loop
+    assert all(thread != loop_thread for _, thread in threads)
+    assert cache.stats()["memory_hits"] == 1 and cache.stats()["disk_hits"] == 1
+
+
+def test_delete_drops_both_tiers(tmp_path):
+    cache = ResponseCache(str(tmp_path / "cache.db"))
+    cache.put("key", "value")
+
+    cache.delete("key")
+
+    assert cache.get("key") is None
+    assert cache.stats()["disk_bytes"] == 0
+    cache.close()
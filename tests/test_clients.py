@@ -0,0 +1,52 @@
+import types
+
+import pytest
+
+from planning_agent.react_agent import ReactAgent
+from utils.clients import get_client_registry
+
+
+class FakeClient:
+    def __init__(self, answer):
+        self.chat = types.SimpleNamespace(completions=types.SimpleNamespace(create=self.create))
+        self.answer = answer
+
+    def create(self, **kwargs):
+        message = types.SimpleNamespace(content=self.answer)
+        return types.SimpleNamespace(choices=[types.SimpleNamespace(message=message)], usage=None)
+
+
+@pytest.fixture
+def registry():
+    registry = get_client_registry()
+    yield registry
+    registry.register()
+    registry.configure()
+
+
+def test_existing_agents_follow_the_registry(registry):
+    registry.register(FakeClient("first"))
+    agent = ReactAgent(tools=[])
+    assert agent.run("question") == "first"
+
+    registry.register(FakeClient("second"))
+    assert agent.run("question") == "second"
+
+
+def test_reconfiguring_doesnt_leave_agents_with_a_closed_client(registry):
+    registry.configure(api_key="sk-test")
+    agent = ReactAgent(tools=[])
+    first = agent._client()
+
+    registry.configure(api_key="sk-test", base_url="http://localhost:1")
+
+    assert first.is_closed()
+    assert agent._client() is not first
+    assert not agent._client().is_closed()
+
+
+def test_injected_client_is_kept(registry):
+    agent = ReactAgent(tools=[], client=FakeClient("injected"))
+    registry.register(FakeClient("shared"))
+
+    assert agent.run("question") == "injected"
@@ -0,0 +1,43 @@
+import pytest
+
+from multi_agent.context import AgentContext
+from multi_agent.context import ContextCompactor
+from multi_agent.context import count_tokens
+
+
+def _context(entries: int, words: int) -> AgentContext:
+    context = AgentContext("Supervisor")
+    for index in range(entries):
+        context.append(" ".join(f"fact{index}-{word}" for word in range(words)), source=f"Agent{index}")
+    return context
+
+
+@pytest.mark.parametrize("budget", [0, 10, 50, 200, 500, 1000, 3000])
+@pytest.mark.parametrize("entries, words", [(20, 30), (50, 5), (3, 400)])
+def test_render_never_exceeds_budget(budget, entries, words):
+    context = _context(entries, words)
+
+    rendered = context.render(budget, ContextCompactor())
+
+    assert count_tokens(rendered) <= budget
+
+
+def test_render_keeps_context_that_fits_verbatim():
+    context = _context(3, 10)
+
+    assert context.render(10_000, ContextCompactor()) == context.render()
+
+
+def test_larger_budget_keeps_more_context():
+    context = _context(20, 30)
+    compactor = ContextCompactor()
+
+    assert count_tokens(context.render(200, compactor)) < count_tokens(context.render(1000, compactor))
+
+
+def test_round_budget_never_rounds_up():
+    compactor = ContextCompactor(granularity=64)
+
+    assert compactor.round_budget(10) == 10
+    assert compactor.round_budget(100) == 64
+    assert compactor.round_budget(128) == 128
@@ -0,0 +1,79 @@
+import types
+
+import pytest
+
+from multi_agent.agent import Agent
+from multi_agent.distributed import Broker
+from multi_agent.saga import Saga
+from multi_agent.scheduler import CriticalPathScheduler
+from multi_agent.scheduler import LatencyTracker
+
+
+class InlineBroker(Broker):
+    """Answers every task right away, as if a worker had run it."""
+
+    def __init__(self):
+        self.results = []
+        self.prompts = {}
+
+    def submit(self, task):
+        self.prompts[task["agent"]] = task["prompt"]
+        self.results.append({"task_id": task["task_id"], "agent": task["agent"], "output": f"output of {task['agent']}"})
+
+    def next_task(self, timeout=None):
+        return None
+
+    def publish_result(self, result):
+        self.results.append(result)
+
+    def next_result(self, timeout=None):
+        return self.results.pop(0) if self.results else None
+
+
+def _agents(*names):
+    return [Agent(name, "backstory", f"task of {name}", client=object()) for name in names]
+
+
+def test_incomplete_broker_fails_on_construction():
+    class Incomplete(Broker):
+        def submit(self, task):
+            pass
+
+    with pytest.raises(TypeError):
+        Incomplete()
+
+
+def test_prediction_uses_the_distributed_concurrency():
+    a, b, c = _agents("A", "B", "C")
+    saga = Saga(broker=InlineBroker(), scheduler=CriticalPathScheduler(LatencyTracker(default=1.0)))
+    saga.transaction_manager([a, b, c])
+
+    saga.saga_coordinator()
+
+    assert saga.schedule_report["predicted_makespan"] == pytest.approx(1.0)
+
+
+def test_prediction_is_bounded_by_the_known_workers():
+    a, b, c = _agents("A", "B", "C")
+    workers = [types.SimpleNamespace(pid=1, is_alive=lambda: True)] * 2
+    saga = Saga(broker=InlineBroker(), workers=workers, scheduler=CriticalPathScheduler(LatencyTracker(default=1.0)))
+    saga.transaction_manager([a, b, c])
+
+    saga.saga_coordinator()
+
+    assert saga.schedule_report["predicted_makespan"] == pytest.approx(2.0)
+
+
+def test_outputs_reach_the_dependents_of_a_compiled_saga():
+    a, b = _agents("A", "B")
+    a >> b
+    broker = InlineBroker()
+    saga = Saga(broker=broker)
+    saga.transaction_manager([a, b])
+    saga.compile()
+
+    saga.saga_coordinator()
+
+    assert saga.context == {"A": "output of A", "B": "output of B"}
+    assert [(entry.source, entry.content) for entry in b.context.entries] == [("A", "output of A")]
+    assert "output of A" in broker.prompts["B"]
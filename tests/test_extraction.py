@@ -0,0 +1,74 @@
+from types import SimpleNamespace
+
+import pytest
+
+from utils.completions import completions_create
+from utils.extraction import TagStreamParser
+
+COMPLETION = "<thought>look it up</thought><tool_call>{\"name\": \"search\"}</tool_call><tool_call>{}</tool_call>"
+FIRST_CALL_END = COMPLETION.index("</tool_call>") + len("</tool_call>")
+
+
+@pytest.mark.parametrize("split", range(1, len(COMPLETION)))
+def test_stop_tag_split_across_chunks_is_found(split):
+    parser = TagStreamParser()
+
+    parser.feed(COMPLETION[:split])
+    parser.feed(COMPLETION[split:])
+
+    assert parser.done
+    assert parser.stopped_at == "tool_call"
+    assert parser.text == COMPLETION[:FIRST_CALL_END]
+
+
+def test_single_character_chunks_stop_at_the_first_closing_tag():
+    parser = TagStreamParser()
+
+    fed = 0
+    for character in COMPLETION:
+        fed += 1
+        if parser.feed(character):
+            break
+
+    assert fed == FIRST_CALL_END
+    assert parser.text == COMPLETION[:FIRST_CALL_END]
+    assert parser.feed("<response>ignored</response>")
+    assert parser.text == COMPLETION[:FIRST_CALL_END]
+
+
+def test_earliest_closing_tag_wins_within_a_chunk():
+    parser = TagStreamParser()
+
+    parser.feed("<response>done</response><tool_call>{}</tool_call>")
+
+    assert parser.stopped_at == "response"
+    assert parser.text == "<response>done</response>"
+
+
+class _Stream:
+    def __init__(self, chunks):
+        self.chunks = chunks
+        self.sent = 0
+        self.closed = False
+
+    def __iter__(self):
+        for chunk in self.chunks:
+            self.sent += 1
+            yield SimpleNamespace(choices=[SimpleNamespace(delta=SimpleNamespace(content=chunk))], usage=None)
+
+    def close(self):
+        self.closed = True
+
+
+def test_streamed_completion_is_closed_after_the_stop_tag():
+    chunks = [COMPLETION[i:i + 5] for i in range(0, len(COMPLETION), 5)]
+    stream = _Stream(chunks)
+    client = SimpleNamespace(
+        chat=SimpleNamespace(completions=SimpleNamespace(create=lambda **kwargs: stream))
+    )
+
+    text = completions_create(client, [{"role": "user", "content": "go"}], "model", stream=True, use_cache=False)
+
+    assert text == COMPLETION[:FIRST_CALL_END]
+    assert stream.closed
+    assert stream.sent == -(-FIRST_CALL_END // 5)  # Chunks after the stop tag are never read
@@ -0,0 +1,93 @@
+import pytest
+
+from multi_agent.agent import Agent
+from multi_agent.graph import CompiledGraph
+from multi_agent.graph import topological_order
+from multi_agent.saga import Saga
+
+
+def _agent(name):
+    agent = Agent(name, "backstory", f"task of {name}", client=object())
+    agent.react_agent.run = lambda user_msg, *args, **kwargs: f"output of {name}"
+    return agent
+
+
+def _diamond():
+    a, b, c, d = (_agent(name) for name in "abcd")
+    a >> [b, c]
+    [b, c] >> d
+    b >> d  # Repeated edge
+    return a, b, c, d
+
+
+def test_compiled_adjacency_matches_the_live_graph():
+    agents = _diamond()
+
+    graph = CompiledGraph(agents)
+
+    for agent in agents:
+        assert graph.dependents(agent) == list(agent.dependents)
+        assert graph.dependencies(agent) == list(agent.dependencies)
+    assert graph.in_degrees() == {agent: len(agent.dependencies) for agent in agents}
+    assert [agent.name for agent in graph.sorted_agents()] in (list("abcd"), list("acbd"))
+    assert graph.get("c") is agents[2]
+
+
+def test_compiled_graph_ignores_edges_to_outside_agents():
+    a, b, c, d = _diamond()
+
+    graph = CompiledGraph([b, c, d])
+
+    assert graph.dependencies(b) == []
+    assert graph.in_degrees() == {b: 0, c: 0, d: 2}
+
+
+def test_edge_added_after_compile_marks_the_graph_stale():
+    a, b, c, d = _diamond()
+    graph = CompiledGraph([a, b, c, d])
+    assert not graph.stale
+
+    e = _agent("e")
+    d >> e
+
+    assert graph.stale
+
+
+def test_saga_recompiles_a_stale_graph():
+    a, b, c, d = _diamond()
+    e = _agent("e")
+    saga = Saga()
+    saga.transaction_manager([a, b, c, d, e])
+    saga.compile()
+
+    e >> a  # Added after compile: e must now run first
+    saga.saga_coordinator()
+
+    assert saga.topological_sort()[0] is e
+    assert not saga.graph.stale
+    assert "output of e" in a.context.render()
+
+
+def test_cycle_is_rejected_without_changing_the_graph():
+    a, b, c, d = _diamond()
+    version = topological_order.version
+    order = {agent: agent._topo_index for agent in (a, b, c, d)}
+
+    with pytest.raises(ValueError):
+        d >> a
+    with pytest.raises(ValueError):
+        b >> b
+
+    assert {agent: agent._topo_index for agent in (a, b, c, d)} == order
+    assert a not in d.dependents and d not in a.dependencies
+    assert topological_order.version == version
+
+
+def test_edges_against_registration_order_reorder_the_agents():
+    a, b, c = (_agent(name) for name in "abc")
+    c >> b
+    b >> a  # Both edges go against registration order
+
+    assert c._topo_index < b._topo_index < a._topo_index
+    for agent in (a, b, c):
+        assert all(agent._topo_index < dependent._topo_index for dependent in agent.dependents)
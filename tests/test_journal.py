@@ -0,0 +1,84 @@
+import asyncio
+
+from multi_agent.agent import Agent
+from multi_agent.journal import AGENT_COMPLETE
+from multi_agent.journal import AGENT_START
+from multi_agent.journal import SagaJournal
+from multi_agent.saga import Saga
+
+
+def _agent(name, run, rolled_back):
+    agent = Agent(name, "backstory", f"task of {name}", client=object())
+    agent.react_agent.run = lambda user_msg, *args, **kwargs: run()
+    agent.rollback = lambda: rolled_back.append(name)
+    return agent
+
+
+def _async(run):
+    async def arun(user_msg, *args, **kwargs):
+        return run(user_msg)
+
+    return arun
+
+
+def _fail():
+    raise RuntimeError("boom")
+
+
+def test_resume_restores_completed_agents(tmp_path):
+    journal = SagaJournal(str(tmp_path / "journal.db"))
+    journal.record("run", "A", AGENT_START)
+    journal.record("run", "A", AGENT_COMPLETE, "output of A")
+    ran = []
+    a = _agent("A", lambda: ran.append("A") or "again", [])
+    b = _agent("B", lambda: ran.append("B") or "output of B", [])
+    a >> b
+    saga = Saga(journal=journal)
+    saga.transaction_manager([a, b])
+
+    saga.resume("run")
+
+    assert ran == ["B"]
+    assert saga.context == {"A": "output of A", "B": "output of B"}
+    assert [entry.content for entry in b.context.entries] == ["output of A"]
+    journal.close()
+
+
+def test_failure_after_resume_rolls_back_restored_agents(tmp_path):
+    journal = SagaJournal(str(tmp_path / "journal.db"))
+    journal.record("run", "A", AGENT_START)
+    journal.record("run", "A", AGENT_COMPLETE, "output of A")
+    rolled_back = []
+    a = _agent("A", lambda: "again", rolled_back)
+    b = _agent("B", _fail, rolled_back)
+    a >> b
+    saga = Saga(journal=journal)
+    saga.transaction_manager([a, b])
+
+    saga.resume("run")
+
+    assert isinstance(saga.error, RuntimeError)
+    assert rolled_back == ["A"]
+    assert "A" not in journal.completed_outputs("run")
+    journal.close()
+
+
+def test_async_run_journals_every_event(tmp_path):
+    journal = SagaJournal(str(tmp_path / "journal.db"))
+    a = _agent("A", lambda: "output of A", [])
+    b = _agent("B", lambda: "output of B", [])
+    for agent in (a, b):
+        agent.react_agent.arun = _async(agent.react_agent.run)
+    a >> b
+    saga = Saga(journal=journal)
+    saga.transaction_manager([a, b])
+
+    asyncio.run(saga.arun(run_id="run"))
+
+    assert [(event["agent"], event["event"]) for event in journal.events("run")] == [
+        ("A", AGENT_START),
+        ("A", AGENT_COMPLETE),
+        ("B", AGENT_START),
+        ("B", AGENT_COMPLETE),
+    ]
+    journal.close()
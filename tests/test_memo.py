@@ -0,0 +1,68 @@
+from multi_agent.agent import Agent
+from multi_agent.saga import Saga
+from utils.cache import ResponseCache
+
+
+def _agent(name, ran, rolled_back, fail=()):
+    agent = Agent(name, "backstory", f"task of {name}", client=object())
+
+    def run(user_msg, *args, **kwargs):
+        ran.append(name)
+        if name in fail:
+            raise RuntimeError(f"{name} failed")
+        return f"output of {name}"
+
+    agent.react_agent.run = run
+    agent.rollback = lambda: rolled_back.append(name)
+    return agent
+
+
+def test_rolled_back_agent_is_not_reused_from_the_memo():
+    ran, rolled_back, fail = [], [], {"pay"}
+    book_venue = _agent("book_venue", ran, rolled_back)
+    pay = _agent("pay", ran, rolled_back, fail)
+    book_venue >> pay
+    saga = Saga(memo=ResponseCache())
+    saga.transaction_manager([book_venue, pay])
+
+    saga.saga_coordinator()
+    assert rolled_back == ["book_venue"]
+
+    fail.clear()
+    ran.clear()
+    saga.saga_coordinator()
+
+    assert saga.error is None
+    assert ran == ["book_venue", "pay"]  # The booking was cancelled: it must be made again
+    assert saga.memo_report == {"skipped": [], "ran": ["book_venue", "pay"]}
+
+
+def test_restored_agent_is_not_reused_from_the_memo():
+    ran, rolled_back = [], []
+    a = _agent("a", ran, rolled_back)
+    saga = Saga(memo=ResponseCache())
+    saga.transaction_manager([a])
+    saga.saga_coordinator()
+
+    saga.restore_context("a")
+    ran.clear()
+    saga.saga_coordinator()
+
+    assert ran == ["a"]
+
+
+def test_repeated_run_is_fully_memoized():
+    ran, rolled_back = [], []
+    a, b, c = (_agent(name, ran, rolled_back) for name in "abc")
+    a >> b >> c
+    saga = Saga(memo=ResponseCache())
+    saga.transaction_manager([a, b, c])
+
+    saga.saga_coordinator()
+    prompt = c.create_prompt()
+    ran.clear()
+    saga.saga_coordinator()
+
+    assert ran == []
+    assert saga.memo_report == {"skipped": ["a", "b", "c"], "ran": []}
+    assert c.create_prompt() == prompt  # Context received in the first run is not delivered twice
@@ -0,0 +1,70 @@
+from types import SimpleNamespace
+
+import pytest
+
+from planning_agent.react_agent import ReactAgent
+from tool_agent.tool import tool
+from utils.prompts import compile_prompt
+
+TEMPLATE = "You are {role!r}. Task: {task}\nScore: {score:.2f}\n{context}\nAnswer with {{json}}."
+
+
+@pytest.mark.parametrize("static", [{}, {"role": "a critic"}, {"role": "a critic", "task": "review {this}"}])
+def test_compiled_prompt_matches_str_format(static):
+    values = {"role": "a critic", "task": "review {this}", "score": 0.5, "context": "line\n  indented"}
+
+    prompt = compile_prompt(TEMPLATE, **static)
+    dynamic = {name: value for name, value in values.items() if name not in static}
+
+    assert prompt.render(**dynamic) == TEMPLATE.format(**values)
+    assert prompt.fields == tuple(name for name in ("role", "task", "score", "context") if name not in static)
+
+
+def test_static_values_are_inserted_verbatim():
+    prompt = compile_prompt("Task: {task}\n{context}", task="fill {context} in")
+
+    assert prompt.render(context="ctx") == "Task: fill {context} in\nctx"
+
+
+def test_prefix_is_stable_across_renders():
+    prompt = compile_prompt("Task: {task}\nContext: {context}", task="summarise")
+
+    first, second = prompt.render(context="one"), prompt.render(context="two")
+
+    assert prompt.prefix == "Task: summarise\nContext: "
+    assert first.startswith(prompt.prefix) and second.startswith(prompt.prefix)
+
+
+def test_missing_dynamic_field_raises():
+    with pytest.raises(KeyError):
+        compile_prompt("{task} {context}", task="t").render()
+
+
+@tool
+def lookup(query: str) -> str:
+    """
+    Looks a query up.
+
+    Args:
+        query (str): The query.
+    """
+    return query
+
+
+def test_react_system_prompt_does_not_grow_across_runs():
+    sent = []
+
+    def create(messages, **kwargs):
+        sent.append(messages[0]["content"])
+        return SimpleNamespace(choices=[SimpleNamespace(message=SimpleNamespace(content="<response>done</response>"))])
+
+    client = SimpleNamespace(chat=SimpleNamespace(completions=SimpleNamespace(create=create)))
+    agent = ReactAgent(tools=[lookup], client=client)
+
+    agent.run("first question")
+    agent.run("second question")
+
+    assert len(sent) == 2
+    assert sent[0] == sent[1] == agent.compiled_system_prompt()
+    assert sent[0].count(lookup.fn_signature) == 1
+    assert agent.system_prompt in sent[0]
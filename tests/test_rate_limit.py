@@ -0,0 +1,50 @@
+import asyncio
+import time
+
+import pytest
+
+from utils.deadline import Deadline
+from utils.deadline import deadline_scope
+from utils.deadline import DeadlineExceeded
+from utils.rate_limit import RateLimiter
+
+
+def _exhausted_limiter():
+    limiter = RateLimiter()
+    limiter.configure("model", rpm=60)  # One request per second
+    for _ in range(60):
+        limiter.reserve("model")
+    return limiter
+
+
+def test_acquire_fails_fast_when_the_wait_outlasts_the_deadline():
+    limiter = _exhausted_limiter()
+
+    started = time.perf_counter()
+    with deadline_scope(Deadline(0.2)), pytest.raises(DeadlineExceeded):
+        limiter.acquire("model")
+
+    assert time.perf_counter() - started < 0.1
+    assert limiter.reserve("model") == pytest.approx(1.0, abs=0.05)  # The reservation was given back
+
+
+def test_aacquire_fails_fast_when_the_wait_outlasts_the_deadline():
+    limiter = _exhausted_limiter()
+
+    async def acquire():
+        with deadline_scope(Deadline(0.2)):
+            await limiter.aacquire("model")
+
+    started = time.perf_counter()
+    with pytest.raises(DeadlineExceeded):
+        asyncio.run(acquire())
+
+    assert time.perf_counter() - started < 0.1
+    assert limiter.reserve("model") == pytest.approx(1.0, abs=0.05)
+
+
+def test_acquire_waits_when_the_deadline_allows_it():
+    limiter = _exhausted_limiter()
+
+    with deadline_scope(Deadline(2.0)):
+        assert limiter.acquire("model") == pytest.approx(1.0, abs=0.05)
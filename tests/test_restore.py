@@ -0,0 +1,55 @@
+from multi_agent.agent import Agent
+from multi_agent.saga import Saga
+
+
+def _agents(ran, rolled_back):
+    runs = {}
+
+    def make(name):
+        agent = Agent(name, "backstory", f"task of {name}", client=object())
+
+        def run(user_msg, *args, **kwargs):
+            ran.append(name)
+            runs[name] = runs.get(name, 0) + 1
+            return f"{name}#{runs[name]}"
+
+        agent.react_agent.run = run
+        agent.rollback = lambda: rolled_back.append(name)
+        return agent
+
+    return [make(name) for name in "ABCD"]
+
+
+def test_recompute_only_reruns_the_dirty_subgraph():
+    ran, rolled_back = [], []
+    a, b, c, d = _agents(ran, rolled_back)
+    a >> b >> c
+    a >> d
+    saga = Saga()
+    saga.transaction_manager([a, b, c, d])
+    saga.saga_coordinator()
+    ran.clear()
+
+    saga.restore_context("B", recompute=True)
+
+    assert ran == ["B", "C"]
+    assert rolled_back == ["B", "C"]
+    assert saga.context == {"A": "A#1", "B": "B#2", "C": "C#2", "D": "D#1"}
+    assert [(entry.source, entry.content) for entry in c.context.entries] == [("B", "B#2")]
+    assert [(entry.source, entry.content) for entry in b.context.entries] == [("A", "A#1")]
+
+
+def test_restore_without_recompute_only_rolls_back():
+    ran, rolled_back = [], []
+    a, b, c, d = _agents(ran, rolled_back)
+    a >> b
+    saga = Saga()
+    saga.transaction_manager([a, b])
+    saga.saga_coordinator()
+    ran.clear()
+
+    saga.restore_context("B")
+
+    assert ran == []
+    assert rolled_back == ["B"]
+    assert saga.context == {"A": "A#1"}
@@ -0,0 +1,13 @@
+import pytest
+
+from utils.retry import RetryPolicy
+
+
+@pytest.mark.parametrize("options", [{"max_attempts": 0}, {"max_attempts": -1}, {"base_delay": -0.1}, {"max_delay": -1}])
+def test_invalid_policy_is_rejected(options):
+    with pytest.raises(ValueError):
+        RetryPolicy(**options)
+
+
+def test_default_policy_is_valid():
+    assert RetryPolicy().max_attempts == 3
@@ -0,0 +1,84 @@
+import threading
+import time
+
+from multi_agent.rollback import parallel_rollback
+
+
+class Node:
+    def __init__(self, name):
+        self.name = name
+        self.dependents = []
+        self.dependencies = []
+
+    def __rshift__(self, other):
+        self.dependents.append(other)
+        other.dependencies.append(self)
+        return other
+
+
+def _record(events):
+    lock = threading.Lock()
+
+    def compensate(agent):
+        with lock:
+            events.append(("start", agent.name))
+        time.sleep(0.05)
+        with lock:
+            events.append(("end", agent.name))
+
+    return compensate
+
+
+def test_dependents_are_rolled_back_first_across_skipped_agents():
+    a, b, c = Node("a"), Node("b"), Node("c")
+    a >> b >> c
+    events = []
+
+    parallel_rollback([a, c], _record(events))  # b was memoized: not compensated
+
+    assert events.index(("end", "c")) < events.index(("start", "a"))
+
+
+def test_independent_branches_are_rolled_back_concurrently():
+    root, left, right = Node("root"), Node("left"), Node("right")
+    root >> left
+    root >> right
+    events = []
+
+    parallel_rollback([root, left, right], _record(events))
+
+    assert events[:2] == [("start", "left"), ("start", "right")] or events[:2] == [
+        ("start", "right"),
+        ("start", "left"),
+    ]
+    assert events[-1] == ("end", "root")
+
+
+def test_order_is_kept_through_shared_skipped_agents():
+    top, left, right, middle, bottom = (Node(name) for name in ("top", "left", "right", "middle", "bottom"))
+    top >> left >> middle
+    top >> right >> middle
+    middle >> bottom
+    events = []
+
+    parallel_rollback([top, left, bottom], _record(events))  # right and middle were not executed
+
+    assert events.index(("end", "bottom")) < events.index(("start", "left"))
+    assert events.index(("end", "left")) < events.index(("start", "top"))
+
+
+def test_long_chain_of_skipped_agents_is_walked_once():
+    nodes = [Node(str(i)) for i in range(2000)]
+    for upstream, downstream in zip(nodes, nodes[1:]):
+        upstream >> downstream
+    visits = []
+
+    def dependents(agent):
+        visits.append(agent)
+        return agent.dependents
+
+    order = []
+    parallel_rollback(nodes[::100], order.append, dependents=dependents)
+
+    assert order == nodes[::100][::-1]
+    assert len(set(visits)) == len(visits)  # Every agent's dependents are listed once
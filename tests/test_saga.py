@@ -0,0 +1,31 @@
+import threading
+import time
+
+from multi_agent.agent import Agent
+from multi_agent.saga import Saga
+from utils.deadline import DeadlineExceeded
+
+
+def _agent(name, run):
+    agent = Agent(name, "backstory", f"task of {name}", client=object())
+    agent.react_agent.run = lambda user_msg, *args, **kwargs: run()
+    return agent
+
+
+def test_parallel_run_returns_at_its_deadline_while_an_agent_is_blocked():
+    release = threading.Event()
+    blocked = _agent("Blocked", lambda: release.wait(3.0) and "late")
+    quick = _agent("Quick", lambda: "done")
+    saga = Saga(timeout=0.5)
+    saga.transaction_manager([blocked, quick])
+
+    started = time.perf_counter()
+    try:
+        saga.saga_coordinator(max_workers=2)
+        elapsed = time.perf_counter() - started
+    finally:
+        release.set()
+
+    assert elapsed < 1.5
+    assert isinstance(saga.error, DeadlineExceeded)
+    assert saga.context == {"Quick": "done"}
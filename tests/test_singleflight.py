@@ -0,0 +1,59 @@
+import threading
+import types
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from utils.completions import completions_create
+from utils.singleflight import set_single_flight
+from utils.singleflight import SingleFlight
+
+
+class SlowClient:
+    def __init__(self):
+        self.chat = types.SimpleNamespace(completions=types.SimpleNamespace(create=self.create))
+        self.calls = 0
+        self.entered = threading.Barrier(4, timeout=0.2)
+        self._lock = threading.Lock()
+
+    def create(self, **kwargs):
+        with self._lock:
+            self.calls += 1
+        try:
+            self.entered.wait()  # Keeps the calls in flight together
+        except threading.BrokenBarrierError:
+            pass
+        message = types.SimpleNamespace(content=f"response {self.calls}")
+        return types.SimpleNamespace(choices=[types.SimpleNamespace(message=message)], usage=None)
+
+
+def _send_concurrently(client, count=4):
+    messages = [{"role": "user", "content": "same question"}]
+    with ThreadPoolExecutor(count) as executor:
+        return list(executor.map(lambda _: completions_create(client, messages, "model"), range(count)))
+
+
+@pytest.fixture
+def single_flight():
+    single_flight = SingleFlight()
+    set_single_flight(single_flight)
+    yield single_flight
+    set_single_flight(None)
+
+
+def test_identical_requests_are_sampled_independently_by_default():
+    client = SlowClient()
+
+    _send_concurrently(client)
+
+    assert client.calls == 4
+
+
+def test_enabled_coalescing_sends_identical_requests_once(single_flight):
+    client = SlowClient()
+
+    responses = _send_concurrently(client)
+
+    assert client.calls == 1
+    assert len(set(responses)) == 1
+    assert single_flight.stats()["coalesced"] == 3